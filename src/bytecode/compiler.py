@@ -0,0 +1,264 @@
+from visitor.interface import Visitor
+from context.slots import SlotScopes
+from parse_objects.objects import (
+    Expression,
+    VariableAccess,
+    IdentifierExpression,
+    FunctionCall,
+    OrExpression,
+    AddExpression,
+    SubExpression,
+    MulExpression,
+    DivExpression,
+    PowExpression,
+    TranExpression
+)
+from bytecode.opcodes import (
+    CallSite,
+    CodeObject,
+    LOAD_SLOT,
+    LOAD_RAW,
+    STORE,
+    STORE_NEW,
+    POP,
+    JUMP,
+    JUMP_IF_FALSE,
+    COMPARE,
+    ADD,
+    SUB,
+    MUL,
+    DIV,
+    POW,
+    TRANSFER,
+    NEGATE,
+    OR_TEST,
+    AND_TEST,
+    RELATION,
+    ATTRIBUTES,
+    JUMP_IF_NOT_STRING,
+    CALL_POSITION,
+    CALL,
+    RETURN,
+    BREAK_OUTSIDE_WHILE,
+    UNDEFINED_VARIABLE,
+    FUNCTION_NOT_FOUND
+)
+
+
+BINARY_OPCODES = {
+    AddExpression: ADD,
+    SubExpression: SUB,
+    MulExpression: MUL,
+    DivExpression: DIV,
+    PowExpression: POW,
+    TranExpression: TRANSFER
+}
+
+
+def starts_call(node):
+    """
+    Tells whether evaluating the node may call a function, which changes the current call position.
+    """
+    if isinstance(node, FunctionCall):
+        return True
+    if isinstance(node, VariableAccess):
+        return starts_call(node.variable[0])
+    if isinstance(node, Expression):
+        return starts_call(node.left) or starts_call(node.right)
+    return False
+
+
+class Compiler(Visitor):
+    """
+    Compiles one function definition into a CodeObject. Variables are resolved to frame slots
+    while compiling.
+    """
+
+    def __init__(self, functions):
+        self._functions = functions
+        self._code = None
+        self._scopes = SlotScopes()
+        self._loops = []
+
+    def compile(self, function_definition):
+        self._code = CodeObject(definition=function_definition)
+        self._scopes = SlotScopes()
+        self._loops = []
+        function_definition.accept(self)
+        self._code.slot_count = self._scopes.slot_count
+        return self._code
+
+    def _emit(self, opcode, argument=0):
+        self._code.instructions.extend((opcode, argument))
+        return len(self._code.instructions) - 1
+
+    def _constant(self, value):
+        self._code.constants.append(value)
+        return len(self._code.constants) - 1
+
+    def _patch(self, argument_index, target=None):
+        self._code.instructions[argument_index] = len(self._code.instructions) if target is None else target
+
+    def _emit_return_none(self):
+        self._emit(LOAD_RAW, self._constant(None))
+        self._emit(RETURN)
+
+    def visit_function_definition(self, function_definition):
+        self._scopes.enter_scope()
+        for parameter in function_definition.parameters:
+            slot = self._scopes.resolve(parameter.name)
+            self._code.parameter_slots.append(self._scopes.declare(parameter.name) if slot is None else slot)
+        function_definition.block.accept(self)
+        self._emit_return_none()
+        self._scopes.leave_scope()
+
+    def visit_block(self, block):
+        self._scopes.enter_scope()
+        for statement in block.statements:
+            statement.accept(self)
+            if isinstance(statement, VariableAccess):
+                self._emit(POP)
+        self._scopes.leave_scope()
+
+    def visit_if_stmt(self, statement):
+        statement.condition.accept(self)
+        else_jump = self._emit(JUMP_IF_FALSE)
+        statement.true_block.accept(self)
+        if not statement.else_block:
+            self._patch(else_jump)
+            return
+        end_jump = self._emit(JUMP)
+        self._patch(else_jump)
+        statement.else_block.accept(self)
+        self._patch(end_jump)
+
+    def visit_while_stmt(self, statement):
+        start = len(self._code.instructions)
+        statement.condition.accept(self)
+        end_jump = self._emit(JUMP_IF_FALSE)
+        self._loops.append((start, [end_jump]))
+        statement.true_block.accept(self)
+        self._emit(JUMP, start)
+        _, break_jumps = self._loops.pop()
+        for jump in break_jumps:
+            self._patch(jump)
+
+    def visit_return_stmt(self, statement):
+        if not statement.expression:
+            self._emit_return_none()
+            return
+        statement.expression.accept(self)
+        self._emit(RETURN)
+
+    def visit_break_stmt(self, statement):
+        if not self._loops:
+            self._emit(BREAK_OUTSIDE_WHILE)
+            return
+        self._loops[-1][1].append(self._emit(JUMP))
+
+    def visit_continue_stmt(self, statement):
+        if not self._loops:
+            self._emit(BREAK_OUTSIDE_WHILE)
+            return
+        self._emit(JUMP, self._loops[-1][0])
+
+    def visit_assignment(self, assignment):
+        target = assignment.left.variable
+        if len(target) != 1 or type(target[0]) is not IdentifierExpression:
+            self._visit_other_target(assignment)
+            return
+        assignment.right.accept(self)
+        name = target[0].name
+        if (slot := self._scopes.resolve(name)) is not None:
+            self._emit(STORE, slot)
+        else:
+            self._emit(STORE_NEW, self._scopes.declare(name))
+
+    def _visit_other_target(self, assignment):
+        # The tree-walker reads an assignment target with its names unresolved, so attributes are taken
+        # from the name itself, and stores the value under a key made from the target, which no
+        # identifier can read back. Only the evaluation of both sides is kept.
+        first = assignment.left.variable[0]
+        if type(first) is IdentifierExpression:
+            self._emit(LOAD_RAW, self._constant(first.name))
+            self._emit(ATTRIBUTES, self._constant(self._attribute_names(assignment.left)))
+        else:
+            assignment.left.accept(self)
+        self._emit(POP)
+        assignment.right.accept(self)
+        self._emit(POP)
+
+    def _attribute_names(self, variable_access):
+        return tuple(
+            part.variable[0].name if isinstance(part, VariableAccess) else part.name
+            for part in variable_access.variable[1:]
+        )
+
+    def visit_variable_access(self, variable_access):
+        first = variable_access.variable[0]
+        first.accept(self)
+        if len(variable_access.variable) == 1:
+            return
+        if isinstance(first, FunctionCall):
+            # The tree-walker evaluates the first part again when it holds a string.
+            skip_jump = self._emit(JUMP_IF_NOT_STRING)
+            self._emit(POP)
+            first.accept(self)
+            self._patch(skip_jump)
+        self._emit(ATTRIBUTES, self._constant(self._attribute_names(variable_access)))
+
+    def visit_identifier_expression(self, identifier_expression):
+        name = identifier_expression.name
+        if (slot := self._scopes.resolve(name)) is not None:
+            self._emit(LOAD_SLOT, slot)
+        elif (function := self._functions.get(name)) is not None:
+            self._emit(LOAD_RAW, self._constant(function))
+        else:
+            self._emit(UNDEFINED_VARIABLE, self._constant(identifier_expression))
+
+    def visit_function_call(self, fun_call):
+        position = fun_call.position
+        if any(starts_call(argument) for argument in fun_call.arguments):
+            self._emit(CALL_POSITION, self._constant(position))
+            position = None
+        for argument in fun_call.arguments:
+            argument.accept(self)
+        function = self._functions.get(fun_call.name)
+        if function is None:
+            self._emit(FUNCTION_NOT_FOUND, self._constant(fun_call))
+            return
+        self._emit(CALL, self._constant(CallSite(function, len(fun_call.arguments), position)))
+
+    def visit_constant(self, constant):
+        self._emit(LOAD_RAW, self._constant(constant.value))
+
+    def visit_comparison(self, comparison):
+        comparison.left.accept(self)
+        comparison.right.accept(self)
+        self._emit(COMPARE, self._constant(comparison))
+
+    def _visit_binary_expression(self, expression):
+        expression.left.accept(self)
+        expression.right.accept(self)
+        self._emit(BINARY_OPCODES[type(expression)], self._constant(expression))
+
+    visit_add_expression = _visit_binary_expression
+    visit_sub_expression = _visit_binary_expression
+    visit_mul_expression = _visit_binary_expression
+    visit_div_expression = _visit_binary_expression
+    visit_pow_expression = _visit_binary_expression
+    visit_tran_expression = _visit_binary_expression
+
+    def visit_negated_expression(self, negated):
+        negated.right.accept(self)
+        self._emit(NEGATE, self._constant(negated))
+
+    def _visit_relation(self, expression):
+        expression.left.accept(self)
+        end_jump = self._emit(OR_TEST if isinstance(expression, OrExpression) else AND_TEST)
+        expression.right.accept(self)
+        self._emit(RELATION, self._constant(expression))
+        self._patch(end_jump)
+
+    visit_or_expression = _visit_relation
+    visit_and_expression = _visit_relation
@@ -0,0 +1,72 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+from parse_objects.objects import FunctionDefinition
+
+
+# Every instruction takes two entries of CodeObject.instructions: the opcode and its argument.
+# The argument is a slot number, a jump target or an index into the constant pool.
+LOAD_SLOT = 0
+LOAD_RAW = 1
+STORE = 2
+STORE_NEW = 3
+POP = 4
+JUMP = 5
+JUMP_IF_FALSE = 6
+COMPARE = 7
+ADD = 8
+SUB = 9
+MUL = 10
+DIV = 11
+POW = 12
+TRANSFER = 13
+NEGATE = 14
+OR_TEST = 15
+AND_TEST = 16
+RELATION = 17
+ATTRIBUTES = 18
+JUMP_IF_NOT_STRING = 19
+CALL_POSITION = 20
+CALL = 21
+RETURN = 22
+BREAK_OUTSIDE_WHILE = 23
+UNDEFINED_VARIABLE = 24
+FUNCTION_NOT_FOUND = 25
+
+OPCODE_NAMES = {value: name for name, value in list(globals().items()) if name.isupper() and isinstance(value, int)}
+JUMP_OPCODES = {JUMP, JUMP_IF_FALSE, OR_TEST, AND_TEST, JUMP_IF_NOT_STRING}
+
+
+@dataclass
+class CallSite:
+    """
+    Constant describing one call: the called function, the number of arguments on the stack and
+    the position stored as the current call position, unless an earlier CALL_POSITION stored it.
+    """
+    function: Any
+    argument_count: int
+    position: Any = None
+
+
+@dataclass
+class CodeObject:
+    definition: FunctionDefinition
+    instructions: list[int] = field(default_factory=lambda: [])
+    constants: list[Any] = field(default_factory=lambda: [])
+    slot_count: int = 0
+    parameter_slots: list[int] = field(default_factory=lambda: [])
+
+
+def disassemble(code):
+    """
+    Returns a readable listing of the instructions of a code object.
+    """
+    lines = []
+    for offset in range(0, len(code.instructions), 2):
+        opcode, argument = code.instructions[offset:offset + 2]
+        name = OPCODE_NAMES[opcode]
+        if opcode in JUMP_OPCODES or opcode in [LOAD_SLOT, STORE, STORE_NEW, POP, RETURN, BREAK_OUTSIDE_WHILE]:
+            lines.append(f'{offset:>4} {name:<20} {argument}')
+        else:
+            lines.append(f'{offset:>4} {name:<20} {argument} ({code.constants[argument]!r:.60})')
+    return '\n'.join(lines)
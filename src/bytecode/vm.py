@@ -0,0 +1,222 @@
+from parse_objects.objects import BuiltInFunction
+from interpreter.reference import Reference, wrap, value_of
+from interpreter.calculations import Calculations
+from visitor.interpreter_visitor import BUILTINS_LIST
+from bytecode.compiler import Compiler
+from bytecode.opcodes import (
+    LOAD_SLOT,
+    LOAD_RAW,
+    STORE,
+    STORE_NEW,
+    POP,
+    JUMP,
+    JUMP_IF_FALSE,
+    COMPARE,
+    ADD,
+    SUB,
+    MUL,
+    DIV,
+    POW,
+    TRANSFER,
+    NEGATE,
+    OR_TEST,
+    AND_TEST,
+    RELATION,
+    ATTRIBUTES,
+    JUMP_IF_NOT_STRING,
+    CALL_POSITION,
+    CALL,
+    RETURN,
+    BREAK_OUTSIDE_WHILE,
+    UNDEFINED_VARIABLE,
+    FUNCTION_NOT_FOUND
+)
+from error_manager.interpreter_er import (
+    NoMainFunction,
+    NotExactArguments,
+    UndefinedVariable,
+    FunctionNotFound,
+    BreakOrContinueOutsideWhile,
+    RecursionTooDeep
+)
+from interpreter.deep_stack import MAX_CALL_DEPTH
+
+
+class VirtualMachine:
+    """
+    Stack machine running the bytecode made by the Compiler. Functions are compiled on their first
+    call and every call pushes a frame on an explicit frame stack instead of the Python stack.
+    The values on the stack are the same as the results of the tree-walker: References for
+    variables and plain values for everything else.
+    """
+
+    def __init__(self, error_manager):
+        self._error_manager = error_manager
+        self._calculations_handler = Calculations(error_manager)
+        self._functions = {}
+        self._codes = {}
+        self._compiler = None
+        self._call_position = None
+
+    def execute(self, program):
+        self._functions = dict(program.functions)
+        for name, function in BUILTINS_LIST:
+            self._functions[name] = BuiltInFunction(position=None, name=name, function=function)
+        self._compiler = Compiler(self._functions)
+        main_function = self._functions.get('main')
+        if not main_function:
+            error = NoMainFunction(position=None, name=None)
+            raise self._error_manager.fatal_error(error)
+        self._run(main_function, [])
+
+    def _enter(self, function, arguments):
+        if len(arguments) != len(function.parameters):
+            error = NotExactArguments(position=(function.position, self._call_position), name=function.name)
+            raise self._error_manager.fatal_error(error)
+        if (code := self._codes.get(function.name)) is None:
+            code = self._codes[function.name] = self._compiler.compile(function)
+        slots = [None] * code.slot_count
+        for slot, argument in zip(code.parameter_slots, arguments):
+            slots[slot] = argument
+        return code, slots
+
+    def _save_error(self, error):
+        if not self._error_manager.save_error(error):
+            raise Exception('Error manager is full')
+
+    def _run(self, function, arguments):
+        calculations = self._calculations_handler
+        frames = []
+        code, slots = self._enter(function, arguments)
+        instructions = code.instructions
+        constants = code.constants
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+        while True:
+            opcode = instructions[pc]
+            argument = instructions[pc + 1]
+            pc += 2
+            if opcode == LOAD_SLOT:
+                push(slots[argument])
+            elif opcode == STORE:
+                slots[argument].value = value_of(pop())
+            elif opcode == JUMP_IF_FALSE:
+                if not value_of(pop()):
+                    pc = argument
+            elif opcode == JUMP:
+                pc = argument
+            elif opcode == COMPARE:
+                right = value_of(pop())
+                left = value_of(pop())
+                push(calculations.compare_values(left, right, constants[argument]))
+            elif opcode == ADD or opcode == SUB:
+                right = value_of(pop())
+                left = value_of(pop())
+                expression = constants[argument]
+                calculations.check_currency_operands(left, right, expression)
+                push(calculations.calculate_result(left, right, expression))
+            elif opcode == STORE_NEW:
+                slots[argument] = Reference(value=value_of(pop()))
+            elif opcode == POP:
+                pop()
+            elif opcode == CALL:
+                call_site = constants[argument]
+                if call_site.position is not None:
+                    self._call_position = call_site.position
+                count = call_site.argument_count
+                call_arguments = stack[len(stack) - count:]
+                del stack[len(stack) - count:]
+                function = call_site.function
+                if isinstance(function, BuiltInFunction):
+                    push(function.function(
+                        *[value_of(value) for value in call_arguments] if len(call_arguments) else ' '
+                    ))
+                    continue
+                call_arguments = [wrap(value) for value in call_arguments]
+                if len(frames) >= MAX_CALL_DEPTH:
+                    raise self._error_manager.fatal_error(RecursionTooDeep(position=None, name=MAX_CALL_DEPTH))
+                frames.append((code, slots, stack, pc))
+                code, slots = self._enter(function, call_arguments)
+                instructions = code.instructions
+                constants = code.constants
+                stack = []
+                push = stack.append
+                pop = stack.pop
+                pc = 0
+            elif opcode == RETURN:
+                value = pop()
+                if not frames:
+                    return value
+                code, slots, stack, pc = frames.pop()
+                push = stack.append
+                pop = stack.pop
+                instructions = code.instructions
+                constants = code.constants
+                push(value)
+            elif opcode == LOAD_RAW:
+                push(constants[argument])
+            elif opcode == MUL:
+                right = value_of(pop())
+                left = value_of(pop())
+                push(calculations.calculate_result(left, right, constants[argument]))
+            elif opcode == DIV:
+                right = value_of(pop())
+                left = value_of(pop())
+                expression = constants[argument]
+                calculations.check_divisor(left, right, expression)
+                push(calculations.calculate_result(left, right, expression))
+            elif opcode == POW:
+                right = value_of(pop())
+                left = value_of(pop())
+                expression = constants[argument]
+                calculations.check_power_base(left, right, expression)
+                push(calculations.calculate_result(left, right, expression))
+            elif opcode == TRANSFER:
+                right = value_of(pop())
+                left = value_of(pop())
+                push(calculations.calculate_result(left, right, constants[argument]))
+            elif opcode == NEGATE:
+                push(calculations.negate_value(value_of(pop()), constants[argument]))
+            elif opcode == OR_TEST:
+                if value_of(stack[-1]) is True:
+                    stack[-1] = True
+                    pc = argument
+            elif opcode == AND_TEST:
+                if value_of(stack[-1]) is False:
+                    stack[-1] = True
+                    pc = argument
+            elif opcode == RELATION:
+                right = value_of(pop())
+                left = value_of(pop())
+                expression = constants[argument]
+                push(calculations.handle_relations(left, right, expression))
+            elif opcode == ATTRIBUTES:
+                value = value_of(pop())
+                for name in constants[argument]:
+                    value = getattr(value, name)
+                push(value)
+            elif opcode == JUMP_IF_NOT_STRING:
+                if not isinstance(value_of(stack[-1]), str):
+                    pc = argument
+            elif opcode == CALL_POSITION:
+                self._call_position = constants[argument]
+            elif opcode == BREAK_OUTSIDE_WHILE:
+                self._save_error(BreakOrContinueOutsideWhile(position=self._call_position, name=code.definition.name))
+                if not frames:
+                    return None
+                code, slots, stack, pc = frames.pop()
+                push = stack.append
+                pop = stack.pop
+                instructions = code.instructions
+                constants = code.constants
+                push(None)
+            elif opcode == UNDEFINED_VARIABLE:
+                identifier_expression = constants[argument]
+                error = UndefinedVariable(position=identifier_expression.position, name=identifier_expression.name)
+                raise self._error_manager.fatal_error(error)
+            elif opcode == FUNCTION_NOT_FOUND:
+                fun_call = constants[argument]
+                error = FunctionNotFound(position=fun_call.position, name=fun_call.name)
+                raise self._error_manager.fatal_error(error)
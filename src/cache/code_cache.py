@@ -0,0 +1,51 @@
+import pickle
+import marshal
+import importlib.util
+
+from version import INTERPRETER_VERSION, TRANSPILER_VERSION
+from cache.disk_cache import DiskCache
+from cache.program_cache import DEFAULT_CACHE_DIRECTORY, DEFAULT_CACHE_SIZE
+
+
+class CodeCache:
+    """
+    Stores the code objects of the modules generated from programs, with the tables of objects they use,
+    keyed by the hash of the source, so warm runs skip the lexer, the parser and the code generator.
+    Code objects are only valid for the Python version which made them.
+    """
+
+    def __init__(
+        self, directory=DEFAULT_CACHE_DIRECTORY, max_size=DEFAULT_CACHE_SIZE,
+        version=f'{INTERPRETER_VERSION}.{TRANSPILER_VERSION}'
+    ):
+        self._cache = DiskCache(directory, max_size)
+        self._version = version
+
+    def _key(self, digest):
+        return f'code-{self._version}-{digest}'
+
+    def load(self, digest):
+        key = self._key(digest)
+        data = self._cache.load(key)
+        if data is None:
+            return None
+        try:
+            version, magic, stored_digest, code, nodes = pickle.loads(data)
+            if version != self._version or magic != importlib.util.MAGIC_NUMBER or stored_digest != digest:
+                raise ValueError('Stale code cache entry')
+            code = marshal.loads(code)
+        except Exception:
+            self._cache.invalidate(key)
+            return None
+        return code, nodes
+
+    def store(self, digest, code, nodes):
+        try:
+            data = pickle.dumps(
+                (self._version, importlib.util.MAGIC_NUMBER, digest, marshal.dumps(code), nodes),
+                protocol=pickle.HIGHEST_PROTOCOL
+            )
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError, ValueError):
+            return False
+        self._cache.store(self._key(digest), data)
+        return True
@@ -0,0 +1,71 @@
+import os
+import tempfile
+
+
+class DiskCache:
+    """
+    A directory of cache entries addressed by string keys. Entries are written atomically
+    (temporary file + rename), so readers never see partial data, and the directory is kept
+    under a size limit by evicting the least recently used entries.
+    """
+
+    SUFFIX = '.cache'
+
+    def __init__(self, directory, max_size):
+        self._directory = directory
+        self._max_size = max_size
+
+    def _path(self, key):
+        return os.path.join(self._directory, key + self.SUFFIX)
+
+    def load(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def store(self, key, data):
+        os.makedirs(self._directory, exist_ok=True)
+        descriptor, temporary_path = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary_path, self._path(key))
+        except BaseException:
+            self._remove(temporary_path)
+            raise
+        self.evict()
+
+    def invalidate(self, key):
+        self._remove(self._path(key))
+
+    def evict(self):
+        entries = []
+        total_size = 0
+        for entry in os.scandir(self._directory):
+            if not entry.name.endswith(self.SUFFIX):
+                continue
+            try:
+                status = entry.stat()
+            except OSError:
+                continue
+            entries.append((status.st_mtime, status.st_size, entry.path))
+            total_size += status.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self._max_size:
+                break
+            self._remove(path)
+            total_size -= size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
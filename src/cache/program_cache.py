@@ -0,0 +1,57 @@
+import pickle
+import hashlib
+
+from version import INTERPRETER_VERSION
+from cache.disk_cache import DiskCache
+
+
+DEFAULT_CACHE_DIRECTORY = '.tkom_cache'
+DEFAULT_CACHE_SIZE = 64 * 1024 * 1024
+
+
+def source_digest(source_file):
+    """
+    Hashes the source file content. The file is read from the start in binary mode and
+    left positioned at its start again.
+    """
+    source_file.seek(0)
+    digest = hashlib.file_digest(source_file, 'sha256').hexdigest()
+    source_file.seek(0)
+    return digest
+
+
+class ProgramCache:
+    """
+    Stores parsed Program trees on disk, keyed by the hash of the source and the interpreter
+    version, so warm runs skip the lexer and the parser entirely.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIRECTORY, max_size=DEFAULT_CACHE_SIZE, version=INTERPRETER_VERSION):
+        self._cache = DiskCache(directory, max_size)
+        self._version = version
+
+    def _key(self, digest):
+        return f'program-{self._version}-{digest}'
+
+    def load(self, digest):
+        key = self._key(digest)
+        data = self._cache.load(key)
+        if data is None:
+            return None
+        try:
+            version, stored_digest, program = pickle.loads(data)
+        except Exception:
+            self._cache.invalidate(key)
+            return None
+        if version != self._version or stored_digest != digest:
+            self._cache.invalidate(key)
+            return None
+        return program
+
+    def store(self, digest, program):
+        try:
+            data = pickle.dumps((self._version, digest, program), protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+            return False
+        self._cache.store(self._key(digest), data)
+        return True
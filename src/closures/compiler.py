@@ -0,0 +1,321 @@
+from visitor.interface import Visitor
+from context.slots import SlotScopes
+from interpreter.reference import Reference, wrap, value_of
+from interpreter.completion import BREAK, CONTINUE, RETURN
+from parse_objects.objects import (
+    VariableAccess,
+    IdentifierExpression,
+    FunctionCall,
+    BuiltInFunction,
+    OrExpression
+)
+from error_manager.interpreter_er import UndefinedVariable, FunctionNotFound
+
+
+# Frames are lists of slots, the first one keeps the value of the executed return statement.
+RETURN_SLOT = 0
+
+
+class ClosureCompiler(Visitor):
+    """
+    Compiles the nodes of one function definition into nested closures, once. An expression becomes
+    a function of the frame returning the same value the tree-walker leaves in its last result: the
+    Reference of a variable or a plain value. A statement becomes a function of the frame returning
+    a control flow signal.
+    """
+
+    def __init__(self, engine, functions, error_manager):
+        self._engine = engine
+        self._functions = functions
+        self._error_manager = error_manager
+        self._calculations_handler = engine.calculations_handler
+        self._scopes = SlotScopes()
+        self._compiled = None
+
+    def compile(self, function_definition):
+        """
+        Returns the closure running the function body and the frame layout: the number of slots and
+        the slots of the parameters.
+        """
+        self._scopes = SlotScopes(first_slot=RETURN_SLOT + 1)
+        self._scopes.enter_scope()
+        parameter_slots = []
+        for parameter in function_definition.parameters:
+            slot = self._scopes.resolve(parameter.name)
+            parameter_slots.append(self._scopes.declare(parameter.name) if slot is None else slot)
+        body = self._compile(function_definition.block)
+        self._scopes.leave_scope()
+        return body, self._scopes.slot_count, parameter_slots
+
+    def _compile(self, node):
+        node.accept(self)
+        compiled = self._compiled
+        self._compiled = None
+        return compiled
+
+    def visit_block(self, block):
+        self._scopes.enter_scope()
+        statements = tuple(self._compile_statement(statement) for statement in block.statements)
+        self._scopes.leave_scope()
+
+        def run_block(frame):
+            for statement in statements:
+                if (signal := statement(frame)) is not None:
+                    return signal
+        self._compiled = run_block
+
+    def _compile_statement(self, statement):
+        compiled = self._compile(statement)
+        if not isinstance(statement, VariableAccess):
+            return compiled
+
+        def discard_value(frame):
+            compiled(frame)
+        return discard_value
+
+    def visit_if_stmt(self, statement):
+        condition = self._compile(statement.condition)
+        true_block = self._compile(statement.true_block)
+        if not statement.else_block:
+            def run_if(frame):
+                if value_of(condition(frame)):
+                    return true_block(frame)
+            self._compiled = run_if
+            return
+        else_block = self._compile(statement.else_block)
+
+        def run_if_else(frame):
+            if value_of(condition(frame)):
+                return true_block(frame)
+            return else_block(frame)
+        self._compiled = run_if_else
+
+    def visit_while_stmt(self, statement):
+        condition = self._compile(statement.condition)
+        body = self._compile(statement.true_block)
+
+        def run_while(frame):
+            while value_of(condition(frame)):
+                signal = body(frame)
+                if signal == BREAK:
+                    break
+                if signal == RETURN:
+                    return signal
+        self._compiled = run_while
+
+    def visit_return_stmt(self, statement):
+        if not statement.expression:
+            def run_return_none(frame):
+                frame[RETURN_SLOT] = None
+                return RETURN
+            self._compiled = run_return_none
+            return
+        expression = self._compile(statement.expression)
+
+        def run_return(frame):
+            frame[RETURN_SLOT] = expression(frame)
+            return RETURN
+        self._compiled = run_return
+
+    def visit_break_stmt(self, statement):
+        self._compiled = lambda frame: BREAK
+
+    def visit_continue_stmt(self, statement):
+        self._compiled = lambda frame: CONTINUE
+
+    def visit_assignment(self, assignment):
+        target = assignment.left.variable
+        if len(target) != 1 or type(target[0]) is not IdentifierExpression:
+            self._compiled = self._compile_other_target(assignment)
+            return
+        right = self._compile(assignment.right)
+        if (slot := self._scopes.resolve(target[0].name)) is not None:
+            def store(frame):
+                frame[slot].value = value_of(right(frame))
+            self._compiled = store
+            return
+        slot = self._scopes.declare(target[0].name)
+
+        def store_new(frame):
+            frame[slot] = Reference(value=value_of(right(frame)))
+        self._compiled = store_new
+
+    def _compile_other_target(self, assignment):
+        # The tree-walker reads an assignment target with its names unresolved, so attributes are taken
+        # from the name itself, and stores the value under a key made from the target, which no
+        # identifier can read back. Only the evaluation of both sides is kept.
+        first = assignment.left.variable[0]
+        if type(first) is IdentifierExpression:
+            name = first.name
+            names = self._attribute_names(assignment.left)
+
+            def target(frame):
+                value = name
+                for attribute in names:
+                    value = getattr(value, attribute)
+        else:
+            target = self._compile(assignment.left)
+        right = self._compile(assignment.right)
+
+        def evaluate(frame):
+            target(frame)
+            right(frame)
+        return evaluate
+
+    def _attribute_names(self, variable_access):
+        return tuple(
+            part.variable[0].name if isinstance(part, VariableAccess) else part.name
+            for part in variable_access.variable[1:]
+        )
+
+    def visit_variable_access(self, variable_access):
+        first = self._compile(variable_access.variable[0])
+        if len(variable_access.variable) == 1:
+            self._compiled = first
+            return
+        names = self._attribute_names(variable_access)
+        if not isinstance(variable_access.variable[0], FunctionCall):
+            def access(frame):
+                value = value_of(first(frame))
+                for name in names:
+                    value = getattr(value, name)
+                return value
+            self._compiled = access
+            return
+
+        def access_call_result(frame):
+            # The tree-walker evaluates the first part again when it holds a string.
+            value = value_of(first(frame))
+            if isinstance(value, str):
+                value = value_of(first(frame))
+            for name in names:
+                value = getattr(value, name)
+            return value
+        self._compiled = access_call_result
+
+    def visit_identifier_expression(self, identifier_expression):
+        if (slot := self._scopes.resolve(identifier_expression.name)) is not None:
+            self._compiled = lambda frame: frame[slot]
+            return
+        if (function := self._functions.get(identifier_expression.name)) is not None:
+            self._compiled = lambda frame: function
+            return
+        error_manager = self._error_manager
+
+        def undefined(frame):
+            error = UndefinedVariable(position=identifier_expression.position, name=identifier_expression.name)
+            raise error_manager.fatal_error(error)
+        self._compiled = undefined
+
+    def visit_function_call(self, fun_call):
+        engine = self._engine
+        position = fun_call.position
+        arguments = tuple(self._compile(argument) for argument in fun_call.arguments)
+        function = self._functions.get(fun_call.name)
+        if function is None:
+            error_manager = self._error_manager
+
+            def not_found(frame):
+                engine.call_position = position
+                for argument in arguments:
+                    argument(frame)
+                error = FunctionNotFound(position=position, name=fun_call.name)
+                raise error_manager.fatal_error(error)
+            self._compiled = not_found
+            return
+        if isinstance(function, BuiltInFunction):
+            builtin = function.function
+
+            def call_builtin(frame):
+                engine.call_position = position
+                values = [value_of(argument(frame)) for argument in arguments]
+                return builtin(*values if values else ' ')
+            self._compiled = call_builtin
+            return
+
+        def call(frame):
+            engine.call_position = position
+            return engine.call_function(function, [wrap(argument(frame)) for argument in arguments])
+        self._compiled = call
+
+    def visit_constant(self, constant):
+        value = constant.value
+        self._compiled = lambda frame: value
+
+    def visit_comparison(self, comparison):
+        left = self._compile(comparison.left)
+        right = self._compile(comparison.right)
+        compare_values = self._calculations_handler.compare_values
+
+        def compare(frame):
+            left_value = left(frame)
+            right_value = right(frame)
+            return compare_values(value_of(left_value), value_of(right_value), comparison)
+        self._compiled = compare
+
+    def _compile_calculation(self, expression, check=None):
+        left = self._compile(expression.left)
+        right = self._compile(expression.right)
+        calculate_result = self._calculations_handler.calculate_result
+        if check is None:
+            def calculate(frame):
+                left_value = left(frame)
+                right_value = right(frame)
+                return calculate_result(value_of(left_value), value_of(right_value), expression)
+            return calculate
+
+        def check_and_calculate(frame):
+            left_value = left(frame)
+            right_value = right(frame)
+            left_value = value_of(left_value)
+            right_value = value_of(right_value)
+            check(left_value, right_value, expression)
+            return calculate_result(left_value, right_value, expression)
+        return check_and_calculate
+
+    def visit_add_expression(self, expression):
+        check = self._calculations_handler.check_currency_operands
+        self._compiled = self._compile_calculation(expression, check)
+
+    def visit_sub_expression(self, expression):
+        check = self._calculations_handler.check_currency_operands
+        self._compiled = self._compile_calculation(expression, check)
+
+    def visit_mul_expression(self, expression):
+        self._compiled = self._compile_calculation(expression)
+
+    def visit_div_expression(self, expression):
+        check = self._calculations_handler.check_divisor
+        self._compiled = self._compile_calculation(expression, check)
+
+    def visit_pow_expression(self, expression):
+        check = self._calculations_handler.check_power_base
+        self._compiled = self._compile_calculation(expression, check)
+
+    def visit_tran_expression(self, expression):
+        self._compiled = self._compile_calculation(expression)
+
+    def visit_negated_expression(self, negated):
+        right = self._compile(negated.right)
+        negate_value = self._calculations_handler.negate_value
+        self._compiled = lambda frame: negate_value(value_of(right(frame)), negated)
+
+    def _compile_relation(self, expression):
+        left = self._compile(expression.left)
+        right = self._compile(expression.right)
+        handle_relations = self._calculations_handler.handle_relations
+        is_or = isinstance(expression, OrExpression)
+
+        def relation(frame):
+            left_value = left(frame)
+            if value_of(left_value) is is_or:
+                return True
+            right_value = right(frame)
+            return handle_relations(value_of(left_value), value_of(right_value), expression)
+        return relation
+
+    def visit_or_expression(self, expression):
+        self._compiled = self._compile_relation(expression)
+
+    def visit_and_expression(self, expression):
+        self._compiled = self._compile_relation(expression)
@@ -0,0 +1,51 @@
+from parse_objects.objects import BuiltInFunction
+from interpreter.calculations import Calculations
+from visitor.interpreter_visitor import BUILTINS_LIST
+from closures.compiler import ClosureCompiler, RETURN_SLOT
+from interpreter.completion import RETURN
+from error_manager.interpreter_er import NoMainFunction, NotExactArguments, BreakOrContinueOutsideWhile
+
+
+class ClosureEngine:
+    """
+    Runs a program with every function body compiled into nested closures on its first call, so the
+    per-node dispatch of the tree-walker is paid once per node instead of once per evaluation.
+    Each call gets a frame with one slot for every variable of the function.
+    """
+
+    def __init__(self, error_manager):
+        self._error_manager = error_manager
+        self.calculations_handler = Calculations(error_manager)
+        self.call_position = None
+        self._functions = {}
+        self._bodies = {}
+        self._compiler = None
+
+    def execute(self, program):
+        self._functions = dict(program.functions)
+        for name, function in BUILTINS_LIST:
+            self._functions[name] = BuiltInFunction(position=None, name=name, function=function)
+        self._compiler = ClosureCompiler(self, self._functions, self._error_manager)
+        main_function = self._functions.get('main')
+        if not main_function:
+            error = NoMainFunction(position=None, name=None)
+            raise self._error_manager.fatal_error(error)
+        self.call_function(main_function, [])
+
+    def call_function(self, function, arguments):
+        if len(arguments) != len(function.parameters):
+            error = NotExactArguments(position=(function.position, self.call_position), name=function.name)
+            raise self._error_manager.fatal_error(error)
+        if (compiled := self._bodies.get(function.name)) is None:
+            compiled = self._bodies[function.name] = self._compiler.compile(function)
+        body, slot_count, parameter_slots = compiled
+        frame = [None] * slot_count
+        for slot, argument in zip(parameter_slots, arguments):
+            frame[slot] = argument
+        signal = body(frame)
+        if signal == RETURN:
+            return frame[RETURN_SLOT]
+        if signal is not None:
+            error = BreakOrContinueOutsideWhile(position=self.call_position, name=function.name)
+            if not self._error_manager.save_error(error):
+                raise Exception('Error manager is full')
@@ -0,0 +1,31 @@
+class SlotScopes:
+    """
+    Compile-time scopes of one function. A block scope only lives while its block runs, so the
+    variables visible at each point of the function are known statically and every declared variable
+    gets a slot in one flat frame of the function. Leaving a block lowers the watermark of used slots
+    back to where the block started, so sibling blocks share slots; a declaration always stores
+    a new Reference, so nothing left in a reused slot is seen.
+    """
+
+    def __init__(self, first_slot=0):
+        self._scopes = []
+        self._next_slot = first_slot
+        self.slot_count = first_slot
+
+    def enter_scope(self):
+        self._scopes.append(({}, self._next_slot))
+
+    def leave_scope(self):
+        _, self._next_slot = self._scopes.pop()
+
+    def resolve(self, name):
+        for scope, _ in reversed(self._scopes):
+            if (slot := scope.get(name)) is not None:
+                return slot
+
+    def declare(self, name):
+        slot = self._next_slot
+        self._next_slot += 1
+        self.slot_count = max(self.slot_count, self._next_slot)
+        self._scopes[-1][0][name] = slot
+        return slot
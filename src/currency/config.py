@@ -1,5 +1,27 @@
-exchange_rates = {
-    'USD': {'USD': 1.0, 'EUR': 0.9, 'PLN': 4.0},
-    'EUR': {'USD': 1.11, 'EUR': 1.0, 'PLN': 4.4},
-    'PLN': {'USD': 0.25, 'EUR': 0.22, 'PLN': 1.0}
-}
\ No newline at end of file
+import csv
+from pathlib import Path
+
+
+# ISO 4217 currencies of the language: the code, the number of digits of the minor unit and the value of
+# one unit in the base currency, which is left empty when its rate is not known.
+CURRENCIES_FILE = Path(__file__).with_name('currencies.csv')
+BASE_CURRENCY = 'PLN'
+
+# Version of the rates in the file above, to be changed with them. Programs with folded currency
+# operations are cached under it, so they are folded again with the new rates.
+RATES_VERSION = '2'
+
+
+def load_currencies(path=CURRENCIES_FILE):
+    """
+    Returns the rows of the currency file as tuples of the code, the number of digits of the minor unit
+    and the rate against the base currency or None, in the order of the file.
+    """
+    with open(path, newline='') as currency_file:
+        return [
+            (row['code'], int(row['minor_units']), float(row['rate']) if row['rate'] else None)
+            for row in csv.DictReader(currency_file)
+        ]
+
+
+CURRENCIES = load_currencies()
@@ -1,11 +1,55 @@
+from enum import IntEnum
 from parse_objects.objects import Constant
 from typing import Any, Union
 from dataclasses import dataclass
 
+from currency.config import CURRENCIES
+
+
+class Code(IntEnum):
+    """
+    Base of CurrencyCode, which is made from the currency file. A code indexes the vector of exchange
+    rates, and is shown and compared with strings as its name.
+    """
+
+    def __str__(self):
+        return self.name
+
+
+CurrencyCode = Code(
+    'CurrencyCode', [(code, index) for index, (code, _, _) in enumerate(CURRENCIES)], module=__name__,
+    qualname='CurrencyCode'
+)
+
+# Digits of the minor unit of every currency, indexed by the CurrencyCode.
+MINOR_UNITS = [minor_units for _, minor_units, _ in CURRENCIES]
+
+
 @dataclass
 class Currency:
     value: Union[int, float]
-    type: Any
+    type: CurrencyCode
+
+    def __str__(self):
+        return f'{self.value} {self.type}'
+
+
+@dataclass
+class Money:
+    """
+    A currency value of the fixed-point money mode, a whole number of the minor units of its currency,
+    e.g. cents. It is shown with all the digits of the minor unit.
+    """
+    minor: int
+    type: CurrencyCode
+
+    @property
+    def value(self):
+        return self.minor / 10 ** MINOR_UNITS[self.type]
 
     def __str__(self):
-        return f'{self.value} {self.type}'
\ No newline at end of file
+        if not (scale := MINOR_UNITS[self.type]):
+            return f'{self.minor} {self.type}'
+        units, fraction = divmod(abs(self.minor), 10 ** scale)
+        sign = '-' if self.minor < 0 else ''
+        return f'{sign}{units}.{fraction:0{scale}d} {self.type}'
@@ -0,0 +1,179 @@
+import os
+import math
+import mmap
+import struct
+import threading
+from datetime import date
+
+from currency.currency import Currency, CurrencyCode, Money
+from currency.money import scaled_rate, convert_minor
+
+
+MAGIC = b'TKRH'
+FORMAT_VERSION = 1
+# The magic, the format version and the number of currencies, followed by their three letter codes.
+HEADER = struct.Struct('<4sHH')
+CODE_SIZE = 3
+DAY = struct.Struct('<i')
+RATE = struct.Struct('<d')
+
+
+class RateHistory:
+    """
+    An append-only file of the daily vectors of the rates of the currencies against the base currency.
+    The header lists the codes of the currencies in the order of the vectors, so a file outlives
+    changes of the currency list. Every record is the ordinal of its day and the rates, NaN where a rate
+    is not known, and the records are kept in the order of their days. The file is memory-mapped and a
+    day is found by binary search, so only the records on the way are read, and of the one found only
+    the two rates asked for.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+        if not os.path.exists(path) or not os.path.getsize(path):
+            self._create()
+        with open(path, 'rb') as history_file:
+            magic, version, count = HEADER.unpack(history_file.read(HEADER.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f'{path} is not a rate history file')
+            codes = history_file.read(count * CODE_SIZE).decode('ascii')
+        names = [codes[index:index + CODE_SIZE] for index in range(0, len(codes), CODE_SIZE)]
+        # The columns of the file of the currencies, None for the currencies the file does not have.
+        columns = {name: column for column, name in enumerate(names)}
+        self._columns = [columns.get(code.name) for code in CurrencyCode]
+        self._names = names
+        self._record = struct.Struct(f'<i{count}d')
+        self._start = HEADER.size + count * CODE_SIZE
+        self._view = None
+        self._map()
+
+    def _create(self):
+        names = [code.name for code in CurrencyCode]
+        with open(self._path, 'wb') as history_file:
+            history_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(names)) + ''.join(names).encode('ascii'))
+
+    def _map(self):
+        # The mapping and the number of records in it are replaced together, a reader which took the old
+        # pair keeps a valid view of the records which were there.
+        with open(self._path, 'rb') as history_file:
+            size = os.fstat(history_file.fileno()).st_size
+            count = (size - self._start) // self._record.size
+            mapping = mmap.mmap(history_file.fileno(), 0, access=mmap.ACCESS_READ) if count else None
+        self._view = (mapping, count)
+
+    def __len__(self):
+        return self._view[1]
+
+    def last_day(self):
+        mapping, count = self._view
+        return date.fromordinal(self._day(mapping, count - 1)) if count else None
+
+    def _day(self, mapping, index):
+        return DAY.unpack_from(mapping, self._start + index * self._record.size)[0]
+
+    def append(self, day, base_rates):
+        """
+        Appends the rates of the given day, a vector indexed by the CurrencyCode with None where a rate is
+        not known. The day must be later than the last one in the file.
+        """
+        with self._lock:
+            if (last_day := self.last_day()) is not None and day <= last_day:
+                raise ValueError(f'rates of {day} are not later than the last ones of {last_day}')
+            rates = [math.nan] * len(self._names)
+            for code in CurrencyCode:
+                if (column := self._columns[code]) is not None and base_rates[code] is not None:
+                    rates[column] = base_rates[code]
+            with open(self._path, 'ab') as history_file:
+                history_file.write(self._record.pack(day.toordinal(), *rates))
+                history_file.flush()
+                os.fsync(history_file.fileno())
+            self._map()
+
+    def _index_on(self, mapping, count, ordinal):
+        # The last record of a day not later than the given one.
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if self._day(mapping, middle) <= ordinal:
+                low = middle + 1
+            else:
+                high = middle
+        return low - 1
+
+    def _rate(self, mapping, index, code):
+        if (column := self._columns[code]) is None:
+            return None
+        offset = self._start + index * self._record.size + DAY.size + column * RATE.size
+        rate = RATE.unpack_from(mapping, offset)[0]
+        return None if math.isnan(rate) else rate
+
+    def rate_at(self, day, source, target):
+        """
+        Returns the number of units of the target currency worth one of the source one by the rates of
+        the given day, or of the last day before it which has rates, or None when they are not known.
+        """
+        mapping, count = self._view
+        if (index := self._index_on(mapping, count, day.toordinal())) < 0:
+            return None
+        if source == target:
+            return 1.0
+        source_rate = self._rate(mapping, index, source)
+        target_rate = self._rate(mapping, index, target)
+        if source_rate is None or target_rate is None:
+            return None
+        return source_rate / target_rate
+
+
+_history = None
+
+
+def open_rate_history(path):
+    """Opens the history the rate_at and convert_at builtins read."""
+    global _history
+    _history = RateHistory(path)
+    return _history
+
+
+def _name_of(currency):
+    return currency.decode(errors='replace') if isinstance(currency, bytes) else currency
+
+
+def _code_of(currency):
+    if type(currency) is CurrencyCode:
+        return currency
+    return CurrencyCode.__members__.get(currency) if isinstance(currency, str) else None
+
+
+def _day_of(day):
+    if isinstance(day, date):
+        return day
+    try:
+        return date.fromisoformat(day.decode() if isinstance(day, bytes) else day)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        return None
+
+
+def rate_at(day, source, target):
+    """
+    Builtin giving the rate from the source currency to the target one on a day written as YYYY-MM-DD.
+    The currencies are codes or their names. Gives None when the day is not valid or the rate is not
+    known.
+    """
+    day, source, target = _day_of(day), _code_of(_name_of(source)), _code_of(_name_of(target))
+    if _history is None or None in (day, source, target):
+        return None
+    return _history.rate_at(day, source, target)
+
+
+def convert_at(value, target, day):
+    """
+    Builtin converting a currency value to the target currency with the rate of a day, like the transfer
+    operator does with the current rates. Gives None when the rate is not known.
+    """
+    if type(value) not in (Currency, Money) or (rate := rate_at(day, value.type, target)) is None:
+        return None
+    target = _code_of(_name_of(target))
+    if type(value) is Money:
+        return Money(convert_minor(value.minor, scaled_rate(rate, value.type, target)), target)
+    return Currency(value.value * rate, target)
@@ -0,0 +1,77 @@
+from math import gcd
+from fractions import Fraction
+from typing import NamedTuple
+
+from currency.currency import MINOR_UNITS
+
+
+# Rates of the money mode are integers, the rate times ten to this power.
+RATE_DIGITS = 12
+# Minor units in one unit of every currency, indexed by the CurrencyCode.
+MINOR_SCALES = [10 ** units for units in MINOR_UNITS]
+
+
+class DecimalLiteral(NamedTuple):
+    """
+    A number literal of the money mode, kept as its digits: the whole units, the digits after the point
+    as a number and how many of them there are. A literal before a currency becomes its minor units
+    without going through a float, any other one the number the float mode reads.
+    """
+    units: int
+    fraction: int
+    places: int
+
+    def number(self):
+        return self.units + self.fraction * pow(10, -self.places)
+
+    def minor_units(self, scale):
+        coefficient = self.units * 10 ** self.places + self.fraction
+        if self.places <= scale:
+            return coefficient * 10 ** (scale - self.places)
+        return divide_rounded(coefficient, 10 ** (self.places - scale))
+
+
+def divide_rounded(numerator, denominator):
+    """
+    Divides integers rounding to the nearest one, and a half to the even one, as all rounding of the
+    money mode does. The denominator is positive.
+    """
+    quotient, remainder = divmod(numerator, denominator)
+    twice = 2 * remainder
+    if twice > denominator or (twice == denominator and quotient % 2):
+        quotient += 1
+    return quotient
+
+
+def scaled_rate(rate, source, target):
+    """
+    Returns the conversion of minor units of the source currency to the target one by the rate: the
+    factor and the divisor of the exact ratio of the rate rounded to RATE_DIGITS digits, half to even,
+    and of the scales of the currencies.
+    """
+    factor = round(Fraction(rate) * 10 ** RATE_DIGITS) * MINOR_SCALES[target]
+    divisor = 10 ** RATE_DIGITS * MINOR_SCALES[source]
+    common = gcd(factor, divisor)
+    return factor // common, divisor // common
+
+
+def scale_by(minor, number):
+    """Multiplies minor units by a number, rounding the result half to even."""
+    if type(number) is int:
+        return minor * number
+    numerator, denominator = number.as_integer_ratio()
+    return divide_rounded(minor * numerator, denominator)
+
+
+def divide_by(minor, number):
+    """Divides minor units by a number which is not zero, rounding the result half to even."""
+    denominator, numerator = (number, 1) if type(number) is int else number.as_integer_ratio()
+    if denominator < 0:
+        minor, denominator = -minor, -denominator
+    return divide_rounded(minor * numerator, denominator)
+
+
+def convert_minor(minor, conversion):
+    """Converts minor units of one currency to another with the conversion given by scaled_rate."""
+    factor, divisor = conversion
+    return divide_rounded(minor * factor, divisor)
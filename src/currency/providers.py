@@ -0,0 +1,107 @@
+import csv
+import json
+import sqlite3
+import urllib.request
+from abc import ABCMeta, abstractmethod
+from pathlib import Path
+
+
+DEFAULT_HTTP_TIMEOUT = 10
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+
+
+def rates_from_json(data):
+    """
+    Reads rates given as an object of currency names and rates, or as one with the 'rates' object and
+    the name of their 'base' currency.
+    """
+    if isinstance(data, dict) and isinstance(data.get('rates'), dict):
+        return data['rates'], data.get('base')
+    if isinstance(data, dict):
+        return data, None
+    raise ValueError('exchange rates must be a JSON object')
+
+
+class RateProvider(metaclass=ABCMeta):
+    """
+    A source of exchange rates. The rates are the value of one unit of every currency in the base
+    currency, which is the one of the registry unless the source names another.
+    """
+
+    @property
+    @abstractmethod
+    def name(self):
+        """Names the source, so that the rates of different sources are cached apart."""
+        ...
+
+    @abstractmethod
+    def fetch(self):
+        """Returns the mapping of currency names to their rates and the name of their base currency or None."""
+        ...
+
+
+class FileRateProvider(RateProvider):
+    """
+    Rates of a local JSON file, or of a CSV file with the 'code' and 'rate' columns like the currency
+    file, where rows with an empty rate are skipped.
+    """
+
+    def __init__(self, path):
+        self._path = Path(path)
+
+    @property
+    def name(self):
+        return f'file:{self._path.resolve()}'
+
+    def fetch(self):
+        with open(self._path, newline='') as rates_file:
+            if self._path.suffix.lower() == '.csv':
+                return {row['code']: row['rate'] for row in csv.DictReader(rates_file) if row['rate']}, None
+            return rates_from_json(json.load(rates_file))
+
+
+class SQLiteRateProvider(RateProvider):
+    """Rates of the 'code' and 'rate' columns of a table of an SQLite database."""
+
+    def __init__(self, path, table='rates'):
+        self._path = Path(path)
+        self._table = table
+
+    @property
+    def name(self):
+        return f'sqlite:{self._path.resolve()}:{self._table}'
+
+    def fetch(self):
+        # The database is opened read only, so a missing file is an error and not a new database.
+        connection = sqlite3.connect(f'{self._path.resolve().as_uri()}?mode=ro', uri=True)
+        try:
+            rows = connection.execute(f'SELECT code, rate FROM "{self._table}" WHERE rate IS NOT NULL').fetchall()
+        finally:
+            connection.close()
+        return dict(rows), None
+
+
+class HttpRateProvider(RateProvider):
+    """Rates of the JSON document served at a URL."""
+
+    def __init__(self, url, timeout=DEFAULT_HTTP_TIMEOUT):
+        self._url = url
+        self._timeout = timeout
+
+    @property
+    def name(self):
+        return self._url
+
+    def fetch(self):
+        request = urllib.request.Request(self._url, headers={'Accept': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self._timeout) as response:
+            return rates_from_json(json.load(response))
+
+
+def rate_provider(location):
+    """Returns the provider of the rates at the given URL, SQLite database or JSON or CSV file."""
+    if location.startswith(('http://', 'https://')):
+        return HttpRateProvider(location)
+    if Path(location).suffix.lower() in SQLITE_SUFFIXES:
+        return SQLiteRateProvider(location)
+    return FileRateProvider(location)
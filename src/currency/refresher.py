@@ -0,0 +1,121 @@
+import json
+import time
+import hashlib
+import threading
+from datetime import date
+
+from cache.disk_cache import DiskCache
+from currency.registry import CURRENCY_REGISTRY
+
+
+# The rates are refreshed at least once a day.
+DEFAULT_RATES_TTL = 24 * 60 * 60
+DEFAULT_RETRY_INTERVAL = 5 * 60
+
+
+class RateCache:
+    """
+    Keeps the last rates fetched from every provider on disk, with the time they were fetched, so that
+    a run does not fetch rates which are younger than the time to live again.
+    """
+
+    def __init__(self, directory, max_size, ttl=DEFAULT_RATES_TTL):
+        self._cache = DiskCache(directory, max_size)
+        self.ttl = ttl
+
+    def _key(self, provider):
+        return 'rates-' + hashlib.sha256(provider.name.encode()).hexdigest()[:32]
+
+    def load(self, provider):
+        """Returns the time the cached rates were fetched, the rates and their base, or None."""
+        data = self._cache.load(self._key(provider))
+        if data is None:
+            return None
+        try:
+            entry = json.loads(data)
+            return float(entry['fetched']), dict(entry['rates']), entry['base']
+        except (ValueError, KeyError, TypeError):
+            self._cache.invalidate(self._key(provider))
+            return None
+
+    def store(self, provider, fetched, rates, base):
+        data = json.dumps({'fetched': fetched, 'rates': rates, 'base': base}).encode()
+        self._cache.store(self._key(provider), data)
+
+    def invalidate(self, provider):
+        self._cache.invalidate(self._key(provider))
+
+    def is_fresh(self, fetched, now):
+        return now - fetched < self.ttl
+
+
+class RateRefresher:
+    """
+    Keeps the rates of the registry up to date with a provider. Starting it only puts the cached rates
+    in use, even when they are stale, and a daemon thread fetches new ones when they expire, so a
+    running program never waits for the provider. The thread builds the new rate vector and swaps it
+    into the registry, which the calculations read it from, as a whole, or only keeps it as the latest
+    one when the run pinned its rates. A failed fetch keeps the rates in use and is retried later. The first rates fetched on a day are appended to the rate history, when
+    one is given.
+    """
+
+    def __init__(self, provider, cache, registry=CURRENCY_REGISTRY, retry_interval=DEFAULT_RETRY_INTERVAL,
+                 clock=time.time, history=None):
+        self._provider = provider
+        self._cache = cache
+        self._registry = registry
+        self._retry_interval = retry_interval
+        self._clock = clock
+        self._history = history
+        self._stopped = threading.Event()
+        self._thread = None
+        self.refreshed = threading.Event()
+        self.last_error = None
+
+    def start(self):
+        delay = 0
+        if (cached := self._cache.load(self._provider)) is not None:
+            fetched, rates, base = cached
+            try:
+                self._registry.update_rates(rates, base)
+            except ValueError:
+                self._cache.invalidate(self._provider)
+            else:
+                delay = max(0, fetched + self._cache.ttl - self._clock())
+        self._thread = threading.Thread(target=self._run, args=(delay,), name='rate-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def refresh(self):
+        """Fetches the rates and puts them in use. Returns whether it succeeded."""
+        try:
+            rates, base = self._provider.fetch()
+            snapshot = self._registry.update_rates(rates, base)
+        except Exception as error:
+            self.last_error = error
+            return False
+        try:
+            self._cache.store(self._provider, self._clock(), {name: float(rate) for name, rate in rates.items()}, base)
+        except OSError as error:
+            # The new rates are in use, only the next run fetches them again.
+            self.last_error = error
+        self._record_history(snapshot)
+        self.refreshed.set()
+        return True
+
+    def _record_history(self, snapshot):
+        if self._history is None:
+            return
+        day = date.fromtimestamp(self._clock())
+        if (last_day := self._history.last_day()) is not None and last_day >= day:
+            return
+        try:
+            self._history.append(day, snapshot.base_rates)
+        except OSError as error:
+            self.last_error = error
+
+    def _run(self, delay):
+        while not self._stopped.wait(delay):
+            delay = self._cache.ttl if self.refresh() else self._retry_interval
@@ -0,0 +1,126 @@
+import hashlib
+import threading
+
+from currency.config import CURRENCIES, BASE_CURRENCY, RATES_VERSION
+from currency.currency import CurrencyCode, MINOR_UNITS
+from currency.money import scaled_rate
+
+
+class RateSnapshot:
+    """
+    One vector of the rates of the currencies against the base currency, indexed by the CurrencyCode,
+    with the cross rates derived from it so far. A snapshot is never changed after it is made, only its
+    cache of cross rates grows.
+    """
+
+    def __init__(self, base_rates, version):
+        self.base_rates = base_rates
+        self.version = version
+        self.cross_rates = {}
+        self.scaled_rates = {}
+
+
+class CurrencyRegistry:
+    """
+    The currencies of the language with one vector of their rates against the base currency, indexed by
+    the CurrencyCode. The rate between two other currencies is derived from their base rates when it is
+    first asked for and kept, so only the pairs a program converts between are stored. A currency whose
+    rate is not known has None in the vector. New rates replace the whole snapshot at once, so a thread
+    which refreshes them never makes a calculation see the rates of two snapshots. A run pins the snapshot
+    it starts with, since folded constants, memoized results and kept loop invariants hold values computed
+    with it: new rates are then only the latest ones, for the rate cache and history and the next run.
+    """
+
+    def __init__(self, currencies=CURRENCIES, base=BASE_CURRENCY):
+        self.base = CurrencyCode[base]
+        self.minor_units = MINOR_UNITS if currencies is CURRENCIES else [units for _, units, _ in currencies]
+        self._configured_rates = [rate for _, _, rate in currencies]
+        self._snapshot = RateSnapshot(self._configured_rates, RATES_VERSION)
+        self.latest = self._snapshot
+        self._pinned = False
+        self._lock = threading.Lock()
+
+    @property
+    def rates_version(self):
+        """Names the rates in use, so that programs folded with other rates are cached apart."""
+        return self._snapshot.version
+
+    @property
+    def base_rates(self):
+        """The vector of the rates in use against the base currency, indexed by the CurrencyCode."""
+        return self._snapshot.base_rates
+
+    def pin(self):
+        """Keeps the rates in use for the rest of the run and returns their snapshot."""
+        with self._lock:
+            self._pinned = True
+            return self._snapshot
+
+    def code_of(self, name):
+        """Returns the CurrencyCode of the given name, or None when it is not a currency."""
+        return CurrencyCode.__members__.get(name)
+
+    def rate(self, source, target):
+        """Returns the number of units of the target currency worth one of the source one, or None."""
+        snapshot = self._snapshot
+        try:
+            return snapshot.cross_rates[source, target]
+        except KeyError:
+            return self._rate(snapshot, source, target)
+
+    @staticmethod
+    def _rate(snapshot, source, target):
+        source_rate = snapshot.base_rates[source]
+        target_rate = snapshot.base_rates[target]
+        if source == target:
+            rate = 1.0
+        elif source_rate is None or target_rate is None:
+            return None
+        else:
+            rate = source_rate / target_rate
+        snapshot.cross_rates[source, target] = rate
+        return rate
+
+    def scaled_rate(self, source, target):
+        """Returns the conversion of the money mode between the currencies, or None. See currency.money."""
+        snapshot = self._snapshot
+        try:
+            return snapshot.scaled_rates[source, target]
+        except KeyError:
+            pass
+        if (rate := snapshot.cross_rates.get((source, target)) or self._rate(snapshot, source, target)) is None:
+            return None
+        snapshot.scaled_rates[source, target] = scaled_rate(rate, source, target)
+        return snapshot.scaled_rates[source, target]
+
+    def update_rates(self, rates, base=None):
+        """
+        Replaces the rates with the given ones, a mapping of currency names to the value of one unit in
+        the given base currency. Currencies which are not known are skipped, and the ones not given keep
+        the rates of the currency file. Rates against another base are converted through its rate.
+        Returns the new snapshot, which is put in use unless the rates are pinned.
+        """
+        rates = {name: float(rate) for name, rate in rates.items()}
+        if any(not rate > 0 for rate in rates.values()):
+            raise ValueError('exchange rates must be positive')
+        base = base or self.base.name
+        if base != self.base.name:
+            if self.base.name not in rates:
+                raise ValueError(f'no rate of the base currency {self.base.name} against {base}')
+            base_rate = rates[self.base.name]
+            rates = {name: rate / base_rate for name, rate in {base: 1.0, **rates}.items()}
+        rates = {name: rate for name, rate in rates.items() if name in CurrencyCode.__members__}
+        base_rates = list(self._configured_rates)
+        for name, rate in rates.items():
+            base_rates[CurrencyCode[name]] = rate
+        base_rates[self.base] = 1.0
+        digest = hashlib.sha256(repr(sorted(rates.items())).encode()).hexdigest()[:16]
+        snapshot = RateSnapshot(base_rates, f'{RATES_VERSION}-{digest}')
+        with self._lock:
+            self.latest = snapshot
+            if not self._pinned:
+                self._snapshot = snapshot
+        return snapshot
+
+
+CURRENCY_REGISTRY = CurrencyRegistry()
@@ -17,4 +17,7 @@ class ModulErrorManager(ErrorManager):
         self._errors.append(error)
         if len(self._errors) > 100:
             return False
-        return True
\ No newline at end of file
+        return True
+
+    def error_count(self):
+        return len(self._errors)
@@ -19,4 +19,8 @@ class ErrorManager(AbstractContextManager):
 
     @abstractmethod
     def fatal_error(self, error: type[Error]):
+        ...
+
+    @abstractmethod
+    def error_count(self):
         ...
\ No newline at end of file
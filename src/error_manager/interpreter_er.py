@@ -40,3 +40,13 @@ class UndefinedVariable(Error):
 class FunctionNotFound(Error):
     def __repr__(self) -> str:
         return f'''Function not found \'{self.name}\', in line {self.position.line}, column {self.position.column}'''
+
+
+class MissingExchangeRate(Error):
+    def __repr__(self) -> str:
+        return f'''No exchange rate from {self.name[0]} to {self.name[1]} in line {self.position.line}, column {self.position.column}'''
+
+
+class RecursionTooDeep(Error):
+    def __repr__(self) -> str:
+        return f'''Recursion too deep, more than {self.name} nested function calls'''
@@ -1,8 +1,12 @@
+from dataclasses import dataclass
+from typing import Any
+
 from error_manager.interface import Error
 
+@dataclass
 class UnexpectedToken(Error):
-    def __init__(self, function_name):
-        self.function_name = function_name
+    function_name: Any = None
+
     def __repr__(self):
         return f'Unexpected token {self.name} while try parse {self.function_name} in line {self.position.line}, column {self.position.column}'
     
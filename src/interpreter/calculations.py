@@ -1,191 +1,444 @@
-from error_manager.interpreter_er import WrongTypeForOperation, ValueSizeExceed
+from error_manager.interpreter_er import WrongTypeForOperation, ValueSizeExceed, DivisionByZero, MissingExchangeRate
 from parse_objects.objects import (
     Operator,
+    OrExpression,
+    AndExpression,
+    NegatedExpression,
     AddExpression,
+    SubExpression,
+    MulExpression,
+    DivExpression,
+    PowExpression,
+    TranExpression
 )
-from interpreter.reference import Reference
-from currency.config import exchange_rates
-from currency.currency import Currency
+from interpreter.inline_cache import InlineCache
+from currency.registry import CURRENCY_REGISTRY
+from currency.currency import Currency, CurrencyCode, Money
+from currency.money import MINOR_SCALES, divide_rounded, scale_by, divide_by, convert_minor
+from itertools import product
+import operator
 import sys
 
 NUMBER_TYPES = [int, float]
 STR_TYPES = [str, bytes]
-CURRENCY = ["EUR", "PLN", "USD"]
+CURRENCY_TYPES = (Currency, Money)
 NUMBER_OPERATOR_MAPPING = {
-    Operator.EQ: lambda a, b: a == b,
-    Operator.NE: lambda a, b: a != b,
-    Operator.GT: lambda a, b: a > b,
-    Operator.LT: lambda a, b: a < b,
-    Operator.GE: lambda a, b: a >= b,
-    Operator.LE: lambda a, b: a <= b,
+    Operator.EQ: operator.eq,
+    Operator.NE: operator.ne,
+    Operator.GT: operator.gt,
+    Operator.LT: operator.lt,
+    Operator.GE: operator.ge,
+    Operator.LE: operator.le,
 }
 BOOL_OPERATOR_MAPPING = {
-    Operator.EQ: lambda a, b: a is b,
-    Operator.NE: lambda a, b: a is not b
+    Operator.EQ: operator.is_,
+    Operator.NE: operator.is_not
 }
 
 STRING_OPERATOR_MAPPING = {
-    Operator.EQ: lambda a, b: a == b,
-    Operator.NE: lambda a, b: a != b,
+    Operator.EQ: operator.eq,
+    Operator.NE: operator.ne,
 }
 
+ARITHMETIC_OPERATOR_MAPPING = {
+    AddExpression: operator.add,
+    SubExpression: operator.sub,
+    MulExpression: operator.mul,
+    DivExpression: operator.truediv,
+    PowExpression: pow
+}
+
+# Kinds of operands, the handler of an operation only depends on them.
+NUMBER = 'number'
+BOOL = 'bool'
+STRING = 'string'
+CURRENCY_VALUE = 'currency'
+MONEY = 'money'
+CODE = 'code'
+OTHER = 'other'
+
+
+def relation_or(left, right):
+    return left or right
+
+
+def relation_and(left, right):
+    return left and right
+
+
+RELATION_MAPPING = {
+    OrExpression: relation_or,
+    AndExpression: relation_and
+}
+
+
+def kind_of(value_type):
+    if value_type in NUMBER_TYPES:
+        return NUMBER
+    if value_type is bool:
+        return BOOL
+    if value_type in STR_TYPES:
+        return STRING
+    if value_type is Currency:
+        return CURRENCY_VALUE
+    if value_type is Money:
+        return MONEY
+    if value_type is CurrencyCode:
+        return CODE
+    return OTHER
+
+
+def _checked_size(value, expression, error_manager):
+    if value > sys.maxsize or value < (-1) * sys.maxsize:
+        error = ValueSizeExceed(position=expression.position)
+        error_manager.fatal_error(error)
+    return value
+
+
+def _wrong_types(left, right, expression, error_manager):
+    error = WrongTypeForOperation(position=expression.position, name=(type(left), type(right)))
+    error_manager.fatal_error(error)
+
+
+def _rate(source, target, expression, error_manager):
+    if (rate := CURRENCY_REGISTRY.rate(source, target)) is None:
+        error = MissingExchangeRate(position=expression.position, name=(source, target))
+        raise error_manager.fatal_error(error)
+    return rate
+
+
+def _scaled_rate(source, target, expression, error_manager):
+    if (rate := CURRENCY_REGISTRY.scaled_rate(source, target)) is None:
+        error = MissingExchangeRate(position=expression.position, name=(source, target))
+        raise error_manager.fatal_error(error)
+    return rate
+
+
+def _minor_in(money, target, expression, error_manager):
+    if money.type == target:
+        return money.minor
+    return convert_minor(money.minor, _scaled_rate(money.type, target, expression, error_manager))
+
+
+def _numbers(method):
+    def calculate(left, right, expression, error_manager):
+        return _checked_size(method(left, right), expression, error_manager)
+    return calculate
+
+
+def _currencies(method):
+    def calculate(left, right, expression, error_manager):
+        if right.type != left.type:
+            value = method(left.value, right.value * _rate(right.type, left.type, expression, error_manager))
+        else:
+            value = method(left.value, right.value)
+        return Currency(_checked_size(value, expression, error_manager), left.type)
+    return calculate
+
+
+def _currency_and_number(method):
+    def calculate(left, right, expression, error_manager):
+        return Currency(_checked_size(method(left.value, right), expression, error_manager), left.type)
+    return calculate
+
+
+def _number_and_currency(method):
+    def calculate(left, right, expression, error_manager):
+        return Currency(_checked_size(method(left, right.value), expression, error_manager), right.type)
+    return calculate
+
+
+def _moneys(method):
+    # Both values are in the currency of the left one, a product is scaled back to its minor units.
+    def calculate(left, right, expression, error_manager):
+        value = method(left.minor, _minor_in(right, left.type, expression, error_manager))
+        if method is operator.mul:
+            value = divide_rounded(value, MINOR_SCALES[left.type])
+        return Money(_checked_size(value, expression, error_manager), left.type)
+    return calculate
+
+
+def _money_and_number(method):
+    def calculate(left, right, expression, error_manager):
+        value = scale_by(left.minor, right) if method is operator.mul else divide_by(left.minor, right)
+        return Money(_checked_size(value, expression, error_manager), left.type)
+    return calculate
+
+
+def _number_and_money(left, right, expression, error_manager):
+    return Money(_checked_size(scale_by(right.minor, left), expression, error_manager), right.type)
+
+
+def _strings(method):
+    def calculate(left, right, expression, error_manager):
+        return method(left, right)
+    return calculate
+
+
+def _transfer_to_currency(left, right, expression, error_manager):
+    value = left.value * _rate(left.type, right.type, expression, error_manager) + right.value
+    return Currency(_checked_size(value, expression, error_manager), right.type)
+
+
+def _transfer_to_currency_code(left, right, expression, error_manager):
+    value = left.value * _rate(left.type, right, expression, error_manager)
+    return Currency(_checked_size(value, expression, error_manager), right)
+
+
+def _transfer_to_currency_name(left, right, expression, error_manager):
+    if (code := CURRENCY_REGISTRY.code_of(right)) is None:
+        return _wrong_types(left, right, expression, error_manager)
+    return _transfer_to_currency_code(left, code, expression, error_manager)
+
+
+def _transfer_to_money(left, right, expression, error_manager):
+    value = _minor_in(left, right.type, expression, error_manager) + right.minor
+    return Money(_checked_size(value, expression, error_manager), right.type)
+
+
+def _transfer_to_money_code(left, right, expression, error_manager):
+    return Money(_checked_size(_minor_in(left, right, expression, error_manager), expression, error_manager), right)
+
+
+def _transfer_to_money_name(left, right, expression, error_manager):
+    if (code := CURRENCY_REGISTRY.code_of(right)) is None:
+        return _wrong_types(left, right, expression, error_manager)
+    return _transfer_to_money_code(left, code, expression, error_manager)
+
+
+def _comparison(method):
+    def compare(left, right, comparison, error_manager):
+        return method(left, right)
+    return compare
+
+
+def _currency_comparison(method):
+    # Both operands are read as currencies, so comparing one with another type fails like the value access does.
+    def compare(left, right, comparison, error_manager):
+        return method(left.value * _rate(left.type, right.type, comparison, error_manager), right.value)
+    return compare
+
+
+def _money_comparison(method):
+    # The values are compared exactly, with both sides of the conversion of the left one multiplied out.
+    def compare(left, right, comparison, error_manager):
+        if left.type == right.type:
+            return method(left.minor, right.minor)
+        factor, divisor = _scaled_rate(left.type, right.type, comparison, error_manager)
+        return method(left.minor * factor, right.minor * divisor)
+    return compare
+
+
+def _negate_number(right, negated, error_manager):
+    return right * -1
+
+
+def _negate_bool(right, negated, error_manager):
+    return not right
+
+
+def _negate_currency(right, negated, error_manager):
+    return Currency(-right.value, right.type)
+
+
+def _negate_money(right, negated, error_manager):
+    return Money(-right.minor, right.type)
+
+
+def _negate_wrong_type(right, negated, error_manager):
+    error = WrongTypeForOperation(position=negated.position, name=(type(right), type(right)))
+    error_manager.fatal_error(error)
+
+
+def _relation(method):
+    def relate(left, right, expression, error_manager):
+        # The error is not raised, so the relation still gives one of its operands.
+        if type(left) is not bool or type(right) is not bool:
+            _wrong_types(left, right, expression, error_manager)
+        return method(left, right)
+    return relate
+
+
+def _arithmetic_handler(left_kind, right_kind, operation):
+    if operation is TranExpression:
+        if left_kind == CURRENCY_VALUE and right_kind == CURRENCY_VALUE:
+            return _transfer_to_currency
+        if left_kind == CURRENCY_VALUE and right_kind == CODE:
+            return _transfer_to_currency_code
+        if left_kind == CURRENCY_VALUE and right_kind == STRING:
+            return _transfer_to_currency_name
+        return MONEY_TRANSFER_HANDLERS.get((left_kind, right_kind), _wrong_types)
+    method = ARITHMETIC_OPERATOR_MAPPING[operation]
+    if MONEY in (left_kind, right_kind):
+        return _money_handler(left_kind, right_kind, method)
+    handlers = {
+        (NUMBER, NUMBER): _numbers,
+        (CURRENCY_VALUE, CURRENCY_VALUE): _currencies,
+        (CURRENCY_VALUE, NUMBER): _currency_and_number,
+        (NUMBER, CURRENCY_VALUE): _number_and_currency
+    }
+    if (handler := handlers.get((left_kind, right_kind))) is not None:
+        return handler(method)
+    if left_kind == STRING and right_kind == STRING and operation is AddExpression:
+        return _strings(method)
+    return _wrong_types
+
+
+MONEY_TRANSFER_HANDLERS = {
+    (MONEY, MONEY): _transfer_to_money,
+    (MONEY, CODE): _transfer_to_money_code,
+    (MONEY, STRING): _transfer_to_money_name
+}
+
+
+def _money_handler(left_kind, right_kind, method):
+    # Money only mixes with numbers in products and quotients, and never with a float mode currency.
+    if (left_kind, right_kind) == (MONEY, MONEY) and method in (operator.add, operator.sub, operator.mul):
+        return _moneys(method)
+    if (left_kind, right_kind) == (MONEY, NUMBER) and method in (operator.mul, operator.truediv):
+        return _money_and_number(method)
+    if (left_kind, right_kind) == (NUMBER, MONEY) and method is operator.mul:
+        return _number_and_money
+    return _wrong_types
+
+
+def _comparison_handler(left_kind, right_kind, comparison_operator):
+    if comparison_operator not in NUMBER_OPERATOR_MAPPING:
+        return _wrong_types
+    if MONEY in (left_kind, right_kind):
+        both = left_kind == right_kind == MONEY
+        return _money_comparison(NUMBER_OPERATOR_MAPPING[comparison_operator]) if both else _wrong_types
+    if CURRENCY_VALUE in (left_kind, right_kind):
+        return _currency_comparison(NUMBER_OPERATOR_MAPPING[comparison_operator])
+    if NUMBER in (left_kind, right_kind):
+        return _comparison(NUMBER_OPERATOR_MAPPING[comparison_operator])
+    if BOOL in (left_kind, right_kind):
+        method = BOOL_OPERATOR_MAPPING.get(comparison_operator)
+        return _comparison(method) if method else _wrong_types
+    if left_kind == STRING and right_kind == STRING and comparison_operator in STRING_OPERATOR_MAPPING:
+        return _comparison(STRING_OPERATOR_MAPPING[comparison_operator])
+    return _wrong_types
+
+
+NEGATION_HANDLERS = {
+    NUMBER: _negate_number,
+    BOOL: _negate_bool,
+    CURRENCY_VALUE: _negate_currency,
+    MONEY: _negate_money
+}
+
+
+def _name_of(value):
+    return value.name if type(value) is CurrencyCode else value
+
+
+def _with_code_names(handler):
+    # Other operations use a currency code as its name, like the string it used to be.
+    def calculate(left, right, expression, error_manager):
+        return handler(_name_of(left), _name_of(right), expression, error_manager)
+    return calculate
+
+
+def _negate_with_code_name(handler):
+    def negate(right, negated, error_manager):
+        return handler(_name_of(right), negated, error_manager)
+    return negate
+
+
+def _select_handler(left_type, right_type, operation):
+    left_kind = kind_of(left_type)
+    right_kind = kind_of(right_type)
+    converts_to_code = operation is TranExpression and left_kind in (CURRENCY_VALUE, MONEY) and right_kind == CODE
+    if CODE in (left_kind, right_kind) and not converts_to_code:
+        handler = _select_handler(
+            str if left_type is CurrencyCode else left_type,
+            str if right_type is CurrencyCode else right_type,
+            operation
+        )
+        return _negate_with_code_name(handler) if operation is NegatedExpression else _with_code_names(handler)
+    if operation is NegatedExpression:
+        return NEGATION_HANDLERS.get(right_kind, _negate_wrong_type)
+    if operation in RELATION_MAPPING:
+        return _relation(RELATION_MAPPING[operation])
+    if isinstance(operation, Operator):
+        return _comparison_handler(left_kind, right_kind, operation)
+    return _arithmetic_handler(left_kind, right_kind, operation)
+
+
+DISPATCH_TABLE = {
+    (left_type, right_type, operation): _select_handler(left_type, right_type, operation)
+    for left_type, right_type in product(NUMBER_TYPES + [bool] + STR_TYPES + [Currency, Money, CurrencyCode], repeat=2)
+    for operation in [*ARITHMETIC_OPERATOR_MAPPING, TranExpression, *NUMBER_OPERATOR_MAPPING, *RELATION_MAPPING]
+}
+
+
+def dispatch(left_type, right_type, operation):
+    """
+    Returns the handler of the operation for operands of the given types. The operation is the class of the
+    operation node or the operator of a comparison. Handlers of other types are added to the table on
+    their first use.
+    """
+    key = (left_type, right_type, operation)
+    if (handler := DISPATCH_TABLE.get(key)) is None:
+        handler = DISPATCH_TABLE.setdefault(key, _select_handler(left_type, right_type, operation))
+    return handler
+
 
 class Calculations:
+    """
+    Operations on the values of the language. Nothing is stored between operations: the handlers are
+    looked up in the shared DISPATCH_TABLE by the types of the operands and the operation, and each node
+    keeps the handler for the types it saw last in its inline cache. An instance only keeps the error
+    manager it reports to, so it can be shared by threads and nested calls. The operations take and
+    return plain values.
+    """
+
     def __init__(self, error_manager):
         self._error_manager = error_manager
 
+    @staticmethod
+    def _handler(node, left_type, right_type, operation):
+        # The cache is replaced rather than changed, so a reader never sees the types of one entry with
+        # the handler of another.
+        cache = node.inline_cache
+        if cache is not None and cache.left_type is left_type and cache.right_type is right_type:
+            cache.hits += 1
+            return cache.handler
+        handler = dispatch(left_type, right_type, operation)
+        hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+        node.inline_cache = InlineCache(left_type, right_type, handler, hits, misses + 1)
+        return handler
+
     def compare_values(self, left, right, comparison):
-        self._left = left
-        self._right = right
-        self._operator = comparison.operator
-        result = self._try_compare_currency()
-        if result is None:
-            result = self._try_compare_numbers()
-        if result is None:
-            result = self._try_compare_bools()
-        if result is None:
-            result = self._try_compare_strings()
-        if result is None:
-            error = WrongTypeForOperation(position=comparison.position, name=(type(self._left), type(self._right)))
-            self._error_manager.fatal_error(error)
-        return Reference(value=result)
-
-    def calculate_result(self, left, right, expression, method):
-        self._left = left
-        self._right = right
-        self._position = expression.position
-        self._concatenating = isinstance(expression, AddExpression)
-        self._method = method
-        result = self._try_calculate_currency()
-        if result is None:
-            result = self._try_calculate_numbers()
-        if result is None:
-            result = self._try_concatenate_strings()
-        if result is None:
-            error = WrongTypeForOperation(position=expression.position, name=(type(self._left), type(self._right)))
-            self._error_manager.fatal_error(error)
-        return Reference(value=result)
+        handler = self._handler(comparison, type(left), type(right), comparison.operator)
+        return handler(left, right, comparison, self._error_manager)
+
+    def calculate_result(self, left, right, expression):
+        handler = self._handler(expression, type(left), type(right), type(expression))
+        return handler(left, right, expression, self._error_manager)
 
     def negate_value(self, right, expression):
-        self._right = right
-        result = self._try_negate_number()
-        if result is None:
-            result = self._try_negate_bool()
-        if result is None:
-            result = self._try_negate_currency()
-        if result is None:
-            error = WrongTypeForOperation(position=expression.position, name=(type(self._left), type(self._right)))
-            self._error_manager.fatal_error(error)
-        return Reference(value=result)
-
-    def handle_relations(self, left, right, expression, method):
-        if type(left) is not bool or type(right) is not bool:
+        handler = dispatch(None, type(right), NegatedExpression)
+        return handler(right, expression, self._error_manager)
+
+    def handle_relations(self, left, right, expression):
+        handler = dispatch(type(left), type(right), type(expression))
+        return handler(left, right, expression, self._error_manager)
+
+    def check_currency_operands(self, left, right, expression):
+        if isinstance(left, CURRENCY_TYPES) != isinstance(right, CURRENCY_TYPES):
+            error = WrongTypeForOperation(position=expression.position, name=(type(left), type(right)))
+            raise self._error_manager.fatal_error(error)
+
+    def check_divisor(self, left, right, expression):
+        if right == 0 or right == 0.0:
+            error = DivisionByZero(position=expression.position, name=None)
+            raise self._error_manager.fatal_error(error)
+        if isinstance(right, CURRENCY_TYPES):
+            error = WrongTypeForOperation(position=expression.position, name=(type(left), type(right)))
+            raise self._error_manager.fatal_error(error)
+
+    def check_power_base(self, left, right, expression):
+        if type(left) not in NUMBER_TYPES:
             error = WrongTypeForOperation(position=expression.position, name=(type(left), type(right)))
-            self._error_manager.fatal_error(error)
-        return Reference(value=method(left, right))
-
-
-    def _check_number_size(self, value):
-        if value > sys.maxsize or value < (-1) * sys.maxsize:
-            error = ValueSizeExceed(position=self._position)
-            self._error_manager.fatal_error(error)
-
-    def _try_compare_currency(self):
-        if not isinstance(self._left, Currency) and not isinstance(self._right, Currency):
-            return
-        exchange = exchange_rates[self._left.type][self._right.type]
-        value = self._left.value * exchange
-        method = NUMBER_OPERATOR_MAPPING.get(self._operator)
-        if not method:
-            return
-        return method(value, self._right.value)
-
-    def _try_compare_numbers(self):
-        if type(self._left) not in NUMBER_TYPES and type(self._right) not in NUMBER_TYPES:
-            return
-        method = NUMBER_OPERATOR_MAPPING.get(self._operator)
-        if not method:
-            return
-        return method(self._left, self._right)
-
-    def _try_compare_bools(self):
-        if type(self._left) is not bool and type(self._right) is not bool:
-            return
-        method = BOOL_OPERATOR_MAPPING.get(self._operator)
-        if not method:
-            return
-        return method(self._left, self._right)
-    
-    def _try_compare_strings(self):
-        if type(self._left) not in STR_TYPES or type(self._right) not in STR_TYPES:
-            return
-        method = STRING_OPERATOR_MAPPING.get(self._operator)
-        if not method:
-            return
-        return method(self._left, self._right)
-
-    def _try_calculate_numbers(self):
-        if type(self._left) not in NUMBER_TYPES or type(self._right) not in NUMBER_TYPES:
-            return
-        value = self._method(self._left, self._right)
-        self._check_number_size(value)
-        return value
-    
-    def _transfer(self):
-        if self._right in CURRENCY and isinstance(self._left, Currency):
-            exchange = exchange_rates[self._left.type][self._right]
-            value = self._left.value * exchange
-            self._check_number_size(value)
-            return Currency(value, self._right)
-        elif isinstance(self._left, Currency) and isinstance(self._right, Currency):
-            exchange = exchange_rates[self._left.type][self._right.type]
-            value = self._left.value * exchange + self._right.value
-            self._check_number_size(value)
-            return Currency(value, self._right.type)
-        
-    def _operate_on_Currency(self):
-        if(self._right.type != self._left.type):
-            exchange = exchange_rates[self._right.type][self._left.type]
-            value = self._method(self._left.value, self._right.value * exchange)
-            self._check_number_size(value)
-            return Currency(value, self._left.type)
-        value = self._method(self._left.value, self._right.value)
-        self._check_number_size(value)
-        return Currency(value, self._left.type)
-        
-    def _try_calculate_currency(self):
-        if not isinstance(self._left, Currency) and not isinstance(self._right, Currency):
-            return
-        if self._method == "tran":
-            return self._transfer()
-        if type(self._left) in NUMBER_TYPES and isinstance(self._right, Currency):
-            value = self._method(self._left, self._right.value)
-            self._check_number_size(value)
-            return Currency(value, self._right.type)
-        elif type(self._right) in NUMBER_TYPES and isinstance(self._left, Currency):
-            value = self._method(self._left.value, self._right)
-            self._check_number_size(value)
-            return Currency(value, self._left.type)
-        elif isinstance(self._right, Currency) and isinstance(self._left, Currency):
-            return self._operate_on_Currency()
-        return
-
-    def _try_concatenate_strings(self):
-        if type(self._left) not in STR_TYPES or type(self._right) not in STR_TYPES or not self._concatenating:
-            return
-        return self._method(self._left, self._right)
-
-    def _try_negate_number(self):
-        if type(self._right) not in NUMBER_TYPES:
-            return
-        return self._right * -1
-
-    def _try_negate_bool(self):
-        if type(self._right) is not bool:
-            return
-        return not self._right
-
-    def _try_negate_currency(self):
-        if not isinstance(self._right, Currency):
-            return
-        return Currency(-self._right.value, self._right.type)
\ No newline at end of file
+            raise self._error_manager.fatal_error(error)
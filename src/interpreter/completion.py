@@ -0,0 +1,7 @@
+# Completions of a statement other than the normal one, which is None. A statement returns the
+# completion it ends with, so blocks and loops only check for it when a statement ended abnormally.
+BREAK = 1
+CONTINUE = 2
+RETURN = 3
+# A return of the value of a call of a user function, which is left to the caller to run.
+TAIL_CALL = 4
@@ -0,0 +1,58 @@
+import sys
+import threading
+
+from error_manager.interpreter_er import RecursionTooDeep
+
+
+# Nested calls of the interpreted program every backend allows, the bytecode VM counts its frames and
+# the others get a recursion limit of this many calls.
+MAX_CALL_DEPTH = 1_000_000
+# A plain call takes 13 to 15 Python frames of the tree-walker, 6 of the closures and 1 of a transpiled
+# module. The limits leave little more room than that, as every frame of a runaway recursion takes memory:
+# a million calls of the tree-walker take over 2 GB.
+FRAMES_PER_CALL = {
+    'tree': 16,
+    'bytecode': 1,
+    'closures': 7,
+    'python': 2
+}
+# The stack of the thread is only reserved, the pages are used as it grows.
+STACK_SIZE = 1 << 30
+
+
+def recursion_limit(backend):
+    return MAX_CALL_DEPTH * FRAMES_PER_CALL[backend]
+
+
+def run_on_deep_stack(function, *arguments, recursion_limit=MAX_CALL_DEPTH, error_manager=None):
+    """
+    Calls the function on a thread with a large stack and the given recursion limit, so that deep
+    recursion of the interpreted program does not end with a RecursionError. Returns the result of the
+    function or raises its exception in the calling thread. With an error manager, running out of the
+    recursion limit or of memory is reported as a RecursionTooDeep error.
+    """
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = function(*arguments)
+        except BaseException as exception:
+            outcome['exception'] = exception
+
+    previous_limit = sys.getrecursionlimit()
+    stack_size = threading.stack_size(STACK_SIZE)
+    try:
+        sys.setrecursionlimit(recursion_limit)
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+    finally:
+        threading.stack_size(stack_size)
+        sys.setrecursionlimit(previous_limit)
+    if (exception := outcome.pop('exception', None)) is not None:
+        if error_manager is not None and isinstance(exception, (RecursionError, MemoryError)):
+            # The traceback keeps all the frames of the recursion alive.
+            del exception
+            raise error_manager.fatal_error(RecursionTooDeep(position=None, name=MAX_CALL_DEPTH))
+        raise exception
+    return outcome.get('result')
@@ -0,0 +1,59 @@
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Callable, Optional
+
+from parse_objects.objects import Expression, LazyBlock
+
+
+@dataclass
+class InlineCache:
+    """
+    Monomorphic cache of one operation node: the operand types seen last and the handler of the
+    dispatch table for them. A miss replaces the whole entry, only the counters change in place.
+    """
+    left_type: Optional[type] = None
+    right_type: Optional[type] = None
+    handler: Optional[Callable] = None
+    hits: int = 0
+    misses: int = 0
+
+
+def collect_inline_caches(node):
+    """
+    Yields the operation nodes under the node which have an inline cache. Function bodies which
+    were never parsed are skipped.
+    """
+    if isinstance(node, LazyBlock):
+        if not node.materialized:
+            return
+        node = node.materialize()
+    if isinstance(node, (list, tuple)):
+        for item in node:
+            yield from collect_inline_caches(item)
+        return
+    if isinstance(node, dict):
+        yield from collect_inline_caches(list(node.values()))
+        return
+    if not is_dataclass(node) or isinstance(node, type):
+        return
+    if isinstance(node, Expression) and node.inline_cache is not None:
+        yield node
+    for node_field in fields(node):
+        # Fields set by later passes, e.g. the function a name refers to, are not part of the tree.
+        if node_field.compare:
+            yield from collect_inline_caches(getattr(node, node_field.name))
+
+
+def format_inline_cache_stats(program):
+    lines = []
+    hits = misses = 0
+    for node in collect_inline_caches(program):
+        cache = node.inline_cache
+        hits += cache.hits
+        misses += cache.misses
+        types = f'({cache.left_type.__name__}, {cache.right_type.__name__})'
+        position = f'{node.position.line}:{node.position.column}' if node.position else '?'
+        lines.append(f'{position:<8} {type(node).__name__:<16} {types:<22} {cache.hits:>10} hits {cache.misses:>8} misses')
+    total = hits + misses
+    rate = hits / total * 100 if total else 0.0
+    lines.append(f'inline caches: {hits} hits, {misses} misses, {rate:.1f}% specialized')
+    return '\n'.join(lines)
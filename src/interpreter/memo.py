@@ -0,0 +1,76 @@
+from collections import OrderedDict
+
+from currency.currency import Currency, CurrencyCode, Money
+from interpreter.reference import value_of
+
+
+DEFAULT_MEMO_SIZE = 1024
+MISSING = object()
+
+
+class MemoCache:
+    """
+    Least recently used cache of the results of one pure function, keyed on the values of the
+    arguments. An entry also keeps the call position the call left, which an error reported by the
+    caller may show.
+    """
+
+    def __init__(self, max_size=DEFAULT_MEMO_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key, MISSING)
+        if entry is MISSING:
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def store(self, key, entry):
+        self._entries[key] = entry
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+def memo_key(arguments):
+    """
+    Returns the key of the argument values, or None when one of them cannot be a key. Values which are
+    equal but of different types, like 1, 1.0 and True, get different keys.
+    """
+    key = []
+    for argument in arguments:
+        value = value_of(argument)
+        if type(value) is Currency:
+            key.append((Currency, type(value.value), value.value, value.type))
+        elif type(value) is Money:
+            key.append((Money, value.minor, value.type))
+        elif type(value) in (int, float, bool, str, bytes, CurrencyCode):
+            key.append((type(value), value))
+        else:
+            return None
+    return tuple(key)
+
+
+def format_memo_stats(program):
+    lines = []
+    hits = misses = evictions = 0
+    for name, function_definition in program.functions.items():
+        if (memo := function_definition.memo) is None:
+            continue
+        hits += memo.hits
+        misses += memo.misses
+        evictions += memo.evictions
+        lines.append(f'{name:<20} {memo.hits:>10} hits {memo.misses:>8} misses {memo.evictions:>8} evictions {len(memo):>6} entries')
+    total = hits + misses
+    rate = hits / total * 100 if total else 0.0
+    lines.append(f'memoized functions: {hits} hits, {misses} misses, {evictions} evictions, {rate:.1f}% hit rate')
+    return '\n'.join(lines)
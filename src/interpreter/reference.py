@@ -4,4 +4,17 @@ from typing import Any, Self
 
 @dataclass
 class Reference:
-    value: Any
\ No newline at end of file
+    """
+    Storage cell of a variable. Arguments are passed as the cells of the variables given, so
+    a function changing a parameter changes the variable of the caller. Every other value is
+    passed around as the Python object itself.
+    """
+    value: Any
+
+
+def wrap(value):
+    return value if type(value) is Reference else Reference(value=value)
+
+
+def value_of(value):
+    return value.value if type(value) is Reference else value
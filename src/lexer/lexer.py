@@ -1,9 +1,8 @@
 
 import sys
 
-from copy import copy
-
 from lexer.interface import Lexer
+from lexer.source import CharacterSource, BufferedSource
 from tokkens.token import (
     Token,
     TokenType,
@@ -13,6 +12,8 @@ from tokkens.token import (
     KEY_MAPPING,
     ESCAPE_CHARACTERS
 )
+from currency.registry import CURRENCY_REGISTRY
+from currency.money import DecimalLiteral
 from error_manager.lexer_er import (
     Overflow,
     StringTooLong,
@@ -27,20 +28,24 @@ from error_manager.lexer_er import (
 class Lexer(Lexer):
     token = None
 
-    def __init__(self, source, error_handler, str_len_limit):
-        self._source = source
+    def __init__(self, source, error_handler, str_len_limit, start_position=None, newline_symbol=None, money=False):
+        self._source = source if isinstance(source, CharacterSource) else BufferedSource(source)
+        self._money = money
+        self._buffer = ''
+        self._index = 0
         self._error_handler = error_handler
         self._str_len_limit = str_len_limit
         self._character = None
-        self._current_position = Position(line=1, column=1)
-        self._token_start_position = Position(line=1, column=1)
-        self._newline_symbol = None
+        start_position = start_position or Position(line=1, column=1)
+        self._current_position = Position(line=start_position.line, column=start_position.column)
+        self._token_start_position = Position(line=start_position.line, column=start_position.column)
+        self._newline_symbol = newline_symbol
         self._next_character()
 
     def next(self):
         while self._character and self._character.isspace():
             self._next_character()
-        self._token_start_position = copy(self._current_position)
+        self._token_start_position = Position(line=self._current_position.line, column=self._current_position.column)
         token = self._try_build_end_of_text() or \
             self._try_build_simple_token() or \
             self._try_build_number() or \
@@ -51,33 +56,55 @@ class Lexer(Lexer):
             self._try_build_unknown()
         return token
 
+    @property
+    def newline_symbol(self):
+        return self._newline_symbol
+
     def _next_character(self):
         if self._character == '\n':
             self._current_position.line += 1
             self._current_position.column = 1
         elif self._character:
             self._current_position.column += 1
-        self._character = self._source.read(1)
-        if self._character in ['\n', '\r']:
-            self._build_next_line()
+        if self._index < len(self._buffer) or self._read_block():
+            self._character = self._buffer[self._index]
+            self._index += 1
+            if self._character in '\n\r':
+                self._build_next_line()
+        else:
+            self._character = ''
+
+    def _read_block(self):
+        self._buffer = self._source.read_block()
+        self._index = 0
+        return self._buffer
+
+    def _read_next_character(self):
+        if self._index < len(self._buffer) or self._read_block():
+            self._index += 1
+            return self._buffer[self._index - 1]
+        return ''
+
+    def _peek_next_character(self):
+        if self._index < len(self._buffer) or self._read_block():
+            return self._buffer[self._index]
+        return ''
 
     def _build_next_line(self):
-        if self._character in ['\n', '\r']:
-            if self._newline_symbol is None:
-                newline_symbol = self._character
-                potential_newline = self._source.read(1)
-                if potential_newline in ['\n', '\r'] and newline_symbol + potential_newline in ['\r\n', '\n\r']:
-                    self._newline_symbol = (newline_symbol + potential_newline)
-                    self._character = '\n'
-                    self._current_position.column = 1
-                elif newline_symbol == '\n':
-                    self._newline_symbol = '\n'
-                    self._source.seek(self._source.tell() - 1)
-            else:
-                newline_symbol = self._character
-                if len(self._newline_symbol) == 2:
-                    self._character = self._source.read(1)
-                    newline_symbol += self._character
+        if self._newline_symbol is None:
+            newline_symbol = self._character + self._peek_next_character()
+            if newline_symbol in ['\r\n', '\n\r']:
+                self._read_next_character()
+                self._newline_symbol = newline_symbol
+                self._character = '\n'
+                self._current_position.column = 1
+            elif self._character == '\n':
+                self._newline_symbol = '\n'
+        elif len(self._newline_symbol) == 2:
+            # Only the partner of the newline is consumed, a lone '\n' or '\r' is a newline by itself.
+            if self._character + self._peek_next_character() == self._newline_symbol:
+                self._read_next_character()
+            self._character = '\n'
 
     def _try_build_end_of_text(self):
         if not self._character:
@@ -119,6 +146,7 @@ class Lexer(Lexer):
                     return Token(value=value, position=self._token_start_position, type=TokenType.ERROR)
                 self._next_character()
         if not self._character == '.':
+            value = DecimalLiteral(value, 0, 0) if self._money else value
             return Token(value=value, position=self._token_start_position, type=TokenType.INT)
         number_of_decimals = 0
         fraction = 0
@@ -129,7 +157,10 @@ class Lexer(Lexer):
                 return Token(value=value, position=self._token_start_position, type=TokenType.ERROR)
             number_of_decimals += 1
             self._next_character()
-        value = value + fraction * pow(10, -number_of_decimals)
+        if self._money:
+            value = DecimalLiteral(value, fraction, number_of_decimals)
+        else:
+            value = value + fraction * pow(10, -number_of_decimals)
         return Token(value=value, position=self._token_start_position, type=TokenType.FLOAT)
 
     def _try_build_identifier_or_keyword(self):
@@ -146,6 +177,9 @@ class Lexer(Lexer):
             identifier.append(self._character)
             self._next_character()
         identifier = ''.join(identifier)
+        # Currency codes come from the registry, so they are not among the keywords.
+        if (code := CURRENCY_REGISTRY.code_of(identifier)) is not None:
+            return Token(value=code, position=self._token_start_position, type=TokenType.CURR)
         type = KEY_MAPPING.get(identifier, None) or TokenType.ID
         return Token(value=identifier, position=self._token_start_position, type=type)
 
@@ -0,0 +1,300 @@
+import re
+import sys
+
+from lexer.interface import Lexer
+from lexer.source import CharacterSource, BufferedSource
+from tokkens.token import (
+    Token,
+    TokenType,
+    Position,
+    SYMBOL_MAPPING,
+    OPERATOR_MAPPING,
+    KEY_MAPPING,
+    ESCAPE_CHARACTERS
+)
+from currency.registry import CURRENCY_REGISTRY
+from currency.money import DecimalLiteral
+from error_manager.lexer_er import (
+    Overflow,
+    StringTooLong,
+    InfiniteString,
+    UnknownTokens,
+    NameTooLong,
+    CommentTooLong,
+    TooLongLine
+)
+
+
+def _build_master_pattern():
+    double_operators = sorted((operator for operator in OPERATOR_MAPPING if len(operator) == 2), reverse=True)
+    single_operators = {operator[0] for operator in OPERATOR_MAPPING}
+    operators = [re.escape(operator) for operator in double_operators]
+    operators.append('[' + ''.join(re.escape(operator) for operator in sorted(single_operators)) + ']')
+    symbols = '[' + ''.join(re.escape(symbol) for symbol in SYMBOL_MAPPING) + ']'
+    return re.compile(r'\s*(?:' + '|'.join([
+        r'(?P<word>[^\W\d]\w*)',
+        f'(?P<symbol>{symbols})',
+        f'(?P<operator>{"|".join(operators)})',
+        r'(?P<number>\d+)',
+        r'(?P<comment>#[^\n]*)',
+        r"(?P<string>')",
+        r'(?P<unknown>\S)'
+    ]) + ')')
+
+
+MASTER_PATTERN = _build_master_pattern()
+DIGITS_PATTERN = re.compile(r'\d*')
+# A two character newline, or a lone '\n' or '\r' which is a newline by itself, by the newline symbol.
+PAIRED_NEWLINE_PATTERNS = {symbol: re.compile(f'{symbol}|[\r\n]') for symbol in ['\r\n', '\n\r']}
+NEWLINE_PATTERN = re.compile(r'[\r\n]')
+SAFE_NUMBER_LENGTH = 18
+COMPACT_THRESHOLD = 1 << 14
+
+
+class NewlineNormalizer:
+    """
+    Rewrites the newlines of consecutive text blocks to a single '\\n', following the same detection
+    rules as the character lexer: the first newline decides between '\\n', '\\r\\n' and '\\n\\r'.
+    """
+
+    def __init__(self, newline_symbol=None):
+        self.newline_symbol = newline_symbol
+        self._pending = ''
+
+    def feed(self, text, final):
+        text = self._pending + text
+        self._pending = ''
+        if self.newline_symbol is None:
+            return self._detect(text, final)
+        if len(self.newline_symbol) == 1:
+            return text
+        return self._collapse(text, final)
+
+    def _detect(self, text, final):
+        start = 0
+        while match := NEWLINE_PATTERN.search(text, start):
+            index = match.start()
+            if index + 1 == len(text) and not final:
+                self._pending = text[index:]
+                return text[:index]
+            newline_symbol = text[index:index + 2]
+            if newline_symbol in ['\r\n', '\n\r']:
+                self.newline_symbol = newline_symbol
+                return text[:index] + self._collapse(text[index:], final)
+            if text[index] == '\n':
+                self.newline_symbol = '\n'
+                return text
+            start = index + 1
+        return text
+
+    def _collapse(self, text, final):
+        # The first character of the newline at the end of a block waits for the next one, which may be
+        # its partner.
+        if not final and text.endswith(self.newline_symbol[0]):
+            self._pending = text[-1]
+            text = text[:-1]
+        return PAIRED_NEWLINE_PATTERNS[self.newline_symbol].sub('\n', text)
+
+
+class RegexLexer(Lexer):
+    """
+    Lexer scanning with one compiled master pattern built from the token mappings. It produces the
+    same tokens and errors as the character lexer, but recognises whole tokens in a single regex match.
+    """
+
+    def __init__(self, source, error_handler, str_len_limit, start_position=None, newline_symbol=None, money=False):
+        self._source = source if isinstance(source, CharacterSource) else BufferedSource(source)
+        self._money = money
+        self._error_handler = error_handler
+        self._str_len_limit = str_len_limit
+        self._normalizer = NewlineNormalizer(newline_symbol)
+        self._text = ''
+        self._position = 0
+        self._base = 0
+        self._line = start_position.line if start_position else 1
+        self._line_start = 1 - start_position.column if start_position else 0
+        self._end_of_source = False
+        self._token_builders = {
+            'number': self._build_number,
+            'comment': self._build_comment,
+            'string': self._build_string,
+            'unknown': self._build_unknown
+        }
+
+    def next(self):
+        if self._position > COMPACT_THRESHOLD:
+            self._compact()
+        text = self._text
+        match = MASTER_PATTERN.match(text, self._position)
+        while match is None or match.end() == len(text):
+            if not self._extend():
+                break
+            text = self._text
+            match = MASTER_PATTERN.match(text, self._position)
+        if match is None:
+            self._advance(len(text))
+            return Token(value=None, position=self._current_position(), type=TokenType.EOF)
+        kind = match.lastgroup
+        start = match.start(kind)
+        if start != self._position:
+            self._advance(start)
+        position = Position(line=self._line, column=self._base + start - self._line_start + 1)
+        if kind == 'word':
+            value = match.group(kind)
+            if len(value) <= self._str_len_limit and (value[0].isalpha() or value[0] == '_'):
+                self._position = match.end()
+                if (code := CURRENCY_REGISTRY.code_of(value)) is not None:
+                    return Token(value=code, position=position, type=TokenType.CURR)
+                return Token(value=value, position=position, type=KEY_MAPPING.get(value, None) or TokenType.ID)
+            return self._build_word(value, position)
+        if kind == 'symbol':
+            value = match.group(kind)
+            self._position = match.end()
+            return Token(value=value, position=position, type=SYMBOL_MAPPING[value])
+        if kind == 'operator':
+            value = match.group(kind)
+            self._position = match.end()
+            return Token(value=value, position=position, type=OPERATOR_MAPPING.get(value, None))
+        return self._token_builders[kind](match.group(kind), position)
+
+    @property
+    def newline_symbol(self):
+        return self._normalizer.newline_symbol
+
+    def _compact(self):
+        self._text = self._text[self._position:]
+        self._base += self._position
+        self._position = 0
+
+    def _extend(self):
+        while not self._end_of_source:
+            block = self._source.read_block()
+            self._end_of_source = not block
+            text = self._normalizer.feed(block, final=self._end_of_source)
+            if text:
+                self._text += text
+                return True
+        return False
+
+    def _character(self, index):
+        if index >= len(self._text) and not self._extend():
+            return ''
+        return self._text[index]
+
+    def _current_position(self):
+        return Position(line=self._line, column=self._base + self._position - self._line_start + 1)
+
+    def _advance(self, end):
+        newlines = self._text.count('\n', self._position, end)
+        if newlines:
+            self._line += newlines
+            self._line_start = self._base + self._text.rindex('\n', self._position, end) + 1
+        self._position = end
+
+    def _save_error(self, error):
+        if not self._error_handler.save_error(error):
+            raise Exception('Error handler is full')
+
+    def _build_word(self, value, position):
+        if not (value[0].isalpha() or value[0] == '_'):
+            return self._build_unknown(value, position)
+        value = value[:self._str_len_limit]
+        self._save_error(NameTooLong(position=position, name=value[:20]))
+        self._position += self._str_len_limit
+        return Token(value=value, position=position, type=TokenType.ID)
+
+    def _build_comment(self, value, position):
+        value = value[1:self._str_len_limit + 1]
+        if self._character(self._position + len(value) + 1) not in ['', '\n']:
+            self._save_error(CommentTooLong(position=position, name=value[:20]))
+        self._position += len(value) + 1
+        return Token(value=value, position=position, type=TokenType.COMMENT)
+
+    def _build_unknown(self, value, position):
+        value = value[0]
+        self._save_error(UnknownTokens(position=position, name=value))
+        self._position += 1
+        return Token(value=value, position=position, type=TokenType.ERROR)
+
+    def _build_number(self, digits, position):
+        if int(digits[0]) == 0:
+            digits = digits[0]
+        elif len(digits) > SAFE_NUMBER_LENGTH:
+            valid, value, index = self._accumulate_digits(int(digits[0]), self._position + 1, position)
+            self._position = index
+            if not valid:
+                return Token(value=value, position=position, type=TokenType.ERROR)
+            return self._build_fraction(value, position)
+        self._position += len(digits)
+        return self._build_fraction(int(digits), position)
+
+    def _build_fraction(self, value, position):
+        if self._character(self._position) != '.':
+            value = DecimalLiteral(value, 0, 0) if self._money else value
+            return Token(value=value, position=position, type=TokenType.INT)
+        fraction_match = DIGITS_PATTERN.match(self._text, self._position + 1)
+        while fraction_match.end() == len(self._text) and self._extend():
+            fraction_match = DIGITS_PATTERN.match(self._text, self._position + 1)
+        digits = fraction_match.group()
+        if len(digits) > SAFE_NUMBER_LENGTH:
+            valid, fraction, index = self._accumulate_digits(0, self._position + 1, position)
+            self._position = index
+            if not valid:
+                return Token(value=value, position=position, type=TokenType.ERROR)
+        else:
+            fraction = int(digits) if digits else 0
+            self._position = fraction_match.end()
+        if self._money:
+            value = DecimalLiteral(value, fraction, len(digits))
+        else:
+            value = value + fraction * pow(10, -len(digits))
+        return Token(value=value, position=position, type=TokenType.FLOAT)
+
+    def _accumulate_digits(self, value, index, position):
+        while (character := self._character(index)).isdecimal():
+            decimal = int(character)
+            if (sys.maxsize - decimal) / 10 - value <= 0:
+                value = str(value)
+                while (character := self._character(index)).isdecimal() or character == '.':
+                    value += character
+                    index += 1
+                self._save_error(Overflow(position=position, name=value))
+                return False, value, index
+            value = value * 10 + decimal
+            index += 1
+        return True, value, index
+
+    def _build_string(self, value, position):
+        literal = [''.encode()]
+        index = self._position + 1
+        while (character := self._character(index)) != '\'':
+            if not character:
+                self._save_error(InfiniteString(position=position, name=None))
+                break
+            if len(literal) == self._str_len_limit:
+                error = StringTooLong(position=position, name=b''.join(literal[:20]))
+                index = self._skip_string(index, error, position)
+                break
+            escaped_character = None
+            if character == '\\':
+                index += 1
+                character = self._character(index)
+                escaped_character = ESCAPE_CHARACTERS.get(character, None)
+            if escaped_character:
+                literal.append(escaped_character)
+            else:
+                literal.append(character.encode())
+            index = min(index + 1, len(self._text))
+        self._advance(min(index + 1, len(self._text)))
+        return Token(value=b''.join(literal), position=position, type=TokenType.STR)
+
+    def _skip_string(self, index, error, position):
+        self._save_error(error)
+        loop_count = 0
+        while (character := self._character(index)) and character != '\'' and loop_count < 4 * self._str_len_limit:
+            loop_count += 1
+            index += 1
+        if loop_count == 4 * self._str_len_limit:
+            error = TooLongLine(position=position, value=None)
+            self._error_handler.fatal_error(error)
+        return index
@@ -0,0 +1,108 @@
+import os
+import io
+import stat
+import mmap
+import codecs
+
+from abc import ABCMeta, abstractmethod
+
+
+BLOCK_SIZE = 1 << 16
+
+
+class CharacterSource(metaclass=ABCMeta):
+    """
+    The CharacterSource class is an abstract base class for the text inputs consumed by the lexer.
+    Sources hand out the text in blocks, the lexer keeps the current block in memory and walks it
+    character by character, so it never has to seek in the underlying input.
+    """
+
+    @abstractmethod
+    def read_block(self):
+        """
+        Returns the next non-empty part of the text, or an empty string at the end of the text.
+        """
+        ...
+
+
+class StreamSource(CharacterSource):
+    """
+    Reads a text stream one character at a time. Kept as the reference implementation and for
+    interactive inputs, where reading ahead a whole block would wait for more data.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def read_block(self):
+        return self._stream.read(1)
+
+
+class TextSource(CharacterSource):
+    """
+    Hands out a text that is already in memory as a single block.
+    """
+
+    def __init__(self, text):
+        self._text = text
+
+    def read_block(self):
+        text = self._text
+        self._text = ''
+        return text
+
+
+class BufferedSource(CharacterSource):
+    """
+    Reads a text stream in large blocks. Only sequential reads are used, so pipes and other
+    non-seekable streams are supported.
+    """
+
+    def __init__(self, stream, block_size=BLOCK_SIZE):
+        self._stream = stream
+        self._block_size = block_size
+
+    def read_block(self):
+        return self._stream.read(self._block_size)
+
+
+class MmapSource(CharacterSource):
+    """
+    Memory-maps a regular file and decodes it block by block, so the file is never copied as a whole
+    into the process memory.
+    """
+
+    def __init__(self, fileno, encoding='utf-8', block_size=BLOCK_SIZE):
+        self._map = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._block_size = block_size
+        self._offset = 0
+
+    def read_block(self):
+        size = len(self._map)
+        while self._offset < size:
+            chunk = self._map[self._offset:self._offset + self._block_size]
+            self._offset += len(chunk)
+            text = self._decoder.decode(chunk, final=self._offset >= size)
+            if text:
+                return text
+        return ''
+
+    def close(self):
+        self._map.close()
+
+
+def open_source(stream, use_mmap=True):
+    """
+    Picks the fastest character source for the given text stream: a memory map for non-empty regular
+    files and a block buffer for everything else (pipes, sockets, in-memory streams).
+    """
+    if use_mmap:
+        try:
+            fileno = stream.fileno()
+            status = os.fstat(fileno)
+            if stat.S_ISREG(status.st_mode) and status.st_size > 0 and stream.tell() == 0:
+                return MmapSource(fileno, encoding=stream.encoding or 'utf-8')
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            pass
+    return BufferedSource(stream)
@@ -1,21 +1,228 @@
 import sys
+import argparse
+from functools import partial
 
 from lexer.lexer import Lexer
+from lexer.regex_lexer import RegexLexer
+from lexer.source import open_source, TextSource
 from parser.parser import Parser
+from parser.lazy import LazySource, materialize_all
+from resolver.purity import memoize_pure_functions
+from optimizer.constant_folding import fold_constants, folding_version
+from optimizer.loop_invariants import hoist_loop_invariants
+from optimizer.inlining import inline_small_functions, DEFAULT_INLINE_SIZE
+from optimizer.specialization import specialize_functions, DEFAULT_MAX_CLONES
+from cache.program_cache import ProgramCache, source_digest, DEFAULT_CACHE_DIRECTORY, DEFAULT_CACHE_SIZE
+from cache.code_cache import CodeCache
+from currency.providers import rate_provider
+from currency.refresher import RateCache, RateRefresher, DEFAULT_RATES_TTL
+from currency.registry import CURRENCY_REGISTRY
+from currency.history import open_rate_history
+from version import INTERPRETER_VERSION, TRANSPILER_VERSION
 from error_manager.error_manager import ModulErrorManager, FatalError
+from interpreter.inline_cache import format_inline_cache_stats
+from interpreter.deep_stack import run_on_deep_stack, recursion_limit
+from interpreter.memo import DEFAULT_MEMO_SIZE, format_memo_stats
 from visitor.interpreter_visitor import InterpreterVisitor
+from bytecode.vm import VirtualMachine
+from closures.engine import ClosureEngine
+from transpiler.codegen import transpile
+from transpiler.runtime import execute
+
+
+LEXERS = {
+    'default': Lexer,
+    'regex': RegexLexer
+}
+
+
+def run_tree_walker(program, error_handler):
+    program.accept(InterpreterVisitor(error_handler))
+
+
+def run_bytecode(program, error_handler):
+    VirtualMachine(error_handler).execute(program)
+
+
+def run_closures(program, error_handler):
+    ClosureEngine(error_handler).execute(program)
+
+
+def run_python(program, error_handler):
+    execute(*transpile(program), error_handler)
+
+
+BACKENDS = {
+    'tree': run_tree_walker,
+    'bytecode': run_bytecode,
+    'closures': run_closures,
+    'python': run_python
+}
+
+
+def parse_arguments():
+    argument_parser = argparse.ArgumentParser(description='Interpreter of the language with a currency type')
+    argument_parser.add_argument('path', help='path to the source file')
+    argument_parser.add_argument('--lexer', choices=LEXERS, default='default', help='lexer implementation')
+    argument_parser.add_argument('--backend', choices=BACKENDS, default='tree', help='program execution engine')
+    argument_parser.add_argument('--lazy', action='store_true', help='parse function bodies on their first call')
+    argument_parser.add_argument(
+        '--full-check', action='store_true', help='with --lazy, still parse all function bodies to report syntax errors'
+    )
+    argument_parser.add_argument(
+        '--inline-cache-stats', action='store_true', help='print the hits and misses of the operation inline caches'
+    )
+    argument_parser.add_argument(
+        '--money', action='store_true', help='keep currency values as integer minor units with fixed-point arithmetic'
+    )
+    argument_parser.add_argument('--no-fold', action='store_true', help='do not fold operations on constants')
+    argument_parser.add_argument(
+        '--fold-currencies', action='store_true', help='also fold operations on currencies with the current exchange rates'
+    )
+    argument_parser.add_argument(
+        '--max-clones', type=int, default=DEFAULT_MAX_CLONES,
+        help='clones of functions specialized for constant arguments, 0 disables it and so does --no-fold'
+    )
+    argument_parser.add_argument(
+        '--inline-size', type=int, default=DEFAULT_INLINE_SIZE,
+        help='largest returned expression, in nodes, of the functions inlined by the tree-walker, 0 disables it'
+    )
+    argument_parser.add_argument(
+        '--no-hoist', action='store_true', help='do not keep the values of loop invariant expressions in the tree-walker'
+    )
+    argument_parser.add_argument(
+        '--memo-size', type=int, default=DEFAULT_MEMO_SIZE,
+        help='results cached for every pure function by the tree-walker, 0 disables it and so does --lazy'
+    )
+    argument_parser.add_argument(
+        '--memo-stats', action='store_true', help='print the hits, misses and evictions of the pure function caches'
+    )
+    argument_parser.add_argument(
+        '--rates', help='URL, SQLite database or JSON or CSV file of the exchange rates, refreshed in the background'
+    )
+    argument_parser.add_argument(
+        '--rates-ttl', type=float, default=DEFAULT_RATES_TTL, help='seconds after which fetched exchange rates expire'
+    )
+    argument_parser.add_argument(
+        '--rates-history', help='file of the daily exchange rates read by rate_at and convert_at, extended by --rates'
+    )
+    argument_parser.add_argument('--no-cache', action='store_true', help='always lex and parse the source')
+    argument_parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIRECTORY, help='parsed program cache directory')
+    argument_parser.add_argument(
+        '--cache-size', type=int, default=DEFAULT_CACHE_SIZE, help='parsed program cache size limit in bytes'
+    )
+    return argument_parser.parse_args()
+
+
+def lexer_class_of(arguments):
+    return partial(LEXERS[arguments.lexer], money=True) if arguments.money else LEXERS[arguments.lexer]
+
+
+def program_version(arguments):
+    # Currency constants of the money mode are parsed into other values, so its programs are cached apart.
+    return f'{INTERPRETER_VERSION}-money' if arguments.money else INTERPRETER_VERSION
+
+
+def parse_program(arguments, source_file, error_handler):
+    lexer = lexer_class_of(arguments)(source=open_source(source_file), error_handler=error_handler, str_len_limit=256)
+    parser = Parser(lexer=lexer, error_handler=error_handler)
+    return parser.parse()
+
+
+def parse_program_lazily(arguments, source_file, error_handler):
+    text = source_file.read()
+    lexer_class = lexer_class_of(arguments)
+    lexer = lexer_class(source=TextSource(text), error_handler=error_handler, str_len_limit=256)
+    lazy_source = LazySource(text, lexer_class=lexer_class, str_len_limit=256)
+    program = Parser(lexer=lexer, error_handler=error_handler, lazy_source=lazy_source).parse()
+    if arguments.full_check:
+        materialize_all(program)
+    return program
+
+
+def load_program(arguments, source_file, error_handler):
+    if arguments.lazy:
+        return parse_program_lazily(arguments, source_file, error_handler)
+    if arguments.no_cache:
+        return parse_program(arguments, source_file, error_handler)
+    cache = ProgramCache(directory=arguments.cache_dir, max_size=arguments.cache_size, version=program_version(arguments))
+    with open(arguments.path, 'rb') as binary_file:
+        digest = source_digest(binary_file)
+    if (program := cache.load(digest)) is not None:
+        return program
+    program = parse_program(arguments, source_file, error_handler)
+    if not error_handler.error_count():
+        cache.store(digest, program)
+    return program
+
+
+def optimize_program(arguments, program):
+    if not arguments.no_fold:
+        fold_constants(program, fold_currencies=arguments.fold_currencies)
+        if arguments.max_clones > 0:
+            specialize_functions(program, arguments.max_clones, fold_currencies=arguments.fold_currencies)
+
+
+def start_rate_refresher(arguments, history):
+    cache = RateCache(directory=arguments.cache_dir, max_size=arguments.cache_size, ttl=arguments.rates_ttl)
+    refresher = RateRefresher(rate_provider(arguments.rates), cache, history=history)
+    refresher.start()
+    return refresher
+
+
+def load_code(arguments, source_file, error_handler):
+    folding = folding_version(not arguments.no_fold, arguments.fold_currencies, arguments.max_clones)
+    cache = CodeCache(
+        directory=arguments.cache_dir, max_size=arguments.cache_size,
+        version=f'{program_version(arguments)}.{TRANSPILER_VERSION}.{folding}'
+    )
+    with open(arguments.path, 'rb') as binary_file:
+        digest = source_digest(binary_file)
+    if (cached := cache.load(digest)) is not None:
+        return cached
+    program = load_program(arguments, source_file, error_handler)
+    optimize_program(arguments, program)
+    code, nodes = transpile(program)
+    if not error_handler.error_count():
+        cache.store(digest, code, nodes)
+    return code, nodes
 
 
 if __name__ == '__main__':
-    if len(sys.argv) != 2:
-        print('Add path to file')
-        sys.exit()
-    with open(str(sys.argv[1]), 'r', newline='') as source_file, ModulErrorManager() as error_handler:
+    arguments = parse_arguments()
+    program = None
+    history = open_rate_history(arguments.rates_history) if arguments.rates_history else None
+    refresher = start_rate_refresher(arguments, history) if arguments.rates else None
+    # The run keeps the rates it starts with: they are folded, memoized and kept in loops, and the cached
+    # code is stored under their version. Rates the refresher fetches meanwhile are for the next run.
+    CURRENCY_REGISTRY.pin()
+    with open(arguments.path, 'r', newline='') as source_file, ModulErrorManager() as error_handler:
         try:
-            lexer = Lexer(source=source_file, error_handler=error_handler, str_len_limit=256)
-            parser = Parser(lexer=lexer, error_handler=error_handler)
-            program = parser.parse()
-            interpreter = InterpreterVisitor(error_handler)
-            program.accept(interpreter)
+            if arguments.backend == 'python' and not (arguments.lazy or arguments.no_cache):
+                run_on_deep_stack(
+                    execute, *load_code(arguments, source_file, error_handler), error_handler,
+                    recursion_limit=recursion_limit('python'), error_manager=error_handler
+                )
+            else:
+                program = load_program(arguments, source_file, error_handler)
+                optimize_program(arguments, program)
+                if arguments.backend == 'tree' and arguments.memo_size > 0 and not arguments.lazy:
+                    memoize_pure_functions(program, arguments.memo_size)
+                if arguments.backend == 'tree' and arguments.inline_size > 0:
+                    inline_small_functions(program, arguments.inline_size)
+                # Runs last, only the tree-walker and the passes above know the InvariantExpression nodes.
+                if arguments.backend == 'tree' and not arguments.no_hoist:
+                    hoist_loop_invariants(program)
+                run_on_deep_stack(
+                    BACKENDS[arguments.backend], program, error_handler,
+                    recursion_limit=recursion_limit(arguments.backend), error_manager=error_handler
+                )
         except FatalError:
-            sys.exit()
\ No newline at end of file
+            sys.exit()
+        finally:
+            if refresher is not None:
+                refresher.stop()
+            if arguments.inline_cache_stats and program is not None:
+                print(format_inline_cache_stats(program), file=sys.stderr)
+            if arguments.memo_stats and program is not None:
+                print(format_memo_stats(program), file=sys.stderr)
@@ -0,0 +1,211 @@
+from visitor.interface import Visitor
+from error_manager.interface import ErrorManager, FatalError
+from interpreter.calculations import Calculations
+from currency.currency import Currency, Money
+from currency.registry import CURRENCY_REGISTRY
+from parse_objects.objects import (
+    Constant,
+    LazyBlock,
+    OrExpression,
+    AddExpression,
+    SubExpression,
+    DivExpression,
+    PowExpression
+)
+
+
+# Powers of integers other than -1, 0 and 1 with larger exponents exceed the size limit, and computing
+# them first may take long.
+MAX_FOLDED_EXPONENT = 64
+
+
+def folding_version(fold, fold_currencies, max_clones=0):
+    """
+    Names the folding done on a program, so that caches of compiled programs keep them apart. Folded
+    currency values depend on the exchange rates, so the version of the rates in use is a part of it, and so is
+    the number of specialized clones of functions, which are folded too.
+    """
+    if not fold:
+        return 'unfolded'
+    version = f'folded-rates{CURRENCY_REGISTRY.rates_version}' if fold_currencies else 'folded'
+    return f'{version}-clones{max_clones}' if max_clones else version
+
+
+class FoldingErrors(ErrorManager):
+    """
+    Counts the errors of an operation computed while folding. An operation which reports one is not
+    folded, so the error is reported at its own position when the program runs it.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __exit__(self, *exception):
+        pass
+
+    def save_error(self, error):
+        self.count += 1
+        return True
+
+    def fatal_error(self, error):
+        self.count += 1
+        return FatalError
+
+    def error_count(self):
+        return self.count
+
+
+class ConstantFolder(Visitor):
+    """
+    Replaces the operations on constants with the Constant of their result, computed by Calculations
+    with the checks of the tree-walker. Operations with currencies use the exchange rates, so they are
+    only folded when asked for. Every visit returns the node which replaces the visited one. Function
+    bodies which were never parsed are skipped.
+    """
+
+    def __init__(self, fold_currencies=False):
+        self._fold_currencies = fold_currencies
+        self._errors = FoldingErrors()
+        self._calculations_handler = Calculations(self._errors)
+
+    def fold(self, program):
+        for function_definition in program.functions.values():
+            block = function_definition.block
+            if not isinstance(block, LazyBlock) or block.materialized:
+                block.accept(self)
+
+    def _fold(self, node):
+        return node.accept(self) if node is not None else None
+
+    def _constant(self, expression, calculate, *operands):
+        if any(type(operand) is not Constant for operand in operands):
+            return expression
+        values = [operand.value for operand in operands]
+        if not self._fold_currencies and any(type(value) in (Currency, Money) for value in values):
+            return expression
+        self._errors.count = 0
+        try:
+            value = calculate(*values)
+        except Exception:
+            return expression
+        if self._errors.count:
+            return expression
+        return Constant(position=expression.position, value=value)
+
+    def visit_block(self, block):
+        block.statements = [statement.accept(self) for statement in block.statements]
+        return block
+
+    def visit_if_stmt(self, statement):
+        statement.condition = statement.condition.accept(self)
+        statement.true_block.accept(self)
+        if statement.else_block:
+            statement.else_block.accept(self)
+        return statement
+
+    def visit_while_stmt(self, statement):
+        statement.condition = statement.condition.accept(self)
+        statement.true_block.accept(self)
+        return statement
+
+    def visit_return_stmt(self, statement):
+        statement.expression = self._fold(statement.expression)
+        return statement
+
+    def visit_break_stmt(self, statement):
+        return statement
+
+    def visit_continue_stmt(self, statement):
+        return statement
+
+    def visit_assignment(self, assignment):
+        # The target is not evaluated, only read by name.
+        assignment.right = assignment.right.accept(self)
+        return assignment
+
+    def visit_variable_access(self, variable_access):
+        # Only the first part is evaluated, the others are attribute names.
+        variable_access.variable[0] = variable_access.variable[0].accept(self)
+        return variable_access
+
+    def visit_identifier_expression(self, identifier_expression):
+        return identifier_expression
+
+    def visit_function_call(self, fun_call):
+        fun_call.arguments = [argument.accept(self) for argument in fun_call.arguments]
+        return fun_call
+
+    def visit_inlined_call(self, inlined_call):
+        inlined_call.arguments = [argument.accept(self) for argument in inlined_call.arguments]
+        inlined_call.expression = inlined_call.expression.accept(self)
+        return inlined_call
+
+    def visit_constant(self, constant):
+        return constant
+
+    def visit_invariant_expression(self, invariant):
+        # The kept value belongs to the loop, so the expression is folded in place.
+        invariant.expression = invariant.expression.accept(self)
+        return invariant
+
+    def visit_comparison(self, comparison):
+        comparison.left = comparison.left.accept(self)
+        comparison.right = comparison.right.accept(self)
+
+        def compare(left, right):
+            return self._calculations_handler.compare_values(left, right, comparison)
+        return self._constant(comparison, compare, comparison.left, comparison.right)
+
+    def _visit_calculation(self, expression):
+        expression.left = expression.left.accept(self)
+        expression.right = expression.right.accept(self)
+        right = expression.right
+        if type(expression) is PowExpression and type(right) is Constant and type(right.value) is int \
+                and abs(right.value) > MAX_FOLDED_EXPONENT:
+            return expression
+        calculations = self._calculations_handler
+        check = {
+            AddExpression: calculations.check_currency_operands,
+            SubExpression: calculations.check_currency_operands,
+            DivExpression: calculations.check_divisor,
+            PowExpression: calculations.check_power_base
+        }.get(type(expression))
+
+        def calculate(left, right):
+            if check is not None:
+                check(left, right, expression)
+            return calculations.calculate_result(left, right, expression)
+        return self._constant(expression, calculate, expression.left, expression.right)
+
+    visit_add_expression = _visit_calculation
+    visit_sub_expression = _visit_calculation
+    visit_mul_expression = _visit_calculation
+    visit_div_expression = _visit_calculation
+    visit_pow_expression = _visit_calculation
+    visit_tran_expression = _visit_calculation
+
+    def visit_negated_expression(self, negated):
+        negated.right = negated.right.accept(self)
+
+        def negate(right):
+            return self._calculations_handler.negate_value(right, negated)
+        return self._constant(negated, negate, negated.right)
+
+    def _visit_relation(self, expression):
+        expression.left = expression.left.accept(self)
+        expression.right = expression.right.accept(self)
+        # The right operand is not evaluated when the left one decides, and the result is then true.
+        shortcut = isinstance(expression, OrExpression)
+        if type(expression.left) is Constant and expression.left.value is shortcut:
+            return Constant(position=expression.position, value=True)
+
+        def relate(left, right):
+            return self._calculations_handler.handle_relations(left, right, expression)
+        return self._constant(expression, relate, expression.left, expression.right)
+
+    visit_or_expression = _visit_relation
+    visit_and_expression = _visit_relation
+
+
+def fold_constants(program, fold_currencies=False):
+    ConstantFolder(fold_currencies).fold(program)
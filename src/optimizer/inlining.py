@@ -0,0 +1,224 @@
+from copy import deepcopy
+
+from visitor.interface import Visitor
+from visitor.interpreter_visitor import BUILTINS_LIST
+from parse_objects.objects import (
+    LazyBlock,
+    ReturnStatement,
+    InlinedCall
+)
+
+
+DEFAULT_INLINE_SIZE = 16
+
+
+class ExpressionShape(Visitor):
+    """
+    Measures an expression: the number of its nodes and whether it reads a name which is not one of
+    the given parameters.
+    """
+
+    def __init__(self, parameters):
+        self._parameters = parameters
+        self.size = 0
+        self.reads_other_names = False
+
+    def visit_variable_access(self, variable_access):
+        self.size += 1
+        # Only the first part is evaluated, the others are attribute names.
+        variable_access.variable[0].accept(self)
+
+    def visit_identifier_expression(self, identifier_expression):
+        self.size += 1
+        if identifier_expression.name not in self._parameters:
+            self.reads_other_names = True
+
+    def visit_function_call(self, fun_call):
+        self.size += 1
+        for argument in fun_call.arguments:
+            argument.accept(self)
+
+    def visit_inlined_call(self, inlined_call):
+        self.size += 1
+        for argument in inlined_call.arguments:
+            argument.accept(self)
+        self.size += ExpressionShape(inlined_call.parameters).measure(inlined_call.expression).size
+
+    def visit_constant(self, constant):
+        self.size += 1
+
+    def visit_invariant_expression(self, invariant):
+        invariant.expression.accept(self)
+
+    def _visit_operands(self, expression):
+        self.size += 1
+        expression.left.accept(self)
+        expression.right.accept(self)
+
+    visit_comparison = _visit_operands
+    visit_add_expression = _visit_operands
+    visit_sub_expression = _visit_operands
+    visit_mul_expression = _visit_operands
+    visit_div_expression = _visit_operands
+    visit_pow_expression = _visit_operands
+    visit_tran_expression = _visit_operands
+    visit_or_expression = _visit_operands
+    visit_and_expression = _visit_operands
+
+    def visit_negated_expression(self, negated):
+        self.size += 1
+        negated.right.accept(self)
+
+    def measure(self, expression):
+        expression.accept(self)
+        return self
+
+
+class Inliner(Visitor):
+    """
+    Replaces the calls of small user functions with an InlinedCall holding a copy of the expression the
+    function returns. A function is inlined when its body is a single return statement whose expression,
+    with the calls in it inlined, has at most the given number of nodes, reads only the parameters and
+    does not lead back to the function through the calls of other inlined functions. The copy keeps the
+    positions of the function, so an error in it is reported where it is in the source. Calls with
+    a wrong number of arguments are left to report it. Every visit returns the node which replaces the
+    visited one. Function bodies which were never parsed are skipped.
+    """
+
+    def __init__(self, functions, max_size=DEFAULT_INLINE_SIZE):
+        self._functions = functions
+        self._max_size = max_size
+        self._builtin_names = {name for name, _ in BUILTINS_LIST}
+        self._expressions = {}
+        self._in_progress = []
+        self._recursive = set()
+
+    def inline(self):
+        for name in self._functions:
+            self._inlinable_expression(name)
+
+    def _inlinable_expression(self, name):
+        """
+        Returns the expression returned by the function of the given name, with the calls in it inlined,
+        or None when the function is not inlined. The body of the function is inlined on first use.
+        """
+        if name in self._in_progress:
+            # Every function on the way back to this one is recursive.
+            self._recursive.update(self._in_progress[self._in_progress.index(name):])
+            return None
+        if name in self._expressions:
+            return self._expressions[name]
+        function_definition = self._functions.get(name)
+        # A user function with the name of a builtin is never called.
+        if function_definition is None or name in self._builtin_names:
+            return None
+        block = function_definition.block
+        if isinstance(block, LazyBlock) and not block.materialized:
+            return None
+        self._in_progress.append(name)
+        block.accept(self)
+        self._in_progress.pop()
+        self._expressions[name] = self._expression_of(function_definition)
+        return self._expressions[name]
+
+    def _expression_of(self, function_definition):
+        statements = function_definition.block.statements
+        if len(statements) != 1 or type(statements[0]) is not ReturnStatement or statements[0].expression is None:
+            return None
+        parameters = {parameter.name for parameter in function_definition.parameters}
+        if len(parameters) != len(function_definition.parameters) or function_definition.name in self._recursive:
+            return None
+        shape = ExpressionShape(parameters).measure(statements[0].expression)
+        if shape.size > self._max_size or shape.reads_other_names:
+            return None
+        return statements[0].expression
+
+    def visit_block(self, block):
+        for statement in block.statements:
+            statement.accept(self)
+        return block
+
+    def visit_if_stmt(self, statement):
+        statement.condition = statement.condition.accept(self)
+        statement.true_block.accept(self)
+        if statement.else_block:
+            statement.else_block.accept(self)
+        return statement
+
+    def visit_while_stmt(self, statement):
+        statement.condition = statement.condition.accept(self)
+        statement.true_block.accept(self)
+        return statement
+
+    def visit_return_stmt(self, statement):
+        if statement.expression:
+            statement.expression = statement.expression.accept(self)
+        return statement
+
+    def visit_break_stmt(self, statement):
+        return statement
+
+    def visit_continue_stmt(self, statement):
+        return statement
+
+    def visit_assignment(self, assignment):
+        # The target is not evaluated, only read by name.
+        assignment.right = assignment.right.accept(self)
+        return assignment
+
+    def visit_variable_access(self, variable_access):
+        # Only the first part is evaluated, the others are attribute names.
+        variable_access.variable[0] = variable_access.variable[0].accept(self)
+        return variable_access
+
+    def visit_identifier_expression(self, identifier_expression):
+        return identifier_expression
+
+    def visit_function_call(self, fun_call):
+        fun_call.arguments = [argument.accept(self) for argument in fun_call.arguments]
+        if (expression := self._inlinable_expression(fun_call.name)) is None:
+            return fun_call
+        function_definition = self._functions[fun_call.name]
+        if len(fun_call.arguments) != len(function_definition.parameters):
+            return fun_call
+        # The copy shares the definitions of the functions it calls, which are not a part of it.
+        shared = {id(function): function for function in self._functions.values()}
+        return InlinedCall(
+            position=fun_call.position,
+            name=fun_call.name,
+            arguments=fun_call.arguments,
+            parameters=[parameter.name for parameter in function_definition.parameters],
+            expression=deepcopy(expression, shared)
+        )
+
+    def visit_inlined_call(self, inlined_call):
+        return inlined_call
+
+    def visit_constant(self, constant):
+        return constant
+
+    def visit_invariant_expression(self, invariant):
+        return invariant
+
+    def _visit_operands(self, expression):
+        expression.left = expression.left.accept(self)
+        expression.right = expression.right.accept(self)
+        return expression
+
+    visit_comparison = _visit_operands
+    visit_add_expression = _visit_operands
+    visit_sub_expression = _visit_operands
+    visit_mul_expression = _visit_operands
+    visit_div_expression = _visit_operands
+    visit_pow_expression = _visit_operands
+    visit_tran_expression = _visit_operands
+    visit_or_expression = _visit_operands
+    visit_and_expression = _visit_operands
+
+    def visit_negated_expression(self, negated):
+        negated.right = negated.right.accept(self)
+        return negated
+
+
+def inline_small_functions(program, max_size=DEFAULT_INLINE_SIZE):
+    Inliner(program.functions, max_size).inline()
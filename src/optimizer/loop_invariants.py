@@ -0,0 +1,255 @@
+from visitor.interface import Visitor
+from visitor.interpreter_visitor import BUILTINS_LIST
+from resolver.purity import pure_function_names
+from parse_objects.objects import (
+    Expression,
+    NegatedExpression,
+    Constant,
+    LazyBlock,
+    VariableAccess,
+    IdentifierExpression,
+    FunctionCall,
+    InlinedCall,
+    InvariantExpression
+)
+
+
+class ChangedNames(Visitor):
+    """
+    Collects the names of the variables a loop may change: the assigned ones and the ones used in the
+    arguments of calls of impure user functions, which get the cells of the variables passed and may
+    return them. Builtins only read the values. Parameters may share the cell of one variable of the
+    caller, so changing one of them changes all of them.
+    """
+
+    def __init__(self, pure_functions, parameters):
+        self._pure_functions = pure_functions
+        self._builtin_names = {name for name, _ in BUILTINS_LIST}
+        self._parameters = parameters
+        self._names = set()
+        self._in_arguments = 0
+
+    def collect(self, statement):
+        self._names = set()
+        statement.condition.accept(self)
+        statement.true_block.accept(self)
+        if not self._names.isdisjoint(self._parameters):
+            self._names |= self._parameters
+        return self._names
+
+    def visit_block(self, block):
+        for statement in block.statements:
+            statement.accept(self)
+
+    def visit_if_stmt(self, statement):
+        statement.condition.accept(self)
+        statement.true_block.accept(self)
+        if statement.else_block:
+            statement.else_block.accept(self)
+
+    def visit_while_stmt(self, statement):
+        statement.condition.accept(self)
+        statement.true_block.accept(self)
+
+    def visit_return_stmt(self, statement):
+        if statement.expression:
+            statement.expression.accept(self)
+
+    def visit_break_stmt(self, statement):
+        pass
+
+    def visit_continue_stmt(self, statement):
+        pass
+
+    def visit_assignment(self, assignment):
+        target = assignment.left.variable[0]
+        if type(target) is IdentifierExpression:
+            self._names.add(target.name)
+        assignment.right.accept(self)
+
+    def visit_variable_access(self, variable_access):
+        variable_access.variable[0].accept(self)
+
+    def visit_identifier_expression(self, identifier_expression):
+        if self._in_arguments:
+            self._names.add(identifier_expression.name)
+
+    def visit_function_call(self, fun_call):
+        impure = fun_call.name not in self._pure_functions and fun_call.name not in self._builtin_names
+        self._in_arguments += impure
+        for argument in fun_call.arguments:
+            argument.accept(self)
+        self._in_arguments -= impure
+
+    # The copy of an inlined function only reads its own parameters.
+    visit_inlined_call = visit_function_call
+
+    def visit_constant(self, constant):
+        pass
+
+    def visit_invariant_expression(self, invariant):
+        invariant.expression.accept(self)
+
+    def _visit_operands(self, expression):
+        expression.left.accept(self)
+        expression.right.accept(self)
+
+    visit_comparison = _visit_operands
+    visit_add_expression = _visit_operands
+    visit_sub_expression = _visit_operands
+    visit_mul_expression = _visit_operands
+    visit_div_expression = _visit_operands
+    visit_pow_expression = _visit_operands
+    visit_tran_expression = _visit_operands
+    visit_or_expression = _visit_operands
+    visit_and_expression = _visit_operands
+
+    def visit_negated_expression(self, negated):
+        negated.right.accept(self)
+
+
+class LoopInvariantHoisting(Visitor):
+    """
+    Wraps the expressions of while loops which give the same value in every iteration in an
+    InvariantExpression of the outermost loop they do not change in, so they are computed once
+    per run of that loop. An expression is invariant when it reads no variable the loop changes and
+    calls only pure functions. It is still first computed where it stands, so an error it reports,
+    or a loop which never runs it, is the same as before. A call in a place where the cell it returns
+    is passed on, a return statement or an argument of a user function, is not wrapped, since the
+    kept value is not a cell. Every visit returns the node which replaces the visited one. Function
+    bodies which were never parsed are skipped.
+    """
+
+    def __init__(self, pure_functions):
+        self._pure_functions = pure_functions
+        self._builtin_names = {name for name, _ in BUILTINS_LIST}
+        self._parameters = set()
+        self._loops = []
+
+    def hoist(self, program):
+        for function_definition in program.functions.values():
+            block = function_definition.block
+            if isinstance(block, LazyBlock) and not block.materialized:
+                continue
+            self._parameters = {parameter.name for parameter in function_definition.parameters}
+            block.accept(self)
+
+    def _is_invariant(self, node, changed):
+        if type(node) is Constant or type(node) is InvariantExpression:
+            return True
+        if type(node) is IdentifierExpression:
+            return node.name not in changed
+        if type(node) is FunctionCall or type(node) is InlinedCall:
+            return node.name in self._pure_functions and all(
+                self._is_invariant(argument, changed) for argument in node.arguments
+            )
+        if type(node) is VariableAccess:
+            # Only the first part is evaluated, the others are attribute names.
+            return self._is_invariant(node.variable[0], changed)
+        if isinstance(node, NegatedExpression):
+            return self._is_invariant(node.right, changed)
+        if isinstance(node, Expression):
+            return self._is_invariant(node.left, changed) and self._is_invariant(node.right, changed)
+        return False
+
+    @staticmethod
+    def _worth_keeping(node, passes_cell):
+        if isinstance(node, Expression):
+            return True
+        if type(node) is not VariableAccess:
+            return False
+        if len(node.variable) > 1:
+            return True
+        return type(node.variable[0]) in (FunctionCall, InlinedCall) and not passes_cell
+
+    def _expression(self, node, passes_cell=False):
+        if self._worth_keeping(node, passes_cell):
+            for statement, changed in self._loops:
+                if self._is_invariant(node, changed):
+                    invariant = InvariantExpression(position=node.position, expression=node)
+                    statement.invariants.append(invariant)
+                    return invariant
+        return node.accept(self)
+
+    def visit_block(self, block):
+        for statement in block.statements:
+            statement.accept(self)
+        return block
+
+    def visit_if_stmt(self, statement):
+        statement.condition = self._expression(statement.condition)
+        statement.true_block.accept(self)
+        if statement.else_block:
+            statement.else_block.accept(self)
+        return statement
+
+    def visit_while_stmt(self, statement):
+        changed = ChangedNames(self._pure_functions, self._parameters).collect(statement)
+        self._loops.append((statement, changed))
+        statement.condition = self._expression(statement.condition)
+        statement.true_block.accept(self)
+        self._loops.pop()
+        return statement
+
+    def visit_return_stmt(self, statement):
+        if statement.expression:
+            statement.expression = self._expression(statement.expression, passes_cell=True)
+        return statement
+
+    def visit_break_stmt(self, statement):
+        return statement
+
+    def visit_continue_stmt(self, statement):
+        return statement
+
+    def visit_assignment(self, assignment):
+        # The target is not evaluated, only read by name.
+        assignment.right = self._expression(assignment.right)
+        return assignment
+
+    def visit_variable_access(self, variable_access):
+        variable_access.variable[0].accept(self)
+        return variable_access
+
+    def visit_identifier_expression(self, identifier_expression):
+        return identifier_expression
+
+    def visit_function_call(self, fun_call):
+        # Builtins only read the values of their arguments.
+        passes_cell = fun_call.name not in self._builtin_names
+        fun_call.arguments = [self._expression(argument, passes_cell) for argument in fun_call.arguments]
+        return fun_call
+
+    def visit_inlined_call(self, inlined_call):
+        # The names in the copy of the function are its parameters, not the variables of the loop.
+        inlined_call.arguments = [self._expression(argument, True) for argument in inlined_call.arguments]
+        return inlined_call
+
+    def visit_constant(self, constant):
+        return constant
+
+    def visit_invariant_expression(self, invariant):
+        return invariant
+
+    def _visit_operands(self, expression):
+        expression.left = self._expression(expression.left)
+        expression.right = self._expression(expression.right)
+        return expression
+
+    visit_comparison = _visit_operands
+    visit_add_expression = _visit_operands
+    visit_sub_expression = _visit_operands
+    visit_mul_expression = _visit_operands
+    visit_div_expression = _visit_operands
+    visit_pow_expression = _visit_operands
+    visit_tran_expression = _visit_operands
+    visit_or_expression = _visit_operands
+    visit_and_expression = _visit_operands
+
+    def visit_negated_expression(self, negated):
+        negated.right = self._expression(negated.right)
+        return negated
+
+
+def hoist_loop_invariants(program):
+    LoopInvariantHoisting(pure_function_names(program)).hoist(program)
@@ -0,0 +1,302 @@
+from copy import deepcopy
+
+from visitor.interface import Visitor
+from visitor.interpreter_visitor import BUILTINS_LIST
+from optimizer.constant_folding import ConstantFolder
+from interpreter.memo import memo_key
+from parse_objects.objects import (
+    Constant,
+    Block,
+    LazyBlock,
+    VariableAccess,
+    IdentifierExpression,
+    FunctionCall,
+    FunctionDefinition
+)
+
+
+DEFAULT_MAX_CLONES = 32
+
+
+class ParameterUses(Visitor):
+    """
+    Finds the parameters of a function which may be replaced with the constant passed for them. A
+    parameter may not when the function assigns to it, passes it on to a user function, which gets its
+    cell and may change it, or reads an attribute of it. A function which breaks or continues outside
+    of a loop is not specialized, since the reported error names the function.
+    """
+
+    def __init__(self, builtin_names):
+        self._builtin_names = builtin_names
+        self._loop_depth = 0
+        self._fixed = set()
+        self.stray_jump = False
+
+    def specializable(self, function_definition):
+        self._loop_depth = 0
+        self._fixed = set()
+        self.stray_jump = False
+        function_definition.block.accept(self)
+        names = [parameter.name for parameter in function_definition.parameters]
+        if self.stray_jump or len(set(names)) != len(names):
+            return set()
+        return set(names) - self._fixed
+
+    def visit_block(self, block):
+        for statement in block.statements:
+            statement.accept(self)
+
+    def visit_if_stmt(self, statement):
+        statement.condition.accept(self)
+        statement.true_block.accept(self)
+        if statement.else_block:
+            statement.else_block.accept(self)
+
+    def visit_while_stmt(self, statement):
+        statement.condition.accept(self)
+        self._loop_depth += 1
+        statement.true_block.accept(self)
+        self._loop_depth -= 1
+
+    def visit_return_stmt(self, statement):
+        if statement.expression:
+            statement.expression.accept(self)
+
+    def visit_break_stmt(self, statement):
+        if not self._loop_depth:
+            self.stray_jump = True
+
+    def visit_continue_stmt(self, statement):
+        if not self._loop_depth:
+            self.stray_jump = True
+
+    def visit_assignment(self, assignment):
+        target = assignment.left.variable[0]
+        if type(target) is IdentifierExpression:
+            self._fixed.add(target.name)
+        assignment.right.accept(self)
+
+    def visit_variable_access(self, variable_access):
+        first = variable_access.variable[0]
+        if len(variable_access.variable) > 1 and type(first) is IdentifierExpression:
+            self._fixed.add(first.name)
+        first.accept(self)
+
+    def visit_identifier_expression(self, identifier_expression):
+        pass
+
+    def visit_function_call(self, fun_call):
+        for argument in fun_call.arguments:
+            if fun_call.name not in self._builtin_names and type(argument) is VariableAccess \
+                    and type(argument.variable[0]) is IdentifierExpression:
+                self._fixed.add(argument.variable[0].name)
+            argument.accept(self)
+
+    def visit_constant(self, constant):
+        pass
+
+    def _visit_operands(self, expression):
+        expression.left.accept(self)
+        expression.right.accept(self)
+
+    visit_comparison = _visit_operands
+    visit_add_expression = _visit_operands
+    visit_sub_expression = _visit_operands
+    visit_mul_expression = _visit_operands
+    visit_div_expression = _visit_operands
+    visit_pow_expression = _visit_operands
+    visit_tran_expression = _visit_operands
+    visit_or_expression = _visit_operands
+    visit_and_expression = _visit_operands
+
+    def visit_negated_expression(self, negated):
+        negated.right.accept(self)
+
+
+class ParameterSubstitution(ConstantFolder):
+    """
+    Folds the body of a clone with the reads of its constant parameters replaced with their values, and
+    leaves out the branches of the if statements whose condition was folded which are not taken.
+    """
+
+    def __init__(self, constants, fold_currencies=False):
+        super().__init__(fold_currencies)
+        self._constants = constants
+
+    def visit_block(self, block):
+        statements = [statement.accept(self) for statement in block.statements]
+        # A statement which only reads a constant parameter does nothing, and a Constant is no statement.
+        block.statements = [statement for statement in statements if type(statement) is not Constant]
+        return block
+
+    def visit_if_stmt(self, statement):
+        statement = super().visit_if_stmt(statement)
+        if type(statement.condition) is not Constant:
+            return statement
+        # Only the branch taken is left, a block with a scope of its own like the branch had.
+        if statement.condition.value:
+            return statement.true_block
+        return statement.else_block or Block(position=statement.position)
+
+    def visit_variable_access(self, variable_access):
+        first = variable_access.variable[0]
+        if len(variable_access.variable) == 1 and type(first) is IdentifierExpression and first.name in self._constants:
+            return Constant(position=first.position, value=self._constants[first.name])
+        return super().visit_variable_access(variable_access)
+
+
+class Specializer(Visitor):
+    """
+    Replaces the calls of user functions with constant arguments by calls of clones of the functions,
+    in which the parameters given constants are left out and their reads are replaced with the values,
+    and whose bodies are then folded. Clones are shared by the calls with the same function and
+    constants, and at most the given number of them is made. A clone does not make new clones of the
+    functions it was made from, so recursion with changing constants does not unroll. Every visit
+    returns the node which replaces the visited one. Function bodies which were never parsed are
+    skipped.
+    """
+
+    def __init__(self, program, max_clones=DEFAULT_MAX_CLONES, fold_currencies=False):
+        self._program = program
+        self._max_clones = max_clones
+        self._fold_currencies = fold_currencies
+        self._builtin_names = {name for name, _ in BUILTINS_LIST}
+        self._uses = ParameterUses(self._builtin_names)
+        self._specializable = {}
+        self._clones = {}
+        self._origins = ()
+
+    def specialize(self):
+        pending = [(function_definition, ()) for function_definition in self._program.functions.values()]
+        while pending:
+            function_definition, self._origins = pending.pop()
+            if not self._parsed(function_definition):
+                continue
+            made = len(self._clones)
+            function_definition.block.accept(self)
+            pending.extend((clone, origins) for clone, origins in list(self._clones.values())[made:])
+
+    @staticmethod
+    def _parsed(function_definition):
+        block = function_definition.block
+        return not isinstance(block, LazyBlock) or block.materialized
+
+    def _specializable_parameters(self, name):
+        if name not in self._specializable:
+            function_definition = self._program.functions.get(name)
+            # A user function with the name of a builtin is never called.
+            if function_definition is None or name in self._builtin_names or not self._parsed(function_definition):
+                self._specializable[name] = set()
+            else:
+                self._specializable[name] = self._uses.specializable(function_definition)
+        return self._specializable[name]
+
+    def _clone(self, function_definition, constants):
+        functions = self._program.functions
+        name = f'{function_definition.name}<{len(self._clones)}>'
+        # The clone shares the definitions of the functions it calls, which are not a part of it.
+        block = deepcopy(function_definition.block, {id(function): function for function in functions.values()})
+        clone = FunctionDefinition(
+            position=function_definition.position,
+            name=name,
+            block=block.accept(ParameterSubstitution(constants, self._fold_currencies)),
+            parameters=[parameter for parameter in function_definition.parameters if parameter.name not in constants]
+        )
+        functions[name] = clone
+        return clone
+
+    def _specialized_call(self, fun_call):
+        specializable = self._specializable_parameters(fun_call.name)
+        if not specializable:
+            return fun_call
+        function_definition = self._program.functions[fun_call.name]
+        if len(fun_call.arguments) != len(function_definition.parameters):
+            return fun_call
+        constants = {}
+        arguments = []
+        for parameter, argument in zip(function_definition.parameters, fun_call.arguments):
+            if parameter.name in specializable and type(argument) is Constant:
+                constants[parameter.name] = argument.value
+            else:
+                arguments.append(argument)
+        if not constants or (key := memo_key(constants.values())) is None:
+            return fun_call
+        key = (fun_call.name, tuple(constants), key)
+        if key not in self._clones:
+            if fun_call.name in self._origins or len(self._clones) >= self._max_clones:
+                return fun_call
+            self._clones[key] = (self._clone(function_definition, constants), self._origins + (fun_call.name,))
+        clone, _ = self._clones[key]
+        return FunctionCall(position=fun_call.position, name=clone.name, arguments=arguments)
+
+    def visit_block(self, block):
+        for statement in block.statements:
+            statement.accept(self)
+        return block
+
+    def visit_if_stmt(self, statement):
+        statement.condition.accept(self)
+        statement.true_block.accept(self)
+        if statement.else_block:
+            statement.else_block.accept(self)
+        return statement
+
+    def visit_while_stmt(self, statement):
+        statement.condition.accept(self)
+        statement.true_block.accept(self)
+        return statement
+
+    def visit_return_stmt(self, statement):
+        if statement.expression:
+            statement.expression.accept(self)
+        return statement
+
+    def visit_break_stmt(self, statement):
+        return statement
+
+    def visit_continue_stmt(self, statement):
+        return statement
+
+    def visit_assignment(self, assignment):
+        # The target is not evaluated, only read by name.
+        assignment.right.accept(self)
+        return assignment
+
+    def visit_variable_access(self, variable_access):
+        # Only the first part is evaluated, the others are attribute names.
+        variable_access.variable[0] = variable_access.variable[0].accept(self)
+        return variable_access
+
+    def visit_identifier_expression(self, identifier_expression):
+        return identifier_expression
+
+    def visit_function_call(self, fun_call):
+        for argument in fun_call.arguments:
+            argument.accept(self)
+        return self._specialized_call(fun_call)
+
+    def visit_constant(self, constant):
+        return constant
+
+    def _visit_operands(self, expression):
+        expression.left.accept(self)
+        expression.right.accept(self)
+        return expression
+
+    visit_comparison = _visit_operands
+    visit_add_expression = _visit_operands
+    visit_sub_expression = _visit_operands
+    visit_mul_expression = _visit_operands
+    visit_div_expression = _visit_operands
+    visit_pow_expression = _visit_operands
+    visit_tran_expression = _visit_operands
+    visit_or_expression = _visit_operands
+    visit_and_expression = _visit_operands
+
+    def visit_negated_expression(self, negated):
+        negated.right.accept(self)
+        return negated
+
+
+def specialize_functions(program, max_clones=DEFAULT_MAX_CLONES, fold_currencies=False):
+    Specializer(program, max_clones, fold_currencies).specialize()
@@ -42,66 +42,81 @@ class Node():
 class Expression(Node):
     left: Self
     right: Self
+    # Operand types seen last by Calculations and the handler specialized for them.
+    inline_cache: Any = field(default=None, repr=False, compare=False, kw_only=True)
 
     def accept(self, visitor):
-        visitor.visit_expression(self)
+        return visitor.visit_expression(self)
 
 
 class OrExpression(Expression):
     def accept(self, visitor):
-        visitor.visit_or_expression(self)
+        return visitor.visit_or_expression(self)
 
 class AndExpression(Expression):
     def accept(self, visitor):
-        visitor.visit_and_expression(self)
+        return visitor.visit_and_expression(self)
 
 
 @dataclass
 class Comparison(Expression):
     operator: Operator
     def accept(self, visitor):
-        visitor.visit_comparison(self)
+        return visitor.visit_comparison(self)
 
 
 class NegatedExpression(Expression):
     def accept(self, visitor):
-        visitor.visit_negated_expression(self)
+        return visitor.visit_negated_expression(self)
 
 
 class AddExpression(Expression):
     def accept(self, visitor):
-        visitor.visit_add_expression(self)
+        return visitor.visit_add_expression(self)
 
 
 class SubExpression(Expression):
     def accept(self, visitor):
-        visitor.visit_sub_expression(self)
+        return visitor.visit_sub_expression(self)
 
 
 class MulExpression(Expression):
     def accept(self, visitor):
-        visitor.visit_mul_expression(self)
+        return visitor.visit_mul_expression(self)
 
 
 class DivExpression(Expression):
     def accept(self, visitor):
-        visitor.visit_div_expression(self)
+        return visitor.visit_div_expression(self)
 
 
 class PowExpression(Expression):
     def accept(self, visitor):
-        visitor.visit_pow_expression(self)
+        return visitor.visit_pow_expression(self)
 
 class TranExpression(Expression):
     def accept(self, visitor):
-        visitor.visit_tran_expression(self)
+        return visitor.visit_tran_expression(self)
 
 
 @dataclass
 class Constant(Node):
     value: Any
     def accept(self, visitor):
-        visitor.visit_constant(self)
+        return visitor.visit_constant(self)
+
+
+@dataclass
+class InvariantExpression(Node):
+    """
+    Expression of a while loop which gives the same value in every iteration. Its value is kept in
+    a slot of the frame from its first evaluation until the loop starts again.
+    """
+    expression: Any
+    # Set by the Resolver: the frame slot of the kept value.
+    address: Optional[int] = field(default=None, repr=False, compare=False)
+    def accept(self, visitor):
+        return visitor.visit_invariant_expression(self)
 
 
 class Statement(Node):
@@ -112,7 +127,36 @@ class Statement(Node):
 class Block(Node):
     statements: list[Statement] = field(default_factory=lambda: [])
     def accept(self, visitor):
-        visitor.visit_block(self)
+        return visitor.visit_block(self)
+
+
+class LazyBlock(Block):
+    """
+    Function body whose statements are parsed on first use. The loader is called once and
+    returns the fully parsed Block.
+    """
+
+    def __init__(self, position, loader):
+        self.position = position
+        self._loader = loader
+        self._block = None
+
+    @property
+    def statements(self):
+        return self.materialize().statements
+
+    @property
+    def materialized(self):
+        return self._block is not None
+
+    def materialize(self):
+        if self._block is None:
+            self._block = self._loader()
+            self._loader = None
+        return self._block
+
+    def accept(self, visitor):
+        return self.materialize().accept(visitor)
 
 
 @dataclass
@@ -121,37 +165,42 @@ class IfStatement(Statement):
     true_block: Block
     else_block: Optional[Block] = None
     def accept(self, visitor):
-        visitor.visit_if_stmt(self)
+        return visitor.visit_if_stmt(self)
 
 @dataclass
 class WhileStatement(Statement):
     condition: Expression
     true_block: Block
+    # Set by the loop invariant pass: the expressions which keep their value while the loop runs.
+    invariants: list = field(default_factory=lambda: [], repr=False, compare=False)
     def accept(self, visitor):
-        visitor.visit_while_stmt(self)
+        return visitor.visit_while_stmt(self)
 
 
 @dataclass
 class ReturnStatement(Statement):
     expression: Optional[Expression] = None
+    # Set by the Resolver: the call of a user function whose value is returned, which can run in the
+    # frame of the returning call.
+    tail_call: Optional[Node] = field(default=None, repr=False, compare=False)
     def accept(self, visitor):
-        visitor.visit_return_stmt(self)
+        return visitor.visit_return_stmt(self)
 
 class BreakStatement(Statement):
     def accept(self, visitor):
-        visitor.visit_break_stmt(self)
+        return visitor.visit_break_stmt(self)
 
 
 class ContinueStatement(Statement):
     def accept(self, visitor):
-        visitor.visit_continue_stmt(self)
+        return visitor.visit_continue_stmt(self)
 
 
 @dataclass
 class VariableAccess(Statement):
     variable: list[Expression] = field(default_factory=lambda: [])
     def accept(self, visitor):
-        visitor.visit_variable_access(self)
+        return visitor.visit_variable_access(self)
 
 
 @dataclass
@@ -159,14 +208,19 @@ class Assignment(Statement):
     left: VariableAccess
     right: Expression
     def accept(self, visitor):
-        visitor.visit_assignment(self)
+        return visitor.visit_assignment(self)
 
 
 @dataclass
 class IdentifierExpression(Node):
     name: str
+    # Set by the Resolver: frame slot of the variable or the function the name stands for, and whether
+    # an assignment to the name declares the variable.
+    address: Optional[int] = field(default=None, repr=False, compare=False)
+    function: Optional[Node] = field(default=None, repr=False, compare=False)
+    declares: bool = field(default=False, repr=False, compare=False)
     def accept(self, visitor):
-        visitor.visit_identifier_expression(self)
+        return visitor.visit_identifier_expression(self)
 
 @dataclass
 class BuiltInFunction(Node):
@@ -174,13 +228,29 @@ class BuiltInFunction(Node):
     function: Callable
 
     def accept(self, visitor):
-        visitor.visit_external_function(self)
+        return visitor.visit_external_function(self)
 
 @dataclass
 class FunctionCall(IdentifierExpression):
     arguments: list[Expression] = field(default_factory=lambda: [])
     def accept(self, visitor):
-        visitor.visit_function_call(self)
+        return visitor.visit_function_call(self)
+
+
+@dataclass
+class InlinedCall(Node):
+    """
+    Call of a small user function replaced by a copy of the expression the function returns. The
+    arguments are kept in slots of the frame of the caller, which the parameters of the copy refer to.
+    """
+    name: str
+    arguments: list[Expression]
+    parameters: list[str]
+    expression: Any
+    # Set by the Resolver: the frame slots of the parameters.
+    parameter_slots: Optional[list[int]] = field(default=None, repr=False, compare=False)
+    def accept(self, visitor):
+        return visitor.visit_inlined_call(self)
 
 
 @dataclass
@@ -188,15 +258,20 @@ class FunctionDefinition(Node):
     name: str
     block: Block
     parameters: list[IdentifierExpression] = field(default_factory=lambda: [])
+    # Set by the Resolver: slots of the parameters and the size of the frame of the function.
+    parameter_slots: Optional[list[int]] = field(default=None, repr=False, compare=False)
+    slot_count: int = field(default=0, repr=False, compare=False)
+    # Set for pure functions by memoize_pure_functions: the cache of their results.
+    memo: Any = field(default=None, repr=False, compare=False)
     def accept(self, visitor):
-        visitor.visit_function_definition(self)
+        return visitor.visit_function_definition(self)
 
 
 @dataclass
 class Program(Node):
     functions: dict[str, FunctionDefinition]
     def accept(self, visitor):
-        visitor.visit_program(self)
+        return visitor.visit_program(self)
 
 
 ADDITIVE_OPERATOR_MAPPING = {
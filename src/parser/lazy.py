@@ -0,0 +1,82 @@
+import re
+
+from lexer.source import TextSource
+from parse_objects.objects import LazyBlock
+from error_manager.interface import ErrorManager
+
+
+# Newlines as the lexers read them: a two character newline, or a lone '\n' or '\r' by itself.
+NEWLINE_PATTERNS = {
+    '\n': re.compile(r'\n'),
+    '\r\n': re.compile(r'\r\n|[\r\n]'),
+    '\n\r': re.compile(r'\n\r|[\r\n]')
+}
+
+
+class ScannedErrors(ErrorManager):
+    """
+    Error handler of the lexer of a lazily parsed body. The body was lexed once when its braces were
+    matched, and lexing the same text again reports the same errors in the same order, so the first
+    ones, as many as the scan reported, are dropped and the rest go to the error handler.
+    """
+
+    def __init__(self, error_handler, reported):
+        self._error_handler = error_handler
+        self._reported = reported
+
+    def __exit__(self, *exception):
+        pass
+
+    def save_error(self, error):
+        if self._reported:
+            self._reported -= 1
+            return True
+        return self._error_handler.save_error(error)
+
+    def fatal_error(self, error):
+        return self._error_handler.fatal_error(error)
+
+    def error_count(self):
+        return self._error_handler.error_count()
+
+
+class LazySource:
+    """
+    The whole source text together with the lexer used for it. Function bodies are recorded by
+    the positions of their braces and lexed again from this text when they are first needed.
+    """
+
+    def __init__(self, text, lexer_class, str_len_limit):
+        self._text = text
+        self._lexer_class = lexer_class
+        self._str_len_limit = str_len_limit
+        self._line_offsets = None
+        self.newline_symbol = None
+
+    def _offset(self, position):
+        if self._line_offsets is None:
+            self._line_offsets = [0]
+            if self.newline_symbol is not None:
+                start = self._text.find(self.newline_symbol)
+                pattern = NEWLINE_PATTERNS[self.newline_symbol]
+                self._line_offsets.extend(match.end() for match in pattern.finditer(self._text, start))
+        return self._line_offsets[position.line - 1] + position.column - 1
+
+    def lexer(self, start_position, end_position, error_handler):
+        text = self._text[self._offset(start_position):self._offset(end_position) + 1]
+        return self._lexer_class(
+            source=TextSource(text),
+            error_handler=error_handler,
+            str_len_limit=self._str_len_limit,
+            start_position=start_position,
+            newline_symbol=self.newline_symbol
+        )
+
+
+def materialize_all(program):
+    """
+    Parses the bodies of all lazily parsed functions, reporting their syntax errors.
+    """
+    for function in program.functions.values():
+        if isinstance(function.block, LazyBlock):
+            function.block.materialize()
@@ -1,13 +1,18 @@
 
+from functools import partial
+
 from lexer.interface import Lexer
-from currency.currency import Currency
+from currency.currency import Currency, Money, MINOR_UNITS
+from currency.money import DecimalLiteral
 from parser.interface import Parser
+from parser.lazy import ScannedErrors
 from tokkens.token import TokenType, Token, CONSTANT_TOKENS, Position
 from parse_objects.objects import (
     Node,
     Program,
     FunctionDefinition,
     Block,
+    LazyBlock,
     Statement,
     IfStatement,
     WhileStatement,
@@ -40,10 +45,51 @@ from error_manager.parser_er import (
 )
 
 
+OR_BINDING_POWER = 1
+AND_BINDING_POWER = 2
+NOT_BINDING_POWER = 3
+COMPARISON_BINDING_POWER = 4
+ADDITIVE_BINDING_POWER = 5
+MULTIPLICATIVE_BINDING_POWER = 6
+FACTOR_BINDING_POWER = 7
+MAX_BINDING_POWER = FACTOR_BINDING_POWER + 1
+
+
+def _build_binding_powers():
+    """
+    Maps the infix operator tokens to (binding power, ceiling, node class, rule name). The ceiling is
+    the binding power an operator following the built node has to stay below: comparisons do not
+    chain, all other operators are left associative. TRANSFER is also a comparison token, but
+    the factor rule always takes it first.
+    """
+    comparisons = {
+        token_type: partial(Comparison, operator=operator)
+        for token_type, operator in TOKEN_TYPE_OPERATOR_MAPPING.items()
+    }
+    levels = [
+        (OR_BINDING_POWER, {TokenType.OR: OrExpression}, 'expression'),
+        (AND_BINDING_POWER, {TokenType.AND: AndExpression}, 'or_operand'),
+        (COMPARISON_BINDING_POWER, comparisons, 'comparison'),
+        (ADDITIVE_BINDING_POWER, ADDITIVE_OPERATOR_MAPPING, 'additive_expression'),
+        (MULTIPLICATIVE_BINDING_POWER, MULTIPLICATIVE_OPERATOR_MAPPING, 'multiplicative_expression'),
+        (FACTOR_BINDING_POWER, FACTOR_OPERATOR_MAPPING, 'factor')
+    ]
+    binding_powers = {}
+    for binding_power, mapping, method_name in levels:
+        ceiling = binding_power if binding_power == COMPARISON_BINDING_POWER else binding_power + 1
+        for token_type, expression in mapping.items():
+            binding_powers[token_type] = (binding_power, ceiling, expression, method_name)
+    return binding_powers
+
+
+BINDING_POWERS = _build_binding_powers()
+
+
 class Parser(Parser):
-    def __init__(self, lexer, error_handler):
+    def __init__(self, lexer, error_handler, lazy_source=None):
         self._error_handler = error_handler
         self._lexer = lexer
+        self._lazy_source = lazy_source
         self._token = None
         self._next_token()
 
@@ -101,7 +147,7 @@ class Parser(Parser):
             self._parse_bracket(TokenType.ROUND_B_O)
             parameter_list = self._parse_parameter_list()
             self._parse_bracket(TokenType.ROUND_B_C)
-            block = self._expect_object(self._parse_block, 'function_definitions')
+            block = self._parse_function_body()
             fun = FunctionDefinition(position=position, name=function_name, parameters=parameter_list, block=block)
             dict_fun = functions.setdefault(function_name, fun)
             if dict_fun != fun:
@@ -109,6 +155,35 @@ class Parser(Parser):
                 raise self._error_handler.fatal_error(error)
         return functions
     
+    def _parse_function_body(self):
+        if self._lazy_source is None or self._token.type is not TokenType.BRACE_O:
+            return self._expect_object(self._parse_block, 'function_definitions')
+        start_position = self._token.position
+        reported = self._error_handler.error_count()
+        depth = 0
+        while self._token.type is not TokenType.EOF:
+            if self._token.type is TokenType.BRACE_O:
+                depth += 1
+            elif self._token.type is TokenType.BRACE_C:
+                depth -= 1
+                if depth == 0:
+                    break
+            self._next_token()
+        end_position = self._token.position
+        # Errors of the lexer in the body, which lexing it again would report twice.
+        reported = self._error_handler.error_count() - reported
+        self._parse_bracket(TokenType.BRACE_C)
+        self._lazy_source.newline_symbol = self._lexer.newline_symbol
+        return LazyBlock(
+            position=start_position, loader=lambda: self._parse_lazy_block(start_position, end_position, reported)
+        )
+
+    def _parse_lazy_block(self, start_position, end_position, reported):
+        error_handler = ScannedErrors(self._error_handler, reported)
+        lexer = self._lazy_source.lexer(start_position, end_position, error_handler)
+        parser = Parser(lexer=lexer, error_handler=self._error_handler)
+        return parser._expect_object(parser._parse_block, 'function_definitions')
+
     def _parse_argument_list(self):
         arguments = []
         if not (node := self._parse_expression()):
@@ -256,78 +331,32 @@ class Parser(Parser):
         self._parse_semi_colon()
         return ContinueStatement(position=position)
 
-    def _parse_expression(self):
-        position = self._token.position
-        if not (left := self._parse_or_term()):
-            return
-        while self._token.type is TokenType.OR:
-            self._next_token()
-            right = self._expect_object(self._parse_or_term, 'expression')
-            left = OrExpression(position=position, left=left, right=right)
-        return left
-
-    def _parse_or_term(self):
-        position = self._token.position
-        if not (left := self._parse_and_term()):
-            return
-        while self._token.type is TokenType.AND:
-            self._next_token()
-            right = self._expect_object(self._parse_and_term, 'or_operand')
-            left = AndExpression(position=position, left=left, right=right)
-        return left
-
-    def _parse_and_term(self):
-        position = self._token.position
-        negated = False
-        if self._token.type is TokenType.NOT:
-            negated = True
-            self._next_token()
-        node = self._parse_comparison()
-        if negated and not node:
-            error = ExpectingExpression(position=self._token.position, name=self._token.value)
-            self._error_handler.fatal_error(error)
-        if not negated and not node:
-            return
-        return NegatedExpression(position=position, left='!', right=node) if negated else node
-
-    def _parse_comparison(self):
-        position = self._token.position
-        if not (left := self._parse_additive_expression()):
-            return
-        operator = TOKEN_TYPE_OPERATOR_MAPPING.get(self._token.type)
-        if not operator:
-            return left
-        self._next_token()
-        right = self._expect_object(self._parse_additive_expression, 'comparison')
-        return Comparison(operator=operator, position=position, left=left, right=right)
-
-    def _parse_additive_expression(self):
-        position = self._token.position
-        if not (left := self._parse_multiplicative_expression()):
-            return
-        while expression := ADDITIVE_OPERATOR_MAPPING.get(self._token.type):
-            self._next_token()
-            right = self._expect_object(self._parse_multiplicative_expression, 'additive_expression')
-            left = expression(position=position, left=left, right=right)
-        return left
-
-    def _parse_multiplicative_expression(self):
+    def _parse_expression(self, min_binding_power=OR_BINDING_POWER):
         position = self._token.position
-        if not (left := self._parse_factor()):
-            return
-        while expression := MULTIPLICATIVE_OPERATOR_MAPPING.get(self._token.type):
+        if self._token.type is TokenType.NOT and min_binding_power <= NOT_BINDING_POWER:
             self._next_token()
-            right = self._expect_object(self._parse_factor, 'multiplicative_expression')
-            left = expression(position=position, left=left, right=right)
-        return left
-
-    def _parse_factor(self):
-        position = self._token.position
+            node = self._parse_expression(COMPARISON_BINDING_POWER)
+            if not node:
+                error = ExpectingExpression(position=self._token.position, name=self._token.value)
+                self._error_handler.fatal_error(error)
+            left = NegatedExpression(position=position, left='!', right=node)
+            return self._parse_infix_expression(position, left, min_binding_power, COMPARISON_BINDING_POWER)
         if not (left := self._parse_exponent_factor()):
             return
-        while expression := FACTOR_OPERATOR_MAPPING.get(self._token.type):
+        return self._parse_infix_expression(position, left, min_binding_power, MAX_BINDING_POWER)
+
+    def _parse_infix_expression(self, position, left, min_binding_power, ceiling):
+        while (operator := BINDING_POWERS.get(self._token.type)) and min_binding_power <= operator[0] < ceiling:
+            binding_power, ceiling, expression, method_name = operator
             self._next_token()
-            right = self._expect_object(self._parse_exponent_factor, 'factor')
+            if self._token.type is TokenType.NOT and binding_power < NOT_BINDING_POWER:
+                right = self._parse_expression(binding_power + 1)
+            else:
+                right_position = self._token.position
+                right = self._expect_object(self._parse_exponent_factor, method_name)
+                following = BINDING_POWERS.get(self._token.type)
+                if following and following[0] > binding_power:
+                    right = self._parse_infix_expression(right_position, right, binding_power + 1, MAX_BINDING_POWER)
             left = expression(position=position, left=left, right=right)
         return left
 
@@ -345,7 +374,6 @@ class Parser(Parser):
             return
         return NegatedExpression(position=position, left='-', right=node) if negated else node
 
-
     def _parse_numeric_operand(self):
         operand = self._parse_constant() or \
             self._parse_bracket_expression() or \
@@ -360,6 +388,14 @@ class Parser(Parser):
             value = self._token.value
             position = self._token.position
             self._next_token()
+            # The lexers of the money mode give the digits of numbers, which a currency takes exactly.
+            if self._token.type == TokenType.CURR and type(value) is DecimalLiteral:
+                node = Money(minor=value.minor_units(MINOR_UNITS[self._token.value]), type=self._token.value)
+                new_node = Constant(value=node, position=position)
+                self._next_token()
+                return new_node
+            if type(value) is DecimalLiteral:
+                value = value.number()
             if self._token.type == TokenType.CURR:
                 node = Currency(type=self._token.value, value=value)
                 new_node = Constant(value=node, position=position)
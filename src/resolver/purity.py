@@ -0,0 +1,139 @@
+from visitor.interface import Visitor
+from visitor.interpreter_visitor import BUILTINS_LIST
+from parse_objects.objects import IdentifierExpression
+from interpreter.memo import MemoCache
+
+
+class PurityAnalysis(Visitor):
+    """
+    Finds the user functions whose result only depends on the values of their arguments. A function is
+    impure when it assigns to a parameter, which is a variable of the caller, calls a builtin or a
+    function which is not defined, breaks or continues outside of a loop, which reports an error, or
+    calls an impure function. Recursive calls do not make a function impure.
+    """
+
+    def __init__(self, functions):
+        self._functions = functions
+        self._parameters = set()
+        self._loop_depth = 0
+        self._impure = False
+        self._callees = set()
+
+    def pure_functions(self):
+        """
+        Returns the names of the pure functions.
+        """
+        callees = {}
+        impure = set()
+        for name, function_definition in self._functions.items():
+            self._parameters = {parameter.name for parameter in function_definition.parameters}
+            self._loop_depth = 0
+            self._impure = False
+            self._callees = set()
+            function_definition.block.accept(self)
+            callees[name] = self._callees
+            if self._impure:
+                impure.add(name)
+        changed = True
+        while changed:
+            changed = False
+            for name in callees.keys() - impure:
+                if not callees[name].isdisjoint(impure):
+                    impure.add(name)
+                    changed = True
+        return callees.keys() - impure
+
+    def visit_block(self, block):
+        for statement in block.statements:
+            statement.accept(self)
+
+    def visit_if_stmt(self, statement):
+        statement.condition.accept(self)
+        statement.true_block.accept(self)
+        if statement.else_block:
+            statement.else_block.accept(self)
+
+    def visit_while_stmt(self, statement):
+        statement.condition.accept(self)
+        self._loop_depth += 1
+        statement.true_block.accept(self)
+        self._loop_depth -= 1
+
+    def visit_return_stmt(self, statement):
+        if statement.expression:
+            statement.expression.accept(self)
+
+    def visit_break_stmt(self, statement):
+        if not self._loop_depth:
+            self._impure = True
+
+    def visit_continue_stmt(self, statement):
+        if not self._loop_depth:
+            self._impure = True
+
+    def visit_assignment(self, assignment):
+        target = assignment.left.variable[0]
+        if type(target) is IdentifierExpression and target.name in self._parameters:
+            self._impure = True
+        assignment.left.accept(self)
+        assignment.right.accept(self)
+
+    def visit_variable_access(self, variable_access):
+        variable_access.variable[0].accept(self)
+
+    def visit_identifier_expression(self, identifier_expression):
+        pass
+
+    def visit_function_call(self, fun_call):
+        if fun_call.name in self._functions:
+            self._callees.add(fun_call.name)
+        else:
+            self._impure = True
+        for argument in fun_call.arguments:
+            argument.accept(self)
+
+    def visit_inlined_call(self, inlined_call):
+        self._callees.add(inlined_call.name)
+        for argument in inlined_call.arguments:
+            argument.accept(self)
+
+    def visit_constant(self, constant):
+        pass
+
+    def visit_invariant_expression(self, invariant):
+        invariant.expression.accept(self)
+
+    def _visit_operands(self, expression):
+        expression.left.accept(self)
+        expression.right.accept(self)
+
+    visit_comparison = _visit_operands
+    visit_add_expression = _visit_operands
+    visit_sub_expression = _visit_operands
+    visit_mul_expression = _visit_operands
+    visit_div_expression = _visit_operands
+    visit_pow_expression = _visit_operands
+    visit_tran_expression = _visit_operands
+    visit_or_expression = _visit_operands
+    visit_and_expression = _visit_operands
+
+    def visit_negated_expression(self, negated):
+        negated.right.accept(self)
+
+
+def pure_function_names(program):
+    """
+    Returns the names of the pure functions of the program.
+    """
+    builtin_names = {name for name, _ in BUILTINS_LIST}
+    # A user function with the name of a builtin is never called.
+    functions = {name: function for name, function in program.functions.items() if name not in builtin_names}
+    return PurityAnalysis(functions).pure_functions()
+
+
+def memoize_pure_functions(program, max_size):
+    """
+    Gives every pure function of the program a result cache of the given size.
+    """
+    for name in pure_function_names(program):
+        program.functions[name].memo = MemoCache(max_size)
@@ -0,0 +1,123 @@
+from visitor.interface import Visitor
+from context.slots import SlotScopes
+from parse_objects.objects import IdentifierExpression, VariableAccess, FunctionCall, FunctionDefinition
+
+
+class Resolver(Visitor):
+    """
+    Static name resolution of one function definition. A block scope only lives while its block runs,
+    so the variable each identifier refers to is known before running the function. Every variable
+    gets a slot in the frame of the function and the assignments declaring variables are marked.
+    Identifiers which are not variables and call sites get the function they refer to, and return
+    statements returning the value of a call of a user function get that call.
+    """
+
+    def __init__(self, functions):
+        self._functions = functions
+        self._scopes = SlotScopes()
+
+    def resolve(self, function_definition):
+        self._scopes = SlotScopes()
+        self._scopes.enter_scope()
+        parameter_slots = []
+        for parameter in function_definition.parameters:
+            slot = self._scopes.resolve(parameter.name)
+            parameter_slots.append(self._scopes.declare(parameter.name) if slot is None else slot)
+        function_definition.block.accept(self)
+        self._scopes.leave_scope()
+        function_definition.slot_count = self._scopes.slot_count
+        function_definition.parameter_slots = parameter_slots
+
+    def visit_block(self, block):
+        self._scopes.enter_scope()
+        for statement in block.statements:
+            statement.accept(self)
+        self._scopes.leave_scope()
+
+    def visit_if_stmt(self, statement):
+        statement.condition.accept(self)
+        statement.true_block.accept(self)
+        if statement.else_block:
+            statement.else_block.accept(self)
+
+    def visit_while_stmt(self, statement):
+        # The kept values live in the enclosing scope, so the loop body does not reuse their slots.
+        for index, invariant in enumerate(statement.invariants):
+            invariant.address = self._scopes.declare(f'<invariant {index}>')
+        statement.condition.accept(self)
+        statement.true_block.accept(self)
+
+    def visit_return_stmt(self, statement):
+        if statement.expression:
+            statement.expression.accept(self)
+        expression = statement.expression
+        if type(expression) is VariableAccess and len(expression.variable) == 1:
+            fun_call = expression.variable[0]
+            if type(fun_call) is FunctionCall and isinstance(fun_call.function, FunctionDefinition):
+                statement.tail_call = fun_call
+
+    def visit_break_stmt(self, statement):
+        pass
+
+    def visit_continue_stmt(self, statement):
+        pass
+
+    def visit_assignment(self, assignment):
+        target = assignment.left.variable[0]
+        if type(target) is not IdentifierExpression:
+            assignment.left.accept(self)
+        # The value is computed before the assigned variable is looked up, so the right side does not see
+        # a variable the assignment declares.
+        assignment.right.accept(self)
+        if type(target) is not IdentifierExpression or len(assignment.left.variable) != 1:
+            return
+        if (slot := self._scopes.resolve(target.name)) is None:
+            slot = self._scopes.declare(target.name)
+            target.declares = True
+        target.address = slot
+
+    def visit_variable_access(self, variable_access):
+        # Only the first part names a value, the others are attribute names.
+        variable_access.variable[0].accept(self)
+
+    def visit_identifier_expression(self, identifier_expression):
+        identifier_expression.address = self._scopes.resolve(identifier_expression.name)
+        if identifier_expression.address is None:
+            identifier_expression.function = self._functions.get(identifier_expression.name)
+
+    def visit_function_call(self, fun_call):
+        fun_call.function = self._functions.get(fun_call.name)
+        for argument in fun_call.arguments:
+            argument.accept(self)
+
+    def visit_inlined_call(self, inlined_call):
+        for argument in inlined_call.arguments:
+            argument.accept(self)
+        # The copy of the function only reads its parameters, whose slots follow those of the caller.
+        self._scopes.enter_scope()
+        inlined_call.parameter_slots = [self._scopes.declare(name) for name in inlined_call.parameters]
+        inlined_call.expression.accept(self)
+        self._scopes.leave_scope()
+
+    def visit_constant(self, constant):
+        pass
+
+    def visit_invariant_expression(self, invariant):
+        invariant.expression.accept(self)
+
+    def _visit_operands(self, expression):
+        expression.left.accept(self)
+        expression.right.accept(self)
+
+    visit_comparison = _visit_operands
+    visit_add_expression = _visit_operands
+    visit_sub_expression = _visit_operands
+    visit_mul_expression = _visit_operands
+    visit_div_expression = _visit_operands
+    visit_pow_expression = _visit_operands
+    visit_tran_expression = _visit_operands
+    visit_or_expression = _visit_operands
+    visit_and_expression = _visit_operands
+
+    def visit_negated_expression(self, negated):
+        negated.right.accept(self)
@@ -58,9 +58,6 @@ KEY_MAPPING = {
     'break': TokenType.BREAK_KEY,
     'continue': TokenType.CONTINUE_KEY,
     'return': TokenType.RETURN_KEY,
-    'EUR' : TokenType.CURR,
-    'PLN' : TokenType.CURR,
-    'USD' : TokenType.CURR,
     'true': TokenType.BOOL_T,
     'false': TokenType.BOOL_F
 }
@@ -0,0 +1,415 @@
+import keyword
+import math
+from dataclasses import dataclass
+
+from visitor.interface import Visitor
+from context.slots import SlotScopes
+from visitor.interpreter_visitor import BUILTINS_LIST
+from parse_objects.objects import (
+    VariableAccess,
+    IdentifierExpression,
+    FunctionCall,
+    BuiltInFunction,
+    OrExpression,
+    Operator
+)
+
+
+# Kinds of the Python expressions standing for the results of the language expressions.
+REFERENCE = 'reference'  # always a Reference, e.g. a variable
+VALUE = 'value'  # never a Reference, e.g. a computed number
+RAW = 'raw'  # anything, e.g. a function result, which is the Reference of a returned variable
+
+INDENT = '    '
+
+BINARY_OPERATORS = {
+    'add': '+',
+    'sub': '-',
+    'mul': '*',
+    'div': '/',
+    'pow': '**'
+}
+
+COMPARISON_OPERATORS = {
+    Operator.EQ: '==',
+    Operator.NE: '!=',
+    Operator.GT: '>',
+    Operator.LT: '<',
+    Operator.GE: '>=',
+    Operator.LE: '<='
+}
+
+LITERAL_TYPES = (bool, int, str, bytes)
+
+
+@dataclass
+class Operand:
+    kind: str
+    text: str
+    number: bool = False
+
+
+class PythonGenerator(Visitor):
+    """
+    Generates the source of a Python module running a program. Every function definition becomes a Python
+    function with its variables in local variables, every expression is split into simple statements on
+    temporaries and the loops and conditions become Python ones, so most of the work runs as CPython
+    bytecode. Numbers are computed inline and everything else goes through the Runtime helpers built on
+    Calculations. The objects the generated code needs, e.g. nodes for error positions, are kept in
+    a table, which the module reads as N.
+    """
+
+    def __init__(self, program):
+        self._program = program
+        self._functions = dict(program.functions)
+        for name, function in BUILTINS_LIST:
+            self._functions[name] = BuiltInFunction(position=None, name=name, function=function)
+        self._function_names = {name: f'f{index}' for index, name in enumerate(program.functions)}
+        self._tracking_calls = False
+        self._reads_call_position = False
+        self._nodes = []
+        self._node_indices = {}
+        self._lines = []
+        self._indent = 0
+        self._temporary_count = 0
+        self._scopes = SlotScopes()
+        self._loop_depth = 0
+        self._function = None
+        self._operand = None
+
+    def generate(self):
+        """
+        Returns the module source and the table of objects it uses. The position of the last started call
+        is only kept by the generated code when some error reports it.
+        """
+        source = self._generate_module()
+        if self._reads_call_position:
+            self._tracking_calls = True
+            source = self._generate_module()
+        return source, self._nodes
+
+    def _generate_module(self):
+        self._nodes = []
+        self._node_indices = {}
+        self._lines = []
+        self._indent = 0
+        for function in self._program.functions.values():
+            function.accept(self)
+        self._emit('def run():')
+        self._indent += 1
+        main_function = self._program.functions.get('main')
+        if main_function is None:
+            self._emit('rt.no_main_function()')
+        elif (target := self._call_target(main_function, 0)) is None:
+            self._emit(f'rt.not_exact_arguments({self._node(main_function)})')
+        else:
+            self._emit(f'{target}()')
+        self._indent -= 1
+        return '\n'.join(self._lines) + '\n'
+
+    def _emit(self, line):
+        self._lines.append(INDENT * self._indent + line)
+
+    def _node(self, node):
+        # Nodes are compared by identity, since equal looking nodes have different positions.
+        if (index := self._node_indices.get(id(node))) is None:
+            index = self._node_indices[id(node)] = len(self._nodes)
+            self._nodes.append(node)
+        return f'N[{index}]'
+
+    def _temporary(self):
+        self._temporary_count += 1
+        return f't{self._temporary_count}'
+
+    def _compile(self, node):
+        node.accept(self)
+        operand = self._operand
+        self._operand = None
+        return operand
+
+    def _value(self, operand):
+        if operand.kind == RAW:
+            return f'value_of({operand.text})'
+        return operand.text if operand.kind == VALUE else f'{operand.text}.value'
+
+    def _reference(self, operand):
+        if operand.kind == REFERENCE:
+            return operand.text
+        if operand.kind == VALUE:
+            return f'Reference(value={operand.text})'
+        return f'wrap({operand.text})'
+
+    def _assign(self, text, kind=VALUE, number=False):
+        temporary = self._temporary()
+        self._emit(f'{temporary} = {text}')
+        return Operand(kind, temporary, number)
+
+    def _call_target(self, function, argument_count):
+        if argument_count != len(function.parameters):
+            return None
+        return self._function_names[function.name]
+
+    def _emit_call_position(self, fun_call):
+        if self._tracking_calls:
+            self._emit(f'rt.call_position = {self._node(fun_call)}.position')
+
+    def visit_function_definition(self, function_definition):
+        self._function = function_definition
+        self._scopes = SlotScopes()
+        self._temporary_count = 0
+        self._loop_depth = 0
+        self._scopes.enter_scope()
+        parameters = []
+        for index, parameter in enumerate(function_definition.parameters):
+            slot = self._scopes.resolve(parameter.name)
+            slot = self._scopes.declare(parameter.name) if slot is None else slot
+            parameters.append(f'v{slot}')
+        # A repeated parameter keeps the last argument.
+        parameters = [
+            name if name not in parameters[index + 1:] else f'_{index}' for index, name in enumerate(parameters)
+        ]
+        self._emit(f'# {function_definition.name}')
+        self._emit(f'def {self._function_names[function_definition.name]}({", ".join(parameters)}):')
+        self._indent += 1
+        function_definition.block.accept(self)
+        self._emit('return None')
+        self._indent -= 1
+        self._emit('')
+        self._scopes.leave_scope()
+
+    def visit_block(self, block):
+        self._scopes.enter_scope()
+        for statement in block.statements:
+            statement.accept(self)
+            self._operand = None
+        self._scopes.leave_scope()
+
+    def _emit_block(self, block):
+        start = len(self._lines)
+        block.accept(self)
+        if len(self._lines) == start:
+            self._emit('pass')
+
+    def visit_if_stmt(self, statement):
+        condition = self._compile(statement.condition)
+        self._emit(f'if {self._value(condition)}:')
+        self._indent += 1
+        self._emit_block(statement.true_block)
+        self._indent -= 1
+        if statement.else_block:
+            self._emit('else:')
+            self._indent += 1
+            self._emit_block(statement.else_block)
+            self._indent -= 1
+
+    def visit_while_stmt(self, statement):
+        start = len(self._lines)
+        self._indent += 1
+        condition = self._compile(statement.condition)
+        self._indent -= 1
+        condition_lines = self._lines[start:]
+        del self._lines[start:]
+        if condition_lines:
+            self._emit('while True:')
+            self._lines.extend(condition_lines)
+            self._emit(INDENT + f'if not {self._value(condition)}:')
+            self._emit(INDENT * 2 + 'break')
+        else:
+            self._emit(f'while {self._value(condition)}:')
+        self._indent += 1
+        self._loop_depth += 1
+        self._emit_block(statement.true_block)
+        self._loop_depth -= 1
+        self._indent -= 1
+
+    def visit_return_stmt(self, statement):
+        if not statement.expression:
+            self._emit('return None')
+            return
+        operand = self._compile(statement.expression)
+        self._emit(f'return {operand.text}')
+
+    def _emit_loop_jump(self, jump):
+        if self._loop_depth:
+            self._emit(jump)
+            return
+        self._reads_call_position = True
+        self._emit(f'rt.break_outside_while({self._node(self._function)})')
+        self._emit('return None')
+
+    def visit_break_stmt(self, statement):
+        self._emit_loop_jump('break')
+
+    def visit_continue_stmt(self, statement):
+        self._emit_loop_jump('continue')
+
+    def visit_assignment(self, assignment):
+        target = assignment.left.variable
+        if len(target) != 1 or type(target[0]) is not IdentifierExpression:
+            self._visit_other_target(assignment)
+            return
+        value = self._value(self._compile(assignment.right))
+        if (slot := self._scopes.resolve(target[0].name)) is not None:
+            self._emit(f'v{slot}.value = {value}')
+        else:
+            self._emit(f'v{self._scopes.declare(target[0].name)} = Reference(value={value})')
+
+    def _visit_other_target(self, assignment):
+        # The tree-walker reads an assignment target with its names unresolved, so attributes are taken
+        # from the name itself, and stores the value under a key made from the target, which no
+        # identifier can read back. Only the evaluation of both sides is kept.
+        first = assignment.left.variable[0]
+        if type(first) is IdentifierExpression:
+            value = self._assign(repr(first.name), RAW)
+            self._emit_attributes(value, assignment.left)
+        else:
+            self._compile(assignment.left)
+        self._compile(assignment.right)
+
+    def _emit_attributes(self, operand, variable_access):
+        text = operand.text
+        for part in variable_access.variable[1:]:
+            name = part.variable[0].name if isinstance(part, VariableAccess) else part.name
+            text = f'getattr({text}, {name!r})' if keyword.iskeyword(name) else f'{text}.{name}'
+        return self._assign(text, RAW)
+
+    def visit_variable_access(self, variable_access):
+        first = variable_access.variable[0]
+        operand = self._compile(first)
+        if len(variable_access.variable) == 1:
+            self._operand = operand
+            return
+        value = self._assign(self._value(operand), RAW)
+        if isinstance(first, FunctionCall):
+            # The tree-walker evaluates the first part again when it holds a string.
+            self._emit(f'if isinstance({value.text}, str):')
+            self._indent += 1
+            self._emit(f'{value.text} = {self._value(self._compile(first))}')
+            self._indent -= 1
+        self._operand = self._emit_attributes(value, variable_access)
+
+    def visit_identifier_expression(self, identifier_expression):
+        if (slot := self._scopes.resolve(identifier_expression.name)) is not None:
+            self._operand = Operand(REFERENCE, f'v{slot}')
+        elif (function := self._functions.get(identifier_expression.name)) is not None:
+            self._operand = Operand(RAW, self._node(function))
+        else:
+            self._emit(f'rt.undefined_variable({self._node(identifier_expression)})')
+            self._operand = Operand(RAW, 'None')
+
+    def visit_function_call(self, fun_call):
+        self._emit_call_position(fun_call)
+        arguments = [self._compile(argument) for argument in fun_call.arguments]
+        function = self._functions.get(fun_call.name)
+        if function is None:
+            self._emit(f'rt.function_not_found({self._node(fun_call)})')
+            self._operand = Operand(RAW, 'None')
+            return
+        if isinstance(function, BuiltInFunction):
+            values = [self._value(argument) for argument in arguments] or ["' '"]
+            self._operand = self._assign(f'B_{function.name}({", ".join(values)})', RAW)
+            return
+        references = ', '.join(self._reference(argument) for argument in arguments)
+        if (target := self._call_target(function, len(arguments))) is None:
+            self._reads_call_position = True
+            self._emit(f'rt.not_exact_arguments({self._node(function)})')
+            self._operand = Operand(RAW, 'None')
+            return
+        self._operand = self._assign(f'{target}({references})', RAW)
+
+    def visit_constant(self, constant):
+        value = constant.value
+        if type(value) in LITERAL_TYPES or (type(value) is float and math.isfinite(value)):
+            self._operand = Operand(VALUE, repr(value), type(value) in (int, float))
+            return
+        self._operand = Operand(VALUE, f'{self._node(constant)}.value')
+
+    def _values(self, expression):
+        left = self._compile(expression.left)
+        right = self._compile(expression.right)
+        return left, right, self._value_operand(left), self._value_operand(right)
+
+    def _value_operand(self, operand):
+        if operand.kind == VALUE:
+            return operand
+        return self._assign(self._value(operand))
+
+    def _number_test(self, *operands):
+        return ' and '.join(f'type({operand.text}) in NUMBER' for operand in operands if not operand.number)
+
+    def _number_fast_path(self, operation, call, *operands):
+        if all(operand.number for operand in operands):
+            return operation
+        return f'{operation} if {self._number_test(*operands)} else {call}'
+
+    def _emit_binary(self, expression, name):
+        _, _, left, right = self._values(expression)
+        result = self._temporary()
+        tests = [self._number_test(left, right)]
+        if name == 'div' and not (right.number and float(right.text) != 0):
+            tests.append(f'{right.text} != 0')
+        tests.append(f'-MAXSIZE <= ({result} := {left.text} {BINARY_OPERATORS[name]} {right.text}) <= MAXSIZE')
+        self._emit(f'if not ({" and ".join(test for test in tests if test)}):')
+        self._emit(INDENT + f'{result} = rt.{name}({left.text}, {right.text}, {self._node(expression)})')
+        self._operand = Operand(VALUE, result)
+
+    def visit_add_expression(self, expression):
+        self._emit_binary(expression, 'add')
+
+    def visit_sub_expression(self, expression):
+        self._emit_binary(expression, 'sub')
+
+    def visit_mul_expression(self, expression):
+        self._emit_binary(expression, 'mul')
+
+    def visit_div_expression(self, expression):
+        self._emit_binary(expression, 'div')
+
+    def visit_pow_expression(self, expression):
+        self._emit_binary(expression, 'pow')
+
+    def visit_tran_expression(self, expression):
+        _, _, left, right = self._values(expression)
+        self._operand = self._assign(f'rt.transfer({left.text}, {right.text}, {self._node(expression)})')
+
+    def visit_comparison(self, comparison):
+        _, _, left, right = self._values(comparison)
+        call = f'rt.compare({left.text}, {right.text}, {self._node(comparison)})'
+        if comparison.operator in COMPARISON_OPERATORS:
+            operation = f'{left.text} {COMPARISON_OPERATORS[comparison.operator]} {right.text}'
+            call = self._number_fast_path(operation, call, left, right)
+        self._operand = self._assign(call)
+
+    def visit_negated_expression(self, negated):
+        right = self._value_operand(self._compile(negated.right))
+        call = f'rt.negate({right.text}, {self._node(negated)})'
+        self._operand = self._assign(self._number_fast_path(f'{right.text} * -1', call, right))
+
+    def _visit_relation(self, expression):
+        left = self._compile(expression.left)
+        if left.kind == VALUE and not left.text.isidentifier():
+            left = self._assign(left.text)
+        result = self._temporary()
+        self._emit(f'if {self._value(left)} is {isinstance(expression, OrExpression)}:')
+        self._emit(INDENT + f'{result} = True')
+        self._emit('else:')
+        self._indent += 1
+        right = self._compile(expression.right)
+        left_value = self._value(left)
+        right_value = self._value(right)
+        operation = f'{left_value} {"or" if isinstance(expression, OrExpression) else "and"} {right_value}'
+        call = f'rt.relation({left_value}, {right_value}, {self._node(expression)})'
+        self._emit(f'{result} = {operation} if type({left_value}) is bool and type({right_value}) is bool else {call}')
+        self._indent -= 1
+        self._operand = Operand(VALUE, result)
+
+    visit_or_expression = _visit_relation
+    visit_and_expression = _visit_relation
+
+
+def transpile(program):
+    """
+    Returns the code object of the module generated for the program and the table of objects it uses.
+    """
+    source, nodes = PythonGenerator(program).generate()
+    return compile(source, '<program>', 'exec'), nodes
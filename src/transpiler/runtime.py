@@ -0,0 +1,96 @@
+import sys
+
+from interpreter.reference import Reference, wrap, value_of
+from interpreter.calculations import Calculations, NUMBER_TYPES
+from visitor.interpreter_visitor import BUILTINS_LIST
+from error_manager.interpreter_er import (
+    NoMainFunction,
+    NotExactArguments,
+    UndefinedVariable,
+    FunctionNotFound,
+    BreakOrContinueOutsideWhile
+)
+
+
+class Runtime:
+    """
+    Helpers called by the generated modules for everything not done inline: arithmetic on other values
+    than numbers, which goes through Calculations, and the errors of the tree-walker. The helpers of the
+    operations take the operand values and return the value of the result.
+    """
+
+    def __init__(self, error_manager):
+        self._error_manager = error_manager
+        self._calculations_handler = Calculations(error_manager)
+        self.call_position = None
+
+    def add(self, left, right, expression):
+        self._calculations_handler.check_currency_operands(left, right, expression)
+        return self._calculations_handler.calculate_result(left, right, expression)
+
+    def sub(self, left, right, expression):
+        self._calculations_handler.check_currency_operands(left, right, expression)
+        return self._calculations_handler.calculate_result(left, right, expression)
+
+    def mul(self, left, right, expression):
+        return self._calculations_handler.calculate_result(left, right, expression)
+
+    def div(self, left, right, expression):
+        self._calculations_handler.check_divisor(left, right, expression)
+        return self._calculations_handler.calculate_result(left, right, expression)
+
+    def pow(self, left, right, expression):
+        self._calculations_handler.check_power_base(left, right, expression)
+        return self._calculations_handler.calculate_result(left, right, expression)
+
+    def transfer(self, left, right, expression):
+        return self._calculations_handler.calculate_result(left, right, expression)
+
+    def compare(self, left, right, comparison):
+        return self._calculations_handler.compare_values(left, right, comparison)
+
+    def negate(self, right, negated):
+        return self._calculations_handler.negate_value(right, negated)
+
+    def relation(self, left, right, expression):
+        return self._calculations_handler.handle_relations(left, right, expression)
+
+    def no_main_function(self):
+        error = NoMainFunction(position=None, name=None)
+        raise self._error_manager.fatal_error(error)
+
+    def not_exact_arguments(self, function):
+        error = NotExactArguments(position=(function.position, self.call_position), name=function.name)
+        raise self._error_manager.fatal_error(error)
+
+    def undefined_variable(self, identifier_expression):
+        error = UndefinedVariable(position=identifier_expression.position, name=identifier_expression.name)
+        raise self._error_manager.fatal_error(error)
+
+    def function_not_found(self, fun_call):
+        error = FunctionNotFound(position=fun_call.position, name=fun_call.name)
+        raise self._error_manager.fatal_error(error)
+
+    def break_outside_while(self, function):
+        error = BreakOrContinueOutsideWhile(position=self.call_position, name=function.name)
+        if not self._error_manager.save_error(error):
+            raise Exception('Error manager is full')
+
+
+def execute(code, nodes, error_manager):
+    """
+    Runs a module made by transpile with the table of objects it was generated with.
+    """
+    namespace = {
+        'rt': Runtime(error_manager),
+        'N': nodes,
+        'Reference': Reference,
+        'wrap': wrap,
+        'value_of': value_of,
+        'NUMBER': tuple(NUMBER_TYPES),
+        'MAXSIZE': sys.maxsize
+    }
+    for name, function in BUILTINS_LIST:
+        namespace[f'B_{name}'] = function
+    exec(code, namespace)
+    namespace['run']()
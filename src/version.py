@@ -0,0 +1,2 @@
+INTERPRETER_VERSION = '8'
+TRANSPILER_VERSION = '2'
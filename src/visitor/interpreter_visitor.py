@@ -1,37 +1,44 @@
 from collections import deque
-from currency.currency import Currency
 
 from visitor.interface import Visitor
-from context.context import Context
+from resolver.resolver import Resolver
 from parse_objects.objects import (
     VariableAccess,
+    IdentifierExpression,
     BuiltInFunction
 )
-from interpreter.reference import Reference
+from interpreter.reference import Reference, wrap, value_of
+from interpreter.completion import BREAK, CONTINUE, RETURN, TAIL_CALL
+from interpreter.memo import memo_key, MISSING
 from error_manager.interpreter_er import (
     NoMainFunction,
     NotExactArguments,
     UndefinedVariable,
     FunctionNotFound,
-    DivisionByZero,
-    WrongTypeForOperation,
     BreakOrContinueOutsideWhile
 )
 from parse_objects.objects import BuiltInFunction
 from interpreter.calculations import Calculations
+from currency.history import rate_at, convert_at
 
 class InterpreterVisitor(Visitor):
+    """
+    Tree-walking interpreter. Expressions leave plain values in the last result, except variables,
+    which leave their Reference cell so that it can be passed on to a function as its argument.
+    Statements return their completion: None, or BREAK, CONTINUE, RETURN or TAIL_CALL, which leaves
+    the called function and its arguments in the last result for the function definition to run.
+    """
+
     def __init__(self, error_manager):
         self._error_manager = error_manager
         self._calculations_handler = Calculations(error_manager)
         self._last_result = None
-        self._global_context = Context()
-        self._call_context = Context(global_context=self._global_context)
-        self._last_contexts = deque()
+        self._functions = {}
+        self._resolver = Resolver(self._functions)
+        self._frame = None
+        self._last_frames = deque()
+        self._free_frames = {}
         self._call_position = None
-        self._returning = False
-        self._breaking = False
-        self._continuing = False
         self._resolving = True
 
     def _consume_last_result(self):
@@ -42,26 +49,25 @@ class InterpreterVisitor(Visitor):
     def _insert_builtin_functions(self):
         for function in BUILTINS_LIST:
             function_obj = BuiltInFunction(position=None, name=function[0], function=function[1])
-            self._global_context.insert_symbol_function(function[0], function_obj)
+            self._functions[function[0]] = function_obj
 
     def _get_left_right_expressions(self, expression):
         expression.left.accept(self)
         left = self._consume_last_result()
         expression.right.accept(self)
         right = self._consume_last_result()
-        return left, right
+        # A variable is read only after both operands are evaluated, since the right one may change it.
+        return value_of(left), value_of(right)
     
     def _call_function(self, function, arguments):
-        self._last_contexts.append(self._call_context)
-        self._call_context = Context(global_context=self._global_context)
+        self._last_frames.append(self._frame)
         function.accept(self)
-        self._call_context = self._last_contexts.pop()
+        self._frame = self._last_frames.pop()
 
     def visit_program(self, program):
-        for function in program.functions.values():
-            self._global_context.insert_symbol_function(function.name, function)
+        self._functions.update(program.functions)
         self._insert_builtin_functions()
-        main_function = self._global_context.get_value_function('main')
+        main_function = self._functions.get('main')
         if not main_function:
             error = NoMainFunction(position=None, name=None)
             raise self._error_manager.fatal_error(error) 
@@ -69,40 +75,46 @@ class InterpreterVisitor(Visitor):
 
     def visit_function_definition(self, function_definition):
         arguments = self._consume_last_result() or []
-        if len(arguments) != len(function_definition.parameters):
-            error = NotExactArguments(position=(function_definition.position, self._call_position)
-            , name=function_definition.name)
-            raise self._error_manager.fatal_error(error)
-        for argument, parameter in zip(arguments, function_definition.parameters):
-            self._call_context.insert_symbol_variable(parameter.name, argument)
-        function_definition.block.accept(self)
-        if self._breaking:
-            error = BreakOrContinueOutsideWhile(position=self._call_position, name=function_definition.name)
-            if not self._error_manager.save_error(error):
-                raise Exception("Error manager is full")
-            self._breaking = False
-        if self._continuing:
+        # A tail call runs in this loop after the frame of the returning call is freed, so a chain of
+        # tail calls keeps one frame and does not grow the Python stack.
+        while True:
+            if len(arguments) != len(function_definition.parameters):
+                error = NotExactArguments(position=(function_definition.position, self._call_position)
+                , name=function_definition.name)
+                raise self._error_manager.fatal_error(error)
+            if function_definition.parameter_slots is None:
+                self._resolver.resolve(function_definition)
+            # Frames of finished calls are reused. A variable is always declared before it is read, which
+            # stores a new Reference, so what a previous call left in the frame is never seen.
+            free_frames = self._free_frames.setdefault(function_definition.name, [])
+            frame = free_frames.pop() if free_frames else [None] * function_definition.slot_count
+            for argument, slot in zip(arguments, function_definition.parameter_slots):
+                frame[slot] = argument
+            self._frame = frame
+            completion = function_definition.block.accept(self)
+            free_frames.append(frame)
+            if completion != TAIL_CALL:
+                break
+            function_definition, arguments = self._consume_last_result()
+        if completion != RETURN:
+            # The value of the last expression statement is not a result.
+            self._last_result = None
+        if completion in (BREAK, CONTINUE):
             error = BreakOrContinueOutsideWhile(position=self._call_position, name=function_definition.name)
             if not self._error_manager.save_error(error):
                 raise Exception("Error manager is full")
-            self._continuing = False
-        self._returning = False
 
     def visit_block(self, block):
-        self._call_context.enter_scope()
         for statement in block.statements:
-            statement.accept(self)
-            if self._returning:
-                break
-            self._last_result = None
-            if self._breaking or self._continuing:
-                break
-        self._call_context.leave_scope()
+            if (completion := statement.accept(self)) is not None:
+                return completion
 
     def visit_identifier_expression(self, identifier_expression):
         if self._resolving:
-            value_obj = self._call_context.get_value_variable(identifier_expression.name) or \
-                self._call_context.get_value_function(identifier_expression.name)
+            if (address := identifier_expression.address) is not None:
+                value_obj = self._frame[address]
+            else:
+                value_obj = identifier_expression.function
             if value_obj is None:
                 error = UndefinedVariable(position=identifier_expression.position, name=identifier_expression.name)
                 raise self._error_manager.fatal_error(error)
@@ -112,141 +124,127 @@ class InterpreterVisitor(Visitor):
 
     def visit_if_stmt(self, statement):
         statement.condition.accept(self)
-        if self._consume_last_result().value:
-            statement.true_block.accept(self)
+        if value_of(self._consume_last_result()):
+            return statement.true_block.accept(self)
         elif statement.else_block:
-            statement.else_block.accept(self)
+            return statement.else_block.accept(self)
 
     def visit_while_stmt(self, statement):
+        for invariant in statement.invariants:
+            self._frame[invariant.address] = None
         statement.condition.accept(self)
-        execute = self._consume_last_result()
-        while execute.value:
-            statement.true_block.accept(self)
-            if self._breaking or self._returning:
-                self._breaking = False
-                break
-            if self._continuing:
-                self._continuing = False
+        while value_of(self._consume_last_result()):
+            if (completion := statement.true_block.accept(self)) is not None and completion != CONTINUE:
+                return None if completion == BREAK else completion
             statement.condition.accept(self)
-            execute = self._consume_last_result()
 
     def visit_return_stmt(self, statement):
+        if (fun_call := statement.tail_call) is not None:
+            self._call_position = fun_call.position
+            arguments = []
+            for argument in fun_call.arguments:
+                argument.accept(self)
+                arguments.append(wrap(self._consume_last_result()))
+            self._last_result = (fun_call.function, arguments)
+            return TAIL_CALL
         if statement.expression:
             statement.expression.accept(self)
-        self._returning = True
+        else:
+            self._last_result = None
+        return RETURN
 
     def visit_break_stmt(self, statement):
-        self._breaking = True
+        return BREAK
 
     def visit_continue_stmt(self, statement):
-        self._continuing = True
+        return CONTINUE
 
     def visit_expression(self, expression):
         ...
 
     def visit_comparison(self, comparison):
         left, right = self._get_left_right_expressions(comparison)
-        self._last_result = self._calculations_handler.compare_values(left.value, right.value, comparison)
-
-    def _check_types(self, left, right, expression):
-        if (isinstance(left.value, Currency) and not isinstance(right.value, Currency)) or \
-            (not isinstance(left.value, Currency) and isinstance(right.value, Currency)):
-            error = WrongTypeForOperation(position=expression.position, name=(type(left.value), type(right.value)))
-            raise self._error_manager.fatal_error(error)
+        self._last_result = self._calculations_handler.compare_values(left, right, comparison)
 
     def visit_add_expression(self, expression):
         left, right = self._get_left_right_expressions(expression)
-        self._check_types(left, right, expression)
-        self._last_result = self._calculations_handler.calculate_result(
-            left.value, right.value, expression, lambda a, b: a + b
-        )
+        self._calculations_handler.check_currency_operands(left, right, expression)
+        self._last_result = self._calculations_handler.calculate_result(left, right, expression)
 
     def visit_sub_expression(self, expression):
         left, right = self._get_left_right_expressions(expression)
-        self._check_types(left, right, expression)
-        self._last_result = self._calculations_handler.calculate_result(
-            left.value, right.value, expression, lambda a, b: a - b
-        )
+        self._calculations_handler.check_currency_operands(left, right, expression)
+        self._last_result = self._calculations_handler.calculate_result(left, right, expression)
 
     def visit_mul_expression(self, expression):
         left, right = self._get_left_right_expressions(expression)
-        if (isinstance(left, Currency) and isinstance(right, Currency)):
-            error = WrongTypeForOperation(position=expression.position, name=(type(left.value), type(right.value)))
-            raise self._error_manager.fatal_error(error)
-        self._last_result = self._calculations_handler.calculate_result(
-            left.value, right.value, expression, lambda a, b: a * b
-        )
+        self._last_result = self._calculations_handler.calculate_result(left, right, expression)
 
     def visit_div_expression(self, expression):
         left, right = self._get_left_right_expressions(expression)
-        if right.value == 0 or right.value == 0.0:
-            error = DivisionByZero(position=expression.position, name=None)
-            raise self._error_manager.fatal_error(error)
-        if isinstance(right.value, Currency):
-            error = WrongTypeForOperation(position=expression.position, name=(type(left.value), type(right.value)))
-            raise self._error_manager.fatal_error(error)
-        else:
-            self._last_result = self._calculations_handler.calculate_result(
-                left.value, right.value, expression, lambda a, b: a / b
-            )
+        self._calculations_handler.check_divisor(left, right, expression)
+        self._last_result = self._calculations_handler.calculate_result(left, right, expression)
 
     def visit_pow_expression(self, expression):
         left, right = self._get_left_right_expressions(expression)
-        if type(left.value) in [float, int] and type(left.value) in [float, int]:
-            self._last_result = self._calculations_handler.calculate_result(
-                left.value, right.value, expression, lambda a, b: pow(a, b)
-            )
-        else:
-            error = WrongTypeForOperation(position=expression.position, name=(type(left.value), type(right.value)))
-            raise self._error_manager.fatal_error(error)
+        self._calculations_handler.check_power_base(left, right, expression)
+        self._last_result = self._calculations_handler.calculate_result(left, right, expression)
 
     def visit_tran_expression(self, expression):
         left, right = self._get_left_right_expressions(expression)
-        self._last_result = self._calculations_handler.calculate_result(
-            left.value, right.value, expression, "tran"
-        )
+        self._last_result = self._calculations_handler.calculate_result(left, right, expression)
 
     def visit_negated_expression(self, negated):
         negated.right.accept(self)
         right = self._consume_last_result()
-        self._last_result = self._calculations_handler.negate_value(right.value, negated)
+        self._last_result = self._calculations_handler.negate_value(value_of(right), negated)
 
     def visit_or_expression(self, expression):
         expression.left.accept(self)
         left = self._consume_last_result()
-        if left.value is True:
-            self._last_result = Reference(value=True)
+        if value_of(left) is True:
+            self._last_result = True
             return
         expression.right.accept(self)
         right = self._consume_last_result()
         self._last_result = self._calculations_handler.handle_relations(
-            left.value, right.value, expression, lambda a, b: a or b
+            value_of(left), value_of(right), expression
         )
 
     def visit_and_expression(self, expression):
         expression.left.accept(self)
         left = self._consume_last_result()
-        if left.value is False:
-            self._last_result = Reference(value=True)
+        if value_of(left) is False:
+            self._last_result = True
             return
         expression.right.accept(self)
         right = self._consume_last_result()
         self._last_result = self._calculations_handler.handle_relations(
-            left.value, right.value, expression, lambda a, b: a and b
+            value_of(left), value_of(right), expression
         )
 
     def visit_constant(self, constant):
-        self._last_result = Reference(value=constant.value)
+        self._last_result = constant.value
+
+    def visit_invariant_expression(self, invariant):
+        if (kept := self._frame[invariant.address]) is not None:
+            self._last_result = kept.value
+            return
+        error_count = self._error_manager.error_count()
+        invariant.expression.accept(self)
+        # A value is not kept when computing it reported an error, which the next iteration reports again.
+        if self._error_manager.error_count() == error_count:
+            self._frame[invariant.address] = Reference(value=value_of(self._last_result))
 
     def visit_variable_access(self, variable_access):
         variable_access.variable[0].accept(self)
         if len(variable_access.variable) == 1:
             return
-        method_or_value = self._consume_last_result().value
+        method_or_value = value_of(self._consume_last_result())
         if isinstance(method_or_value, str):
             self._resolving = True
             variable_access.variable[0].accept(self)
-            method_or_value = self._consume_last_result().value
+            method_or_value = value_of(self._consume_last_result())
         for part in variable_access.variable[1:]:
             method_name = part.variable[0].name if isinstance(part, VariableAccess) else part.name
             method_or_value = getattr(method_or_value, method_name)
@@ -258,33 +256,65 @@ class InterpreterVisitor(Visitor):
         variable_name = self._consume_last_result()
         self._resolving = True
         assignment.right.accept(self)
-        value = self._consume_last_result()
-        value = value.value if isinstance(value, Reference) else value
-        old_value = self._call_context.get_value_variable(variable_name)
-        if old_value is None:
-            self._call_context.insert_symbol_variable(
-                variable_name, value if isinstance(value, Reference) else Reference(value=value)
-            )
+        value = value_of(self._consume_last_result())
+        target = assignment.left.variable[0]
+        if not isinstance(target, IdentifierExpression) or target.address is None:
+            return
+        if target.declares:
+            self._frame[target.address] = Reference(value=value)
         else:
-            old_value.value = value
+            self._frame[target.address].value = value
 
     def visit_function_call(self, fun_call):
         arguments = []
         self._call_position = fun_call.position
+        function = fun_call.function
+        # Builtins only read the values, user functions get the cells of the variables passed.
+        pass_references = not isinstance(function, BuiltInFunction)
         for argument in fun_call.arguments:
             argument.accept(self)
             value = self._consume_last_result()
-            arguments.append(value if isinstance(value, Reference) else Reference(value=value))
+            arguments.append(wrap(value) if pass_references else value)
         self._last_result = arguments
-        function = self._global_context.get_value_function(fun_call.name)
         if function is None:
             error = FunctionNotFound(position=fun_call.position, name=fun_call.name)
             raise self._error_manager.fatal_error(error)
+        if pass_references and function.memo is not None:
+            self._call_memoized(function, arguments)
+            return
         self._call_function(function, arguments)
 
+    def _call_memoized(self, function, arguments):
+        memo = function.memo
+        if (key := memo_key(arguments)) is None:
+            self._call_function(function, arguments)
+            return
+        if (entry := memo.get(key)) is not MISSING:
+            self._last_result, self._call_position = entry
+            return
+        error_count = self._error_manager.error_count()
+        self._call_function(function, arguments)
+        result = self._last_result
+        # A result is not kept when the call reported an error, which a hit would not report again, or
+        # when it is the cell of an argument, through which the caller may change its variable.
+        if self._error_manager.error_count() == error_count and not any(result is argument for argument in arguments):
+            memo.store(key, (value_of(result), self._call_position))
+
+    def visit_inlined_call(self, inlined_call):
+        self._call_position = inlined_call.position
+        arguments = []
+        for argument in inlined_call.arguments:
+            argument.accept(self)
+            arguments.append(wrap(self._consume_last_result()))
+        # The arguments are stored after all of them are computed, since the inlined calls in them use
+        # the same slots.
+        for argument, slot in zip(arguments, inlined_call.parameter_slots):
+            self._frame[slot] = argument
+        inlined_call.expression.accept(self)
+
     def visit_external_function(self, ext_function):
         arguments = self._consume_last_result() or []
-        self._last_result = ext_function.function(*[argument.value for argument in arguments] if len(arguments) else " ")
+        self._last_result = ext_function.function(*[value_of(argument) for argument in arguments] if len(arguments) else " ")
 
 def bytes_print(text):
     print(text.decode() if isinstance(text, bytes) else text)
@@ -294,5 +324,7 @@ def input_(text):
 
 BUILTINS_LIST = [
     ('print', bytes_print),
-    ('input', input)
+    ('input', input),
+    ('rate_at', rate_at),
+    ('convert_at', convert_at)
 ]
\ No newline at end of file
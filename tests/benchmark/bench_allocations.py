@@ -0,0 +1,76 @@
+"""
+Allocations of the interpreter backends: the number of Reference cells created and the peak of the memory
+traced by tracemalloc while running the acceptance programs and the loop programs of bench_backends.
+
+Run from the project root: PYTHONPATH=src python tests/benchmark/bench_allocations.py [--iterations 1000]
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+import tracemalloc
+from unittest import mock
+
+from interpreter.reference import Reference
+from error_manager.error_manager import ModulErrorManager
+from main import BACKENDS
+from bench_backends import PROGRAMS, parse
+
+
+ACCEPTANCE_DIRECTORY = os.path.join(os.path.dirname(__file__), '..', 'acceptance')
+
+
+class ReferenceCounter:
+    """
+    Counts the Reference cells created while it is active.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._init = None
+
+    def __enter__(self):
+        self._init = Reference.__init__
+
+        def counting_init(reference, *args, **kwargs):
+            self.count += 1
+            self._init(reference, *args, **kwargs)
+        Reference.__init__ = counting_init
+        return self
+
+    def __exit__(self, *exception):
+        Reference.__init__ = self._init
+
+
+def measure(backend, program):
+    with contextlib.redirect_stdout(io.StringIO()), mock.patch.object(sys, 'stdin', io.StringIO('3\n')):
+        with ReferenceCounter() as counter, ModulErrorManager() as error_handler:
+            tracemalloc.start()
+            try:
+                BACKENDS[backend](program, error_handler)
+            except Exception:
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    return counter.count, peak
+
+
+def programs(iterations):
+    for path in sorted(glob.glob(os.path.join(ACCEPTANCE_DIRECTORY, 'test*.txt'))):
+        with open(path, newline='') as source:
+            yield os.path.basename(path), parse(source.read())
+    for name, template in PROGRAMS.items():
+        yield name, parse(template.format(iterations=iterations))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=1000)
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    args = parser.parse_args()
+    for name, program in programs(args.iterations):
+        for backend in args.backends:
+            references, peak = measure(backend, program)
+            print(f'{name:<12} {backend:<10} {references:>8} references {peak / 1024:10.1f} KiB peak')
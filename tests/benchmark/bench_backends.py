@@ -0,0 +1,162 @@
+"""
+Execution benchmark of the interpreter backends on loop-heavy programs.
+
+Run from the project root: PYTHONPATH=src python tests/benchmark/bench_backends.py [--iterations 100000] [--fold]
+    [--max-clones 32] [--inline-size 16]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from lexer.lexer import Lexer
+from parser.parser import Parser
+from error_manager.error_manager import ModulErrorManager
+from main import BACKENDS
+from optimizer.constant_folding import fold_constants
+from optimizer.inlining import inline_small_functions
+from optimizer.specialization import specialize_functions
+
+
+PROGRAMS = {
+    'loop': '''
+main()
+{{
+    i = 0;
+    total = 0;
+    while (i < {iterations})
+    {{
+        if (i / 2 > 10 && i != 5) {{ total = total + i * 2; }} else {{ total = total - 1; }}
+        i = i + 1;
+    }}
+    print(total);
+}}
+''',
+    'calls': '''
+add(a, b)
+{{
+    return a + b;
+}}
+main()
+{{
+    i = 0;
+    while (i < {iterations})
+    {{
+        i = add(i, 1);
+    }}
+    print(i);
+}}
+''',
+    'currency': '''
+main()
+{{
+    i = 0;
+    wallet = 0 EUR;
+    while (i < {iterations})
+    {{
+        wallet = wallet + 2 USD -> EUR;
+        i = i + 1;
+    }}
+    print(wallet);
+}}
+''',
+    'constants': '''
+main()
+{{
+    i = 0;
+    total = 0;
+    while (i < {iterations} * 1)
+    {{
+        total = total + (2 * 2) + 2 / 2 - 3 ^ 2;
+        i = i + 1;
+    }}
+    print(total);
+}}
+''',
+    'routing': '''
+route(amount, code)
+{{
+    if (code == 'EUR') {{ return amount -> EUR; }}
+    if (code == 'USD') {{ return amount -> USD; }}
+    return amount -> PLN;
+}}
+main()
+{{
+    i = 0;
+    money = 2 USD;
+    wallet = 0 PLN;
+    while (i < {iterations})
+    {{
+        wallet = wallet + route(money, 'PLN');
+        i = i + 1;
+    }}
+    print(wallet);
+}}
+''',
+    'recursion': '''
+depth(n)
+{{
+    if (n > 0)
+    {{
+        rest = depth(n - 1);
+        return rest + 1;
+    }}
+    return 0;
+}}
+main()
+{{
+    i = 0;
+    total = 0;
+    while (i < {iterations} / 20)
+    {{
+        total = total + depth(20);
+        i = i + 1;
+    }}
+    print(total);
+}}
+'''
+}
+
+
+def parse(source):
+    with ModulErrorManager() as error_handler:
+        lexer = Lexer(source=io.StringIO(source, newline=''), error_handler=error_handler, str_len_limit=256)
+        return Parser(lexer=lexer, error_handler=error_handler).parse()
+
+
+def run(backend, program, repeats):
+    best = None
+    for _ in range(repeats):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), ModulErrorManager() as error_handler:
+            start = time.perf_counter()
+            BACKENDS[backend](program, error_handler)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output.getvalue()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=100000)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument('--fold', action='store_true', help='fold operations on constants first')
+    parser.add_argument('--fold-currencies', action='store_true', help='with --fold, fold currency operations too')
+    parser.add_argument('--max-clones', type=int, default=0, help='with --fold, specialize functions for constants')
+    parser.add_argument('--inline-size', type=int, default=0, help='inline small functions for the tree-walker')
+    args = parser.parse_args()
+    for name, template in PROGRAMS.items():
+        baseline = None
+        for backend in args.backends:
+            # Only the tree-walker runs inlined calls, so every backend gets its own program.
+            program = parse(template.format(iterations=args.iterations))
+            if args.fold:
+                fold_constants(program, fold_currencies=args.fold_currencies)
+                if args.max_clones:
+                    specialize_functions(program, args.max_clones, fold_currencies=args.fold_currencies)
+            if backend == 'tree' and args.inline_size:
+                inline_small_functions(program, args.inline_size)
+            elapsed, output = run(backend, program, args.repeats)
+            baseline = baseline or elapsed
+            print(f'{name:<10} {backend:<10} {elapsed:8.3f} s {baseline / elapsed:6.2f}x  {output.strip()}')
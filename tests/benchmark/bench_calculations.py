@@ -0,0 +1,85 @@
+"""
+Micro-benchmark of Calculations: operations per second for each pair of operand types and operation,
+through the inline cache of one node as the interpreters call it.
+
+Run from the project root: PYTHONPATH=src python tests/benchmark/bench_calculations.py [--operations 100000]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from interpreter.calculations import Calculations
+from currency.currency import Currency, CurrencyCode
+from tokkens.token import Position
+from error_manager.error_manager import ModulErrorManager
+from parse_objects.objects import (
+    Operator,
+    Comparison,
+    AddExpression,
+    SubExpression,
+    MulExpression,
+    DivExpression,
+    TranExpression
+)
+
+
+POSITION = Position(line=1, column=1)
+PAIRS = {
+    '(int, int)': (7, 3),
+    '(float, int)': (7.5, 3),
+    '(str, str)': ('ab', 'cd'),
+    '(bool, bool)': (True, False),
+    '(Currency, Currency)': (Currency(7, CurrencyCode.EUR), Currency(3, CurrencyCode.USD)),
+    '(Currency, int)': (Currency(7, CurrencyCode.EUR), 3),
+    '(int, Currency)': (7, Currency(3, CurrencyCode.EUR)),
+    '(Currency, CurrencyCode)': (Currency(7, CurrencyCode.EUR), CurrencyCode.PLN),
+    '(Currency, str)': (Currency(7, CurrencyCode.EUR), 'PLN')
+}
+OPERATIONS = {
+    'add': lambda: AddExpression(position=POSITION, left=None, right=None),
+    'sub': lambda: SubExpression(position=POSITION, left=None, right=None),
+    'mul': lambda: MulExpression(position=POSITION, left=None, right=None),
+    'div': lambda: DivExpression(position=POSITION, left=None, right=None),
+    'tran': lambda: TranExpression(position=POSITION, left=None, right=None),
+    'lt': lambda: Comparison(position=POSITION, left=None, right=None, operator=Operator.LT),
+    'eq': lambda: Comparison(position=POSITION, left=None, right=None, operator=Operator.EQ)
+}
+
+
+def operation_of(calculations, node):
+    return calculations.compare_values if isinstance(node, Comparison) else calculations.calculate_result
+
+
+def supported(left, right, node):
+    # The errors of an unsupported pair are printed when the manager closes.
+    with contextlib.redirect_stdout(io.StringIO()), ModulErrorManager() as error_handler:
+        try:
+            operation_of(Calculations(error_handler), node)(left, right, node)
+        except Exception:
+            return False
+        return not error_handler.error_count()
+
+
+def measure(calculations, left, right, node, operations):
+    operation = operation_of(calculations, node)
+    start = time.perf_counter()
+    for _ in range(operations):
+        operation(left, right, node)
+    return operations / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--operations', type=int, default=100000)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    with ModulErrorManager() as error_handler:
+        calculations = Calculations(error_handler)
+        for pair, (left, right) in PAIRS.items():
+            for name, node_factory in OPERATIONS.items():
+                node = node_factory()
+                if not supported(left, right, node):
+                    continue
+                rate = max(measure(calculations, left, right, node, args.operations) for _ in range(args.repeats))
+                print(f'{pair:<22} {name:<6} {rate / 1e6:8.2f} M ops/s')
@@ -0,0 +1,63 @@
+"""
+Lexer throughput benchmark for the character sources.
+
+Run from the project root: PYTHONPATH=src python tests/benchmark/bench_lexer.py [--size-mb 10]
+"""
+import argparse
+import tempfile
+import time
+
+from lexer.lexer import Lexer
+from lexer.regex_lexer import RegexLexer
+from lexer.source import StreamSource, BufferedSource, open_source
+from tokkens.token import TokenType
+from error_manager.error_manager import ModulErrorManager
+
+
+SNIPPET = '''func(x)
+{
+    # comment line
+    while(x > 2.5)
+    {
+        total = total + x * 2 - 10 USD -> EUR;
+        name = 'text \\' with escape';
+        x = x - 1;
+    }
+    return x;
+}
+'''
+
+
+def write_source(path, size_mb):
+    repeats = size_mb * 1024 * 1024 // len(SNIPPET) + 1
+    with open(path, 'w', newline='') as file:
+        file.write(SNIPPET * repeats)
+
+
+def count_tokens(source, lexer_class=Lexer):
+    with ModulErrorManager() as error_handler:
+        lexer = lexer_class(source=source, error_handler=error_handler, str_len_limit=256)
+        count = 0
+        while lexer.next().type is not TokenType.EOF:
+            count += 1
+    return count
+
+
+def run(name, path, make_source, lexer_class=Lexer):
+    with open(path, 'r', newline='') as file:
+        start = time.perf_counter()
+        count = count_tokens(make_source(file), lexer_class)
+        elapsed = time.perf_counter() - start
+    print(f'{name:<10} {count:>10} tokens {elapsed:8.2f} s {count / elapsed:12.0f} tokens/s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=int, default=10)
+    args = parser.parse_args()
+    with tempfile.NamedTemporaryFile(suffix='.txt') as source_file:
+        write_source(source_file.name, args.size_mb)
+        run('read(1)', source_file.name, StreamSource)
+        run('buffered', source_file.name, BufferedSource)
+        run('mmap', source_file.name, open_source)
+        run('regex', source_file.name, open_source, RegexLexer)
@@ -0,0 +1,125 @@
+"""
+Micro-benchmark of currency arithmetic: the float currencies, the fixed-point minor units of the money mode
+and the same operations on Decimal values rounded to the minor unit, in operations per second. The float
+and money columns run through Calculations as the interpreters call it. The Decimal mode does not exist,
+so the second table compares the arithmetic alone of all three: the float and money kernels are the
+calls the handlers make, the Decimal one the computation a Decimal mode would do.
+
+Run from the project root: PYTHONPATH=src python tests/benchmark/bench_money.py [--operations 100000]
+"""
+import argparse
+import time
+from decimal import Decimal, ROUND_HALF_EVEN
+
+from interpreter.calculations import Calculations
+from currency.currency import Currency, Money, CurrencyCode
+from currency.money import scale_by, convert_minor
+from currency.registry import CURRENCY_REGISTRY
+from tokkens.token import Position
+from error_manager.error_manager import ModulErrorManager
+from parse_objects.objects import (
+    Operator,
+    Comparison,
+    AddExpression,
+    MulExpression,
+    TranExpression
+)
+
+
+POSITION = Position(line=1, column=1)
+CENT = Decimal('0.01')
+EUR, USD, PLN = CurrencyCode.EUR, CurrencyCode.USD, CurrencyCode.PLN
+RATE = Decimal(repr(CURRENCY_REGISTRY.rate(USD, EUR)))
+TO_PLN = Decimal(repr(CURRENCY_REGISTRY.rate(EUR, PLN)))
+FLOAT_RATE, FLOAT_TO_PLN = CURRENCY_REGISTRY.rate(USD, EUR), CURRENCY_REGISTRY.rate(EUR, PLN)
+CONVERSION, TO_PLN_CONVERSION = CURRENCY_REGISTRY.scaled_rate(USD, EUR), CURRENCY_REGISTRY.scaled_rate(EUR, PLN)
+
+
+def rounded(value):
+    return value.quantize(CENT, rounding=ROUND_HALF_EVEN)
+
+
+# Every operation: its node, the operands of the float and money modes, and the float, money and Decimal
+# computations on the plain values 20.20 and 3.15.
+OPERATIONS = {
+    'add': (
+        AddExpression(position=POSITION, left=None, right=None),
+        (Currency(20.2, EUR), Currency(3.15, EUR)), (Money(2020, EUR), Money(315, EUR)),
+        lambda left, right: left + right,
+        lambda left, right: left + right,
+        lambda left, right: left + right
+    ),
+    'add cross': (
+        AddExpression(position=POSITION, left=None, right=None),
+        (Currency(20.2, EUR), Currency(3.15, USD)), (Money(2020, EUR), Money(315, USD)),
+        lambda left, right: left + right * FLOAT_RATE,
+        lambda left, right: left + convert_minor(right, CONVERSION),
+        lambda left, right: rounded(left + rounded(right * RATE))
+    ),
+    'mul float': (
+        MulExpression(position=POSITION, left=None, right=None),
+        (Currency(20.2, EUR), 0.15), (Money(2020, EUR), 0.15),
+        lambda left, right: left * 0.15,
+        lambda left, right: scale_by(left, 0.15),
+        lambda left, right: rounded(left * Decimal('0.15'))
+    ),
+    'mul int': (
+        MulExpression(position=POSITION, left=None, right=None),
+        (Currency(20.2, EUR), 3), (Money(2020, EUR), 3),
+        lambda left, right: left * 3,
+        lambda left, right: left * 3,
+        lambda left, right: left * 3
+    ),
+    'tran': (
+        TranExpression(position=POSITION, left=None, right=None),
+        (Currency(20.2, EUR), PLN), (Money(2020, EUR), PLN),
+        lambda left, right: left * FLOAT_TO_PLN,
+        lambda left, right: convert_minor(left, TO_PLN_CONVERSION),
+        lambda left, right: rounded(left * TO_PLN)
+    ),
+    'lt cross': (
+        Comparison(position=POSITION, left=None, right=None, operator=Operator.LT),
+        (Currency(20.2, EUR), Currency(3.15, USD)), (Money(2020, EUR), Money(315, USD)),
+        lambda left, right: left < right * FLOAT_RATE,
+        lambda left, right: left * CONVERSION[1] < right * CONVERSION[0],
+        lambda left, right: left < right * RATE
+    )
+}
+KERNEL_OPERANDS = ((20.2, 3.15), (2020, 315), (Decimal('20.20'), Decimal('3.15')))
+
+
+def measure(operation, left, right, operations):
+    start = time.perf_counter()
+    for _ in range(operations):
+        operation(left, right)
+    return operations / (time.perf_counter() - start)
+
+
+def calculation_of(calculations, node):
+    if isinstance(node, Comparison):
+        return lambda left, right: calculations.compare_values(left, right, node)
+    return lambda left, right: calculations.calculate_result(left, right, node)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--operations', type=int, default=100000)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    def report(name, measured):
+        rates = [max(measure(*operation, args.operations) for _ in range(args.repeats)) for operation in measured]
+        print(f'{name:<10}' + ''.join(f' {rate / 1e6:8.2f} M/s' for rate in rates))
+
+    print(f'{"Calculations":<10} {"float":>12} {"money":>12}')
+    with ModulErrorManager() as error_handler:
+        calculations = Calculations(error_handler)
+        for name, (node, float_operands, money_operands, *_) in OPERATIONS.items():
+            calculation = calculation_of(calculations, node)
+            report(name, [(calculation, *float_operands), (calculation, *money_operands)])
+    print(f'\n{"arithmetic":<10} {"float":>12} {"money":>12} {"Decimal":>12}')
+    for name, (*_, float_kernel, money_kernel, decimal_kernel) in OPERATIONS.items():
+        report(name, [
+            (kernel, *operands)
+            for kernel, operands in zip((float_kernel, money_kernel, decimal_kernel), KERNEL_OPERANDS)
+        ])
@@ -0,0 +1,53 @@
+"""
+Per-node overhead of the interpreter backends. Each snippet is repeated inside a loop and the time of
+the same loop without the snippet is subtracted, leaving the cost of evaluating the snippet nodes.
+
+Run from the project root: PYTHONPATH=src python tests/benchmark/bench_node_overhead.py [--copies 20]
+"""
+import argparse
+
+from main import BACKENDS
+from bench_backends import parse, run
+
+
+TEMPLATE = '''
+main()
+{{
+    x = 1;
+    y = 0;
+    i = 0;
+    while (i < {iterations})
+    {{
+        {body}
+        i = i + 1;
+    }}
+}}
+'''
+
+# Snippet and the number of AST nodes it evaluates.
+SNIPPETS = {
+    'identifier': ('x;', 1),
+    'addition': ('y = 1 + 2;', 4),
+    'comparison': ('y = x < 3;', 4),
+    'nested': ('y = (x + 1) * (x - 1) / 2;', 10)
+}
+
+
+def measure(backend, iterations, body, repeats):
+    elapsed, _ = run(backend, parse(TEMPLATE.format(iterations=iterations, body=body)), repeats)
+    return elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--copies', type=int, default=20)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    args = parser.parse_args()
+    for backend in args.backends:
+        empty = measure(backend, args.iterations, '', args.repeats)
+        for name, (snippet, nodes) in SNIPPETS.items():
+            elapsed = measure(backend, args.iterations, ' '.join([snippet] * args.copies), args.repeats)
+            per_node = (elapsed - empty) / (args.iterations * args.copies * nodes)
+            print(f'{backend:<10} {name:<12} {per_node * 1e9:8.1f} ns/node')
@@ -0,0 +1,89 @@
+"""
+Parser throughput benchmark on expression-heavy sources.
+
+The tokens are lexed once up front and replayed, so only the parser is measured.
+
+Run from the project root: PYTHONPATH=src python tests/benchmark/bench_parser.py [--functions 2000]
+"""
+import argparse
+import io
+import time
+
+from lexer.lexer import Lexer
+from parser.parser import Parser
+from tokkens.token import TokenType
+from error_manager.error_manager import ModulErrorManager
+
+
+FUNCTION = '''func{index}(x, y)
+{{
+    total = x * 2 + y / 4 - 10 USD -> EUR ^ 2;
+    flag = !(x > y) && x != 3 || y <= 2.5 && total >= 1;
+    while (x < 10 && !flag)
+    {{
+        x = x + 1 - y * (x - 2) / (y + 3);
+        name = 'text';
+    }}
+    return f(x + 1, y - 1, 2 * x) * -y + a.b.c;
+}}
+'''
+
+
+class ReplayLexer:
+    def __init__(self, tokens):
+        self._tokens = iter(tokens)
+
+    def next(self):
+        return next(self._tokens)
+
+
+def lex(source):
+    with ModulErrorManager() as error_handler:
+        lexer = Lexer(source=io.StringIO(source, newline=''), error_handler=error_handler, str_len_limit=256)
+        tokens = [lexer.next()]
+        while tokens[-1].type is not TokenType.EOF:
+            tokens.append(lexer.next())
+    return tokens
+
+
+def nested_source(depth):
+    return 'main()\n{\n    x = ' + '(' * depth + '1' + ' + 1)' * depth + ';\n}\n'
+
+
+def max_depth(limit=2000):
+    """
+    Finds the deepest bracket nesting the parser handles under the default recursion limit.
+    """
+    low, high = 0, limit
+    while low < high:
+        depth = (low + high + 1) // 2
+        try:
+            with ModulErrorManager() as error_handler:
+                Parser(lexer=ReplayLexer(lex(nested_source(depth))), error_handler=error_handler).parse()
+            low = depth
+        except RecursionError:
+            high = depth - 1
+    return low
+
+
+def run(name, tokens, repeats):
+    best = None
+    for _ in range(repeats):
+        with ModulErrorManager() as error_handler:
+            start = time.perf_counter()
+            Parser(lexer=ReplayLexer(tokens), error_handler=error_handler).parse()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f'{name:<10} {len(tokens):>10} tokens {best:8.3f} s {len(tokens) / best:12.0f} tokens/s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--functions', type=int, default=2000)
+    parser.add_argument('--depth', type=int, default=50)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+    source = ''.join(FUNCTION.format(index=index) for index in range(args.functions))
+    run('functions', lex(source), args.repeats)
+    run('nested', lex(nested_source(args.depth)), args.repeats)
+    print(f'max bracket nesting depth: {max_depth()}')
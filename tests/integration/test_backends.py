@@ -0,0 +1,395 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from lexer.lexer import Lexer
+from parser.parser import Parser
+from error_manager.error_manager import ModulErrorManager, FatalError
+from main import BACKENDS
+from interpreter.deep_stack import run_on_deep_stack
+from interpreter import deep_stack
+from bytecode import vm
+from resolver.purity import memoize_pure_functions
+from optimizer.constant_folding import fold_constants
+from optimizer.inlining import inline_small_functions
+from optimizer.specialization import specialize_functions
+from optimizer.loop_invariants import hoist_loop_invariants
+
+
+ACCEPTANCE_SOURCES = sorted((Path(__file__).parent.parent / 'acceptance').glob('*.txt'))
+SOURCES = [
+    '''inc(x)
+{
+    x = x + 1;
+}
+twice(y)
+{
+    inc(y);
+    inc(y);
+    return y;
+}
+main()
+{
+    a = 1;
+    inc(a);
+    print(a);
+    print(twice(a));
+    print(a);
+    inc(5);
+    inc(5);
+    i = 0;
+    while (i < 5)
+    {
+        i = i + 1;
+        if (i == 2) { continue; }
+        if (i == 4) { break; }
+        print(i);
+    }
+    print(true && false);
+    print(false && 5);
+    print(5 || true);
+    print(!5);
+    print(-true);
+    c = 10 EUR;
+    print(c.value);
+    print(c -> PLN);
+    print(c + 5 USD);
+    print(2 ^ 3);
+    print('a' + 'b' == 'ab');
+    print();
+}
+''',
+    '''f(x)
+{
+    break;
+}
+g(a, b)
+{
+    return a;
+}
+main()
+{
+    print(f(1));
+    x = 'a' * 2;
+    print(x);
+    print(g(1, f(2)));
+    print(g(f(3)));
+}
+''',
+    '''main()
+{
+    i = 0;
+    while (i < 3)
+    {
+        if (i == 2) { print(y); }
+        y = i;
+        i = i + 1;
+    }
+}
+''',
+    '''fib(n)
+{
+    if (n < 2) { return n; }
+    return fib(n - 1) + fib(n - 2);
+}
+main()
+{
+    print(fib(10));
+    if (true) { z = 1; }
+    z = 2;
+    if (true) { z = 3; }
+    print(z);
+    print(1 / 0);
+}
+''',
+    '''main()
+{
+    print(5 EUR + 3);
+}
+''',
+    '''inc(a)
+{
+    a = a + 1;
+    return 1;
+}
+main()
+{
+    x = 1;
+    print(x + inc(x));
+    print(x / inc(x));
+    print(x ^ inc(x));
+    print(x < inc(x));
+}
+''',
+    '''main()
+{
+    print(missing(1));
+}
+''',
+    '''inc(a)
+{
+    a = a + 1;
+    return 0;
+}
+same(a)
+{
+    return a;
+}
+main()
+{
+    x = 1;
+    inc(same(x));
+    print(x);
+    print(same(x) + inc(x));
+    print(true && inc(x) == 0);
+    print(-same(x));
+    if (print(x)) { print(1); } else { print(0); }
+    print(input() == 3);
+    print(2 EUR * 2 EUR);
+}
+''',
+    '''count(n, total)
+{
+    if (n == 0) { return total; }
+    return count(n - 1, total + n);
+}
+even(n)
+{
+    if (n == 0) { return true; }
+    return odd(n - 1);
+}
+odd(n)
+{
+    if (n == 0) { return false; }
+    return even(n - 1);
+}
+same(a)
+{
+    return a;
+}
+first(a, b)
+{
+    while (a < b)
+    {
+        a = a + 1;
+        if (a == 3) { return first(b, a); }
+    }
+    return same(a);
+}
+main()
+{
+    print(count(100, 0));
+    print(even(51));
+    x = 1;
+    y = first(x, 5);
+    y = y + 1;
+    print(x);
+    print(first(7, 2));
+    print(same(count(2)));
+}
+''',
+    '''id(a)
+{
+    return a;
+}
+inc(a)
+{
+    a = a + 1;
+    return 0;
+}
+add_one(a)
+{
+    return inc(a) + a;
+}
+square(x)
+{
+    return x * x;
+}
+pair(x, y)
+{
+    return x * 10 + y;
+}
+main()
+{
+    x = 1;
+    print(add_one(x));
+    inc(id(x));
+    print(x);
+    i = 0;
+    while (i < 3)
+    {
+        print(pair(square(x), square(i)) + pair(pair(1, 2), x));
+        i = i + 1;
+    }
+    print(pair(1));
+}
+''',
+    '''route(amount, code)
+{
+    if (code == 'EUR') { return amount -> EUR; }
+    if (code == 'USD') { return amount -> USD; } else { code; }
+    return amount -> PLN;
+}
+down(n, step)
+{
+    if (n <= 0) { return 0; }
+    return n + down(n - step, step);
+}
+keep(a, b)
+{
+    a = a + b;
+    return a;
+}
+main()
+{
+    money = 10 USD;
+    print(route(money, 'EUR'));
+    print(route(money, 'USD'));
+    print(route(money, 'PLN'));
+    print(route(money, 'EUR'));
+    print(route(5 EUR, 'USD'));
+    print(down(10, 2) + down(10, 3));
+    print(keep(1, 2));
+    print(route(money, 'GBP', 1));
+}
+'''
+]
+
+
+def run(backend, source_file, monkeypatch, capsys, memo_size=0, fold=False, max_clones=0, inline_size=0, hoist=False,
+        money=False):
+    monkeypatch.setattr('sys.stdin', io.StringIO('3\n'))
+    with ModulErrorManager() as error_handler:
+        try:
+            lexer = Lexer(source=source_file, error_handler=error_handler, str_len_limit=256, money=money)
+            program = Parser(lexer=lexer, error_handler=error_handler).parse()
+            if fold:
+                fold_constants(program, fold_currencies=True)
+            if max_clones:
+                specialize_functions(program, max_clones, fold_currencies=True)
+            if memo_size:
+                memoize_pure_functions(program, memo_size)
+            if inline_size:
+                inline_small_functions(program, inline_size)
+            if hoist:
+                hoist_loop_invariants(program)
+            BACKENDS[backend](program, error_handler)
+        except FatalError:
+            pass
+    return capsys.readouterr().out
+
+
+class TestBackends:
+    @pytest.mark.parametrize('backend', [backend for backend in BACKENDS if backend != 'tree'])
+    @pytest.mark.parametrize('path', ACCEPTANCE_SOURCES, ids=lambda path: path.name)
+    def test_acceptance_sources(self, backend, path, monkeypatch, capsys):
+        with open(path, 'r', newline='') as source_file:
+            expected = run('tree', source_file, monkeypatch, capsys)
+        with open(path, 'r', newline='') as source_file:
+            assert run(backend, source_file, monkeypatch, capsys) == expected
+
+    @pytest.mark.parametrize('backend', [backend for backend in BACKENDS if backend != 'tree'])
+    @pytest.mark.parametrize('source', SOURCES)
+    def test_same_behaviour(self, backend, source, monkeypatch, capsys):
+        expected = run('tree', io.StringIO(source, newline=''), monkeypatch, capsys)
+        assert run(backend, io.StringIO(source, newline=''), monkeypatch, capsys) == expected
+
+    @pytest.mark.parametrize('backend', BACKENDS)
+    @pytest.mark.parametrize('source', SOURCES)
+    def test_folded_constants(self, backend, source, monkeypatch, capsys):
+        expected = run('tree', io.StringIO(source, newline=''), monkeypatch, capsys)
+        assert run(backend, io.StringIO(source, newline=''), monkeypatch, capsys, fold=True) == expected
+
+    @pytest.mark.parametrize('backend', BACKENDS)
+    @pytest.mark.parametrize('source', SOURCES)
+    def test_specialized_functions(self, backend, source, monkeypatch, capsys):
+        expected = run('tree', io.StringIO(source, newline=''), monkeypatch, capsys)
+        output = run(backend, io.StringIO(source, newline=''), monkeypatch, capsys, fold=True, max_clones=4)
+        assert output == expected
+
+    @pytest.mark.parametrize('source', SOURCES)
+    def test_memoized_tree_walker(self, source, monkeypatch, capsys):
+        expected = run('tree', io.StringIO(source, newline=''), monkeypatch, capsys)
+        assert run('tree', io.StringIO(source, newline=''), monkeypatch, capsys, memo_size=2) == expected
+
+    @pytest.mark.parametrize('source', SOURCES)
+    def test_inlined_tree_walker(self, source, monkeypatch, capsys):
+        expected = run('tree', io.StringIO(source, newline=''), monkeypatch, capsys)
+        output = run('tree', io.StringIO(source, newline=''), monkeypatch, capsys, inline_size=16, hoist=True)
+        assert output == expected
+
+
+MONEY_SOURCE = '''main()
+{
+    a = 20.20 EUR;
+    b = 0.1 USD + 0.2 USD;
+    print(b == 0.3 USD);
+    print(a * 0.5);
+    print(a / 3);
+    print(a -> PLN);
+    print(a + 10 USD);
+    print(10.005 EUR);
+    print(-a);
+    print(a > 80 PLN);
+    print(1.5);
+    print(100 JPY);
+}
+'''
+MONEY_OUTPUT = 'True\n10.10 EUR\n6.73 EUR\n88.88 PLN\n29.29 EUR\n10.00 EUR\n-20.20 EUR\nTrue\n1.5\n100 JPY\n'
+
+
+class TestMoneyMode:
+    @pytest.mark.parametrize('backend', BACKENDS)
+    @pytest.mark.parametrize('fold', [False, True])
+    def test_fixed_point_currencies(self, backend, fold, monkeypatch, capsys):
+        output = run(backend, io.StringIO(MONEY_SOURCE, newline=''), monkeypatch, capsys, fold=fold, money=True)
+        assert output == MONEY_OUTPUT
+
+
+DEEP_RECURSION = '''count(n, total)
+{{
+    if (n == 0) {{ return total; }}
+    return count(n - 1, total + 1);
+}}
+depth(n)
+{{
+    if (n > 0)
+    {{
+        rest = depth(n - 1);
+        return rest + 1;
+    }}
+    return 0;
+}}
+main()
+{{
+    print({call});
+}}
+'''
+
+
+class TestDeepRecursion:
+    def test_tail_calls_keep_the_stack(self, monkeypatch, capsys):
+        source = DEEP_RECURSION.format(call='count(20000, 0)')
+        assert run('tree', io.StringIO(source, newline=''), monkeypatch, capsys) == '20000\n'
+
+    @pytest.mark.parametrize('backend', BACKENDS)
+    def test_deep_stack(self, backend, monkeypatch, capsys):
+        source = DEEP_RECURSION.format(call='depth(20000)')
+        output = run_on_deep_stack(run, backend, io.StringIO(source, newline=''), monkeypatch, capsys)
+        assert output == '20000\n'
+
+    @pytest.mark.parametrize('backend', BACKENDS)
+    def test_unbounded_recursion_is_an_error(self, backend, monkeypatch, capsys):
+        monkeypatch.setattr(deep_stack, 'MAX_CALL_DEPTH', 2000)
+        monkeypatch.setattr(vm, 'MAX_CALL_DEPTH', 2000)
+        source = 'f(n)\n{\n    x = f(n + 1);\n    return x;\n}\nmain()\n{\n    print(f(0));\n}\n'
+        with ModulErrorManager() as error_handler:
+            lexer = Lexer(source=io.StringIO(source, newline=''), error_handler=error_handler, str_len_limit=256)
+            program = Parser(lexer=lexer, error_handler=error_handler).parse()
+            with pytest.raises(FatalError):
+                run_on_deep_stack(
+                    BACKENDS[backend], program, error_handler,
+                    recursion_limit=deep_stack.recursion_limit(backend), error_manager=error_handler
+                )
+        assert 'Recursion too deep, more than 2000 nested function calls' in capsys.readouterr().out
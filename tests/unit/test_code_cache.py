@@ -0,0 +1,45 @@
+import io
+import os
+
+from lexer.lexer import Lexer
+from parser.parser import Parser
+from cache.code_cache import CodeCache
+from cache.program_cache import source_digest
+from transpiler.codegen import transpile
+from transpiler.runtime import execute
+from error_manager.error_manager import ModulErrorManager
+
+
+SOURCE = 'func(x)\n{\n\treturn x * 2 EUR;\n}\nmain()\n{\n\tprint(func(2));\n}\n'
+
+
+def parse(source):
+    with ModulErrorManager() as error_handler:
+        lexer = Lexer(source=io.StringIO(source, newline=''), error_handler=error_handler, str_len_limit=256)
+        return Parser(lexer=lexer, error_handler=error_handler).parse()
+
+
+class TestCodeCache:
+    def test_round_trip(self, tmp_path, capsys):
+        cache = CodeCache(directory=tmp_path, max_size=1 << 20)
+        digest = source_digest(io.BytesIO(SOURCE.encode()))
+        assert cache.load(digest) is None
+        assert cache.store(digest, *transpile(parse(SOURCE)))
+        code, nodes = cache.load(digest)
+        with ModulErrorManager() as error_handler:
+            execute(code, nodes, error_handler)
+        assert capsys.readouterr().out == '4 EUR\n'
+
+    def test_other_version_misses(self, tmp_path):
+        digest = source_digest(io.BytesIO(SOURCE.encode()))
+        CodeCache(directory=tmp_path, max_size=1 << 20, version='old').store(digest, *transpile(parse(SOURCE)))
+        assert CodeCache(directory=tmp_path, max_size=1 << 20, version='new').load(digest) is None
+
+    def test_corrupted_entry_is_dropped(self, tmp_path):
+        cache = CodeCache(directory=tmp_path, max_size=1 << 20)
+        digest = source_digest(io.BytesIO(SOURCE.encode()))
+        cache.store(digest, *transpile(parse(SOURCE)))
+        [entry] = os.listdir(tmp_path)
+        (tmp_path / entry).write_bytes(b'not a pickle')
+        assert cache.load(digest) is None
+        assert os.listdir(tmp_path) == []
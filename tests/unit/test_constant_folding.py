@@ -0,0 +1,69 @@
+import io
+
+import pytest
+
+from lexer.lexer import Lexer
+from parser.parser import Parser
+from optimizer.constant_folding import fold_constants, folding_version
+from parse_objects.objects import Constant, AddExpression, DivExpression, PowExpression, TranExpression
+from currency.currency import Currency, CurrencyCode
+from error_manager.error_manager import ModulErrorManager
+
+
+def folded_expression(expression, fold_currencies=False):
+    with ModulErrorManager() as error_handler:
+        lexer = Lexer(source=io.StringIO(f'main(){{ x = {expression}; }}', newline=''), error_handler=error_handler, str_len_limit=256)
+        program = Parser(lexer=lexer, error_handler=error_handler).parse()
+        fold_constants(program, fold_currencies=fold_currencies)
+        assert not error_handler.error_count()
+    return program.functions['main'].block.statements[0].right
+
+
+class TestConstantFolding:
+    @pytest.mark.parametrize('expression, value', [
+        ('(2 * 2) + 2 / 2', 5.0),
+        ('2 ^ 10 - 1', 1023),
+        ('-3 + 1', -2),
+        ('!true', False),
+        ('1 < 2', True),
+        ("'a' + 'b' == 'ab'", True),
+        ('true || 1 / 0', True),
+        ('false && x', True),
+        ('true && false', False),
+        ('2 ^ 0.5 > 1', True)
+    ])
+    def test_folded(self, expression, value):
+        node = folded_expression(expression)
+        assert type(node) is Constant
+        assert node.value == value and type(node.value) is type(value)
+
+    def test_position(self):
+        node = folded_expression('1 + 2 * 3')
+        assert (node.position.line, node.position.column) == (1, 13)
+
+    @pytest.mark.parametrize('expression, node_class', [
+        ('1 / 0', DivExpression),
+        ('2 ^ 62 + 2 ^ 62', AddExpression),
+        ('2 ^ 1000000', PowExpression),
+        ("'a' + 1", AddExpression),
+        ('x + 2 * 3', AddExpression)
+    ])
+    def test_errors_are_left_to_run(self, expression, node_class):
+        assert type(folded_expression(expression)) is node_class
+
+    def test_partially_folded(self):
+        node = folded_expression('x + 2 * 3')
+        assert type(node.right) is Constant and node.right.value == 6
+
+    def test_currencies(self):
+        assert type(folded_expression('20 USD -> EUR')) is TranExpression
+        assert type(folded_expression('2 EUR * 3')) is not Constant
+        assert folded_expression('20 USD -> PLN', fold_currencies=True).value == Currency(80.0, CurrencyCode.PLN)
+        assert folded_expression('10 PLN + 5 USD', fold_currencies=True).value == Currency(30.0, CurrencyCode.PLN)
+
+    def test_folding_versions(self):
+        versions = {
+            folding_version(False, False), folding_version(True, False), folding_version(True, True),
+            folding_version(True, False, max_clones=32)
+        }
+        assert len(versions) == 4
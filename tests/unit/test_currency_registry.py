@@ -0,0 +1,59 @@
+import io
+
+import pytest
+
+from lexer.lexer import Lexer
+from lexer.regex_lexer import RegexLexer
+from tokkens.token import TokenType
+from currency.config import CURRENCIES
+from currency.currency import Currency, CurrencyCode
+from currency.registry import CurrencyRegistry, CURRENCY_REGISTRY
+from interpreter.calculations import Calculations
+from parse_objects.objects import TranExpression
+from tokkens.token import Position
+from error_manager.error_manager import ModulErrorManager
+from error_manager.interface import FatalError
+from error_manager.interpreter_er import MissingExchangeRate
+
+
+CURRENCIES_WITH_RATES = [('EUR', 2, 4.0), ('JPY', 0, None), ('PLN', 2, 1.0), ('USD', 2, 2.0)]
+
+
+class TestCurrencyRegistry:
+    def test_iso_codes(self):
+        assert len(CurrencyCode) == len(CURRENCIES) > 150
+        assert CURRENCY_REGISTRY.code_of('JPY') is CurrencyCode.JPY
+        assert CURRENCY_REGISTRY.code_of('jpy') is None
+        assert CURRENCY_REGISTRY.minor_units[CurrencyCode.JPY] == 0
+        assert CURRENCY_REGISTRY.minor_units[CurrencyCode.KWD] == 3
+
+    def test_cross_rates(self):
+        registry = CurrencyRegistry(CURRENCIES_WITH_RATES, 'PLN')
+        assert registry.rate(0, 3) == 2.0
+        assert registry.rate(3, 0) == 0.5
+        assert registry.rate(2, 2) == 1.0
+
+    def test_missing_rates(self):
+        registry = CurrencyRegistry(CURRENCIES_WITH_RATES, 'PLN')
+        assert registry.rate(1, 2) is None
+        assert registry.rate(1, 1) == 1.0
+
+    @pytest.mark.parametrize('lexer_class', [Lexer, RegexLexer])
+    def test_lexers_use_the_registry(self, lexer_class):
+        with ModulErrorManager() as error_handler:
+            lexer = lexer_class(source=io.StringIO('CHF GBP JPYX', newline=''), error_handler=error_handler,
+                                str_len_limit=256)
+            tokens = [lexer.next() for _ in range(3)]
+        assert [token.type for token in tokens] == [TokenType.CURR, TokenType.CURR, TokenType.ID]
+        assert tokens[0].value is CurrencyCode.CHF
+
+    def test_conversion_without_a_rate(self):
+        expression = TranExpression(position=Position(line=1, column=1), left=None, right=None)
+        with ModulErrorManager() as error_handler:
+            calculations = Calculations(error_handler)
+            assert calculations.calculate_result(Currency(3, CurrencyCode.JPY), CurrencyCode.JPY, expression) == \
+                Currency(3.0, CurrencyCode.JPY)
+            with pytest.raises(FatalError):
+                calculations.calculate_result(Currency(3, CurrencyCode.JPY), CurrencyCode.EUR, expression)
+            assert type(error_handler._errors[0]) is MissingExchangeRate
+            error_handler._errors.clear()
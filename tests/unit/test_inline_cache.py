@@ -0,0 +1,98 @@
+import io
+from itertools import product
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from lexer.lexer import Lexer
+from parser.parser import Parser
+from visitor.interpreter_visitor import InterpreterVisitor
+from interpreter.calculations import Calculations
+from interpreter.inline_cache import collect_inline_caches
+from currency.currency import Currency, CurrencyCode
+from tokkens.token import Position
+from error_manager.error_manager import ModulErrorManager
+from parse_objects.objects import (
+    Operator,
+    Comparison,
+    AddExpression,
+    SubExpression,
+    MulExpression,
+    TranExpression
+)
+
+
+POSITION = Position(line=1, column=1)
+VALUES = [3, 2.5, True, 'ab', b'cd', Currency(4, CurrencyCode.EUR), Currency(2, CurrencyCode.USD), 'PLN']
+CALCULATIONS = [AddExpression, SubExpression, MulExpression, TranExpression]
+SOURCE = '''main()
+{
+    i = 0;
+    while (i < 10)
+    {
+        i = i + 1;
+    }
+    x = 1 EUR * 2;
+    x = 'a' + 'b';
+}
+'''
+
+
+def outcome(function, *arguments):
+    with ModulErrorManager() as error_handler:
+        try:
+            result = function(Calculations(error_handler), *arguments)
+        except Exception as exception:
+            return type(exception), error_handler.error_count()
+        return result, error_handler.error_count()
+
+
+class TestInlineCache:
+    @pytest.mark.parametrize('node_class', CALCULATIONS)
+    @pytest.mark.parametrize('left, right', list(product(VALUES, VALUES)))
+    def test_specialized_calculation(self, node_class, left, right):
+        node = node_class(position=POSITION, left=None, right=None)
+        first = outcome(Calculations.calculate_result, left, right, node)
+        cached = outcome(Calculations.calculate_result, left, right, node)
+        assert cached == first
+        assert (node.inline_cache.hits, node.inline_cache.misses) == (1, 1)
+
+    @pytest.mark.parametrize('comparison_operator', [Operator.EQ, Operator.NE, Operator.LT, Operator.GE])
+    @pytest.mark.parametrize('left, right', list(product(VALUES, VALUES)))
+    def test_specialized_comparison(self, comparison_operator, left, right):
+        node = Comparison(position=POSITION, left=None, right=None, operator=comparison_operator)
+        first = outcome(Calculations.compare_values, left, right, node)
+        cached = outcome(Calculations.compare_values, left, right, node)
+        assert cached == first
+
+    def test_other_types_miss(self):
+        node = AddExpression(position=POSITION, left=None, right=None)
+        outcome(Calculations.calculate_result, 1, 2, node)
+        outcome(Calculations.calculate_result, 1, 2, node)
+        outcome(Calculations.calculate_result, 1.5, 2, node)
+        outcome(Calculations.calculate_result, 1.5, 2, node)
+        cache = node.inline_cache
+        assert (cache.left_type, cache.right_type, cache.hits, cache.misses) == (float, int, 2, 2)
+
+    def test_shared_instance(self):
+        node = AddExpression(position=POSITION, left=None, right=None)
+        operands = [(index, 2) if index % 2 else (Currency(index, CurrencyCode.EUR), Currency(2, CurrencyCode.EUR)) for index in range(400)]
+        with ModulErrorManager() as error_handler:
+            calculations = Calculations(error_handler)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda pair: calculations.calculate_result(*pair, node), operands))
+        assert results == [left + right if type(left) is int else Currency(left.value + 2, CurrencyCode.EUR) for left, right in operands]
+        assert error_handler.error_count() == 0
+
+    def test_counters_of_program(self):
+        with ModulErrorManager() as error_handler:
+            lexer = Lexer(source=io.StringIO(SOURCE, newline=''), error_handler=error_handler, str_len_limit=256)
+            program = Parser(lexer=lexer, error_handler=error_handler).parse()
+            program.accept(InterpreterVisitor(error_handler))
+        caches = {type(node).__name__ + str(node.position.line): node.inline_cache for node in collect_inline_caches(program)}
+        assert {name: (cache.hits, cache.misses) for name, cache in caches.items()} == {
+            'Comparison4': (10, 1),
+            'AddExpression6': (9, 1),
+            'MulExpression8': (0, 1),
+            'AddExpression9': (0, 1)
+        }
@@ -0,0 +1,84 @@
+import io
+
+from lexer.lexer import Lexer
+from parser.parser import Parser
+from optimizer.inlining import inline_small_functions
+from parse_objects.objects import InlinedCall, FunctionCall
+from error_manager.error_manager import ModulErrorManager
+
+
+SOURCE = '''square(x)
+{
+    return x * x;
+}
+fourth(x)
+{
+    return square(square(x));
+}
+large(x)
+{
+    return x + x + x + x + x + x + x + x + x + x;
+}
+fact(n)
+{
+    return n * fact(n - 1);
+}
+ping(n)
+{
+    return pong(n);
+}
+pong(n)
+{
+    return ping(n);
+}
+global(x)
+{
+    return x + y;
+}
+twice(x)
+{
+    y = x * 2;
+    return y;
+}
+main()
+{
+    a = square(2);
+    a = fourth(2);
+    a = large(2);
+    a = fact(2);
+    a = ping(2);
+    a = global(2);
+    a = twice(2);
+    a = square(2, 3);
+}
+'''
+
+
+def inlined_calls(max_size=16):
+    with ModulErrorManager() as error_handler:
+        lexer = Lexer(source=io.StringIO(SOURCE, newline=''), error_handler=error_handler, str_len_limit=256)
+        program = Parser(lexer=lexer, error_handler=error_handler).parse()
+        inline_small_functions(program, max_size)
+    return [statement.right.variable[0] for statement in program.functions['main'].block.statements]
+
+
+class TestInlining:
+    def test_inlined_functions(self):
+        calls = inlined_calls()
+        assert [call.name for call in calls if type(call) is InlinedCall] == ['square', 'fourth']
+        assert all(type(call) is FunctionCall for call in calls if type(call) is not InlinedCall)
+
+    def test_nested_calls_are_inlined(self):
+        fourth = inlined_calls()[1]
+        outer = fourth.expression.variable[0]
+        assert type(outer) is InlinedCall and type(outer.arguments[0].variable[0]) is InlinedCall
+
+    def test_size_budget(self):
+        calls = inlined_calls(max_size=40)
+        assert type(calls[2]) is InlinedCall
+        assert type(inlined_calls(max_size=4)[1]) is FunctionCall
+
+    def test_positions_of_the_function(self):
+        square = inlined_calls()[0]
+        assert (square.position.line, square.expression.position.line) == (36, 3)
+        assert square.parameters == ['x']
@@ -0,0 +1,74 @@
+import io
+
+import pytest
+
+from lexer.lexer import Lexer
+from lexer.regex_lexer import RegexLexer
+from lexer.source import TextSource
+from parser.parser import Parser
+from parser.lazy import LazySource, materialize_all
+from parse_objects.objects import LazyBlock
+from error_manager.error_manager import ModulErrorManager, FatalError
+
+
+SOURCE = "func(x)\n{\n\tif (x > 1) {\n\t\treturn 'a\\nb';\n\t}\n\treturn x * 2 EUR;\n}\nmain()\n{\n\tprint(func(2));\n}\n"
+BROKEN_SOURCE = 'broken()\n{\n\tx = ;\n}\nmain()\n{\n\tprint(1);\n}\n'
+
+
+def parse(source, lexer_class):
+    with ModulErrorManager() as error_handler:
+        lexer = lexer_class(source=io.StringIO(source, newline=''), error_handler=error_handler, str_len_limit=256)
+        return Parser(lexer=lexer, error_handler=error_handler).parse()
+
+
+def parse_lazily(source, lexer_class, error_handler):
+    lexer = lexer_class(source=TextSource(source), error_handler=error_handler, str_len_limit=256)
+    lazy_source = LazySource(source, lexer_class=lexer_class, str_len_limit=256)
+    return Parser(lexer=lexer, error_handler=error_handler, lazy_source=lazy_source).parse()
+
+
+class TestLazyParser:
+    @pytest.mark.parametrize('lexer_class', [Lexer, RegexLexer])
+    @pytest.mark.parametrize('newline', ['\n', '\r\n', '\n\r'])
+    def test_bodies_match_eager_parse(self, lexer_class, newline):
+        source = SOURCE.replace('\n', newline)
+        eager = parse(source, lexer_class)
+        with ModulErrorManager() as error_handler:
+            lazy = parse_lazily(source, lexer_class, error_handler)
+            assert all(isinstance(function.block, LazyBlock) for function in lazy.functions.values())
+            for name, function in eager.functions.items():
+                block = lazy.functions[name].block
+                assert not block.materialized
+                assert block.position == function.block.position
+                assert block.statements == function.block.statements
+                assert block.materialized
+
+    def test_unused_broken_function_is_not_parsed(self):
+        with ModulErrorManager() as error_handler:
+            program = parse_lazily(BROKEN_SOURCE, Lexer, error_handler)
+            assert error_handler.error_count() == 0
+            assert program.functions['main'].block.statements
+            with pytest.raises(FatalError):
+                materialize_all(program)
+            assert error_handler.error_count() == 1
+
+    @pytest.mark.parametrize('lexer_class', [Lexer, RegexLexer])
+    @pytest.mark.parametrize('newline', ['\n', '\r\n'])
+    def test_lexer_errors_match_eager_parse(self, lexer_class, newline, capsys):
+        source = 'func()\n{\n\tx = 1; # ' + 'c' * 300 + '\n}\nmain()\n{\n\tprint(func());\n}\n'
+        source = source.replace('\n', newline)
+        parse(source, lexer_class)
+        eager = capsys.readouterr().out
+        with ModulErrorManager() as error_handler:
+            materialize_all(parse_lazily(source, lexer_class, error_handler))
+            assert error_handler.error_count() == 2
+        assert capsys.readouterr().out == eager
+
+    @pytest.mark.parametrize('lexer_class', [Lexer, RegexLexer])
+    def test_lone_newlines_in_a_two_character_newline_file(self, lexer_class):
+        source = SOURCE.replace('\n', '\r\n', 3)
+        eager = parse(source, lexer_class)
+        with ModulErrorManager() as error_handler:
+            lazy = parse_lazily(source, lexer_class, error_handler)
+            for name, function in eager.functions.items():
+                assert lazy.functions[name].block.statements == function.block.statements
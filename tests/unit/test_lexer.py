@@ -3,6 +3,7 @@ import io
 
 from lexer.lexer import Lexer
 from tokkens.token import TokenType, Token, Position
+from currency.currency import CurrencyCode
 from error_manager.error_manager import ModulErrorManager
 
 
@@ -56,10 +57,10 @@ class TestLexer:
             assert lexer.next() == expected_token
 
     @pytest.mark.parametrize('source, expected_token', [
-        ('USD', Token(value='USD', position=Position(line=1, column=1), type=TokenType.CURR)),
-        ('PLN', Token(value='PLN', position=Position(line=1, column=1), type=TokenType.CURR)),
-        ('EUR', Token(value='EUR', position=Position(line=1, column=1), type=TokenType.CURR)),
-        ('\n EUR', Token(value='EUR', position=Position(line=2, column=2), type=TokenType.CURR)),
+        ('USD', Token(value=CurrencyCode.USD, position=Position(line=1, column=1), type=TokenType.CURR)),
+        ('PLN', Token(value=CurrencyCode.PLN, position=Position(line=1, column=1), type=TokenType.CURR)),
+        ('EUR', Token(value=CurrencyCode.EUR, position=Position(line=1, column=1), type=TokenType.CURR)),
+        ('\n EUR', Token(value=CurrencyCode.EUR, position=Position(line=2, column=2), type=TokenType.CURR)),
     ])
     def test_next_curr(self, source, expected_token):
         with ModulErrorManager() as error_handler:
@@ -210,10 +211,31 @@ class TestLexer:
                 Token(value='gżegżółka', position=Position(line=1, column=1), type=TokenType.ID),
                 Token(value='while', position=Position(line=2, column=2), type=TokenType.WHILE_KEY),
                 Token(value=24.5, position=Position(line=2, column=8), type=TokenType.FLOAT),
-                Token(value='PLN', position=Position(line=2, column=13), type=TokenType.CURR),
+                Token(value=CurrencyCode.PLN, position=Position(line=2, column=13), type=TokenType.CURR),
                 Token(value=None, position=Position(line=2, column=16), type=TokenType.EOF),
             ]
         ),
+        (
+            'if\n\r else\n\rwhile',
+            [
+                Token(value='if', position=Position(line=1, column=1), type=TokenType.IF_KEY),
+                Token(value='else', position=Position(line=2, column=2), type=TokenType.ELSE_KEY),
+                Token(value='while', position=Position(line=3, column=1), type=TokenType.WHILE_KEY),
+                Token(value=None, position=Position(line=3, column=6), type=TokenType.EOF),
+            ]
+        ),
+        (
+            'x;\r\ny\n}\r\nz\rw',
+            [
+                Token(value='x', position=Position(line=1, column=1), type=TokenType.ID),
+                Token(value=';', position=Position(line=1, column=2), type=TokenType.SEMI_COLON),
+                Token(value='y', position=Position(line=2, column=1), type=TokenType.ID),
+                Token(value='}', position=Position(line=3, column=1), type=TokenType.BRACE_C),
+                Token(value='z', position=Position(line=4, column=1), type=TokenType.ID),
+                Token(value='w', position=Position(line=5, column=1), type=TokenType.ID),
+                Token(value=None, position=Position(line=5, column=2), type=TokenType.EOF),
+            ]
+        ),
     ])
     def test_next_bytes_before_newline(self, source, expected_tokens):
         with ModulErrorManager() as error_handler:
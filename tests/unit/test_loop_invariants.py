@@ -0,0 +1,80 @@
+import io
+
+from lexer.lexer import Lexer
+from parser.parser import Parser
+from optimizer.loop_invariants import hoist_loop_invariants
+from parse_objects.objects import InvariantExpression
+from visitor.interpreter_visitor import InterpreterVisitor
+from error_manager.error_manager import ModulErrorManager
+
+
+SOURCE = '''square(x)
+{
+    return x * x;
+}
+inc(a)
+{
+    a = a + 1;
+}
+main()
+{
+    n = 3;
+    m = 1;
+    i = 0;
+    while (i < n)
+    {
+        j = 0;
+        while (j < m * 2)
+        {
+            x = square(m + 1);
+            y = i + 1;
+            z = (20 USD -> EUR) * 2;
+            print(x + y + z.value);
+            j = j + 1;
+        }
+        inc(m);
+        i = i + 1;
+    }
+}
+'''
+
+
+def hoisted_program(source):
+    with ModulErrorManager() as error_handler:
+        lexer = Lexer(source=io.StringIO(source, newline=''), error_handler=error_handler, str_len_limit=256)
+        program = Parser(lexer=lexer, error_handler=error_handler).parse()
+        hoist_loop_invariants(program)
+    return program
+
+
+class TestLoopInvariantHoisting:
+    def test_invariants(self):
+        outer = hoisted_program(SOURCE).functions['main'].block.statements[3]
+        inner = outer.true_block.statements[1]
+        statements = inner.true_block.statements
+        assert type(statements[0].right) is InvariantExpression
+        assert type(statements[1].right) is InvariantExpression
+        assert type(statements[2].right) is InvariantExpression
+        assert type(statements[4].right) is not InvariantExpression
+        assert inner.invariants == [inner.condition.right, statements[0].right, statements[1].right]
+        assert outer.invariants == [statements[2].right]
+
+    def test_invariant_of_the_outer_loop(self):
+        source = SOURCE.replace('inc(m);', '')
+        outer = hoisted_program(source).functions['main'].block.statements[3]
+        inner = outer.true_block.statements[1]
+        assert type(inner.condition.right) is InvariantExpression
+        assert inner.condition.right in outer.invariants
+        assert type(inner.true_block.statements[0].right) is InvariantExpression
+
+    def test_results_are_the_same(self, capsys):
+        outputs = []
+        for hoist in (False, True):
+            with ModulErrorManager() as error_handler:
+                lexer = Lexer(source=io.StringIO(SOURCE, newline=''), error_handler=error_handler, str_len_limit=256)
+                program = Parser(lexer=lexer, error_handler=error_handler).parse()
+                if hoist:
+                    hoist_loop_invariants(program)
+                program.accept(InterpreterVisitor(error_handler))
+            outputs.append(capsys.readouterr().out)
+        assert outputs[0] == outputs[1]
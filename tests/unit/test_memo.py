@@ -0,0 +1,121 @@
+import io
+
+import pytest
+
+from lexer.lexer import Lexer
+from parser.parser import Parser
+from resolver.purity import PurityAnalysis, memoize_pure_functions
+from interpreter.memo import MemoCache, memo_key, MISSING
+from interpreter.reference import Reference
+from currency.currency import Currency, CurrencyCode
+from visitor.interpreter_visitor import InterpreterVisitor
+from error_manager.error_manager import ModulErrorManager
+
+
+SOURCE = '''square(x)
+{
+    y = x * x;
+    return y;
+}
+fib(n)
+{
+    if (n < 2) { return n; }
+    return fib(n - 1) + fib(n - 2);
+}
+even(n)
+{
+    if (n == 0) { return true; }
+    return odd(n - 1);
+}
+odd(n)
+{
+    if (n == 0) { return false; }
+    return even(n - 1);
+}
+inc(a)
+{
+    a = a + 1;
+}
+loud(a)
+{
+    print(a);
+    return a;
+}
+uses_inc(a)
+{
+    inc(a);
+    return a;
+}
+uses_loud(a)
+{
+    return square(loud(a));
+}
+stray()
+{
+    break;
+}
+looping(n)
+{
+    while (n > 0) { break; }
+    return missing(n);
+}
+print(a)
+{
+    return a;
+}
+main()
+{
+    print(fib(20));
+    print(square(3) + square(3));
+}
+'''
+
+
+def parse(source):
+    with ModulErrorManager() as error_handler:
+        lexer = Lexer(source=io.StringIO(source, newline=''), error_handler=error_handler, str_len_limit=256)
+        return Parser(lexer=lexer, error_handler=error_handler).parse()
+
+
+class TestPurityAnalysis:
+    def test_pure_functions(self):
+        functions = parse(SOURCE).functions
+        del functions['print']
+        assert PurityAnalysis(functions).pure_functions() == {'square', 'fib', 'even', 'odd'}
+
+    def test_builtin_names(self):
+        program = parse(SOURCE)
+        memoize_pure_functions(program, 8)
+        memoized = {name for name, function in program.functions.items() if function.memo is not None}
+        assert memoized == {'square', 'fib', 'even', 'odd'}
+
+
+class TestMemoCache:
+    def test_least_recently_used_is_evicted(self):
+        memo = MemoCache(2)
+        memo.store(1, 'a')
+        memo.store(2, 'b')
+        assert memo.get(1) == 'a'
+        memo.store(3, 'c')
+        assert memo.get(2) is MISSING
+        assert memo.get(1) == 'a' and memo.get(3) == 'c'
+        assert (memo.hits, memo.misses, memo.evictions, len(memo)) == (3, 1, 1, 2)
+
+    @pytest.mark.parametrize('values', [(1, 1.0), (1, True), (0, False), ('1', 1), (Currency(1, CurrencyCode.EUR), Currency(1.0, CurrencyCode.EUR))])
+    def test_keys_of_equal_values_of_other_types(self, values):
+        assert memo_key([values[0]]) != memo_key([values[1]])
+
+    def test_keys_of_cells(self):
+        assert memo_key([Reference(value=Currency(2, CurrencyCode.USD)), 3]) == memo_key([Currency(2, CurrencyCode.USD), Reference(value=3)])
+        assert memo_key([Reference(value=[1])]) is None
+
+    def test_tree_walker_uses_the_caches(self, capsys):
+        program = parse(SOURCE)
+        memoize_pure_functions(program, 8)
+        with ModulErrorManager() as error_handler:
+            program.accept(InterpreterVisitor(error_handler))
+        assert capsys.readouterr().out == '6765\n18\n'
+        fib = program.functions['fib'].memo
+        assert len(fib) == 8 and fib.evictions == 11
+        square = program.functions['square'].memo
+        assert (square.hits, square.misses) == (1, 1)
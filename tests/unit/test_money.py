@@ -0,0 +1,109 @@
+import io
+
+import pytest
+
+from lexer.lexer import Lexer
+from lexer.regex_lexer import RegexLexer
+from parser.parser import Parser
+from tokkens.token import TokenType, Position
+from currency.currency import Currency, CurrencyCode, Money
+from currency.money import DecimalLiteral, divide_rounded, scaled_rate, scale_by, divide_by, convert_minor
+from currency.registry import CurrencyRegistry
+from interpreter.calculations import Calculations
+from parse_objects.objects import AddExpression, TranExpression, Comparison, Operator
+from error_manager.error_manager import ModulErrorManager
+
+
+POSITION = Position(line=1, column=1)
+EUR, USD, PLN, JPY = CurrencyCode.EUR, CurrencyCode.USD, CurrencyCode.PLN, CurrencyCode.JPY
+
+
+class TestFixedPoint:
+    @pytest.mark.parametrize('numerator, expected', [(5, 2), (15, 8), (25, 12), (-5, -2), (-15, -8), (7, 4), (-7, -4)])
+    def test_divide_rounded_half_to_even(self, numerator, expected):
+        assert divide_rounded(numerator, 2) == expected
+
+    def test_divide_rounded_to_nearest(self):
+        assert divide_rounded(7, 3) == 2
+        assert divide_rounded(8, 3) == 3
+        assert divide_rounded(-8, 3) == -3
+
+    def test_literal_minor_units(self):
+        assert DecimalLiteral(20, 2, 1).minor_units(2) == 2020
+        assert DecimalLiteral(10, 5, 3).minor_units(2) == 1000
+        assert DecimalLiteral(10, 15, 3).minor_units(2) == 1002
+        assert DecimalLiteral(100, 0, 0).minor_units(0) == 100
+        assert DecimalLiteral(1, 5, 1).number() == 1.5
+
+    def test_scaled_arithmetic(self):
+        assert scale_by(2020, 0.5) == 1010
+        assert scale_by(2020, 3) == 6060
+        assert divide_by(2020, 3) == 673
+        assert divide_by(2020, -4) == -505
+        assert divide_by(2020, 0.5) == 4040
+
+    def test_conversion_between_scales(self):
+        assert convert_minor(2020, scaled_rate(4.4, EUR, PLN)) == 8888
+        assert convert_minor(100, scaled_rate(0.025, JPY, PLN)) == 250
+        assert convert_minor(250, scaled_rate(40.0, PLN, JPY)) == 100
+
+    def test_money_str(self):
+        assert str(Money(2020, EUR)) == '20.20 EUR'
+        assert str(Money(-5, EUR)) == '-0.05 EUR'
+        assert str(Money(100, JPY)) == '100 JPY'
+        assert Money(2020, EUR).value == 20.2
+
+
+class TestMoneyLiterals:
+    @pytest.mark.parametrize('lexer_class', [Lexer, RegexLexer])
+    def test_numbers_keep_their_digits(self, lexer_class):
+        with ModulErrorManager() as error_handler:
+            lexer = lexer_class(source=io.StringIO('20.20 12', newline=''), error_handler=error_handler,
+                                str_len_limit=256, money=True)
+            first, second = lexer.next(), lexer.next()
+        assert (first.type, first.value) == (TokenType.FLOAT, DecimalLiteral(20, 20, 2))
+        assert (second.type, second.value) == (TokenType.INT, DecimalLiteral(12, 0, 0))
+
+    def test_parsed_constants(self):
+        source = 'main()\n{\n    a = 0.1 USD;\n    b = 0.1;\n    c = 3;\n}\n'
+        with ModulErrorManager() as error_handler:
+            lexer = Lexer(source=io.StringIO(source, newline=''), error_handler=error_handler, str_len_limit=256,
+                          money=True)
+            program = Parser(lexer=lexer, error_handler=error_handler).parse()
+        values = [statement.right.value for statement in program.functions['main'].block.statements]
+        assert values == [Money(10, USD), 0.1, 3]
+        assert type(values[2]) is int
+
+
+class TestMoneyCalculations:
+    def calculate(self, left, right, node):
+        with ModulErrorManager() as error_handler:
+            calculations = Calculations(error_handler)
+            if isinstance(node, Comparison):
+                return calculations.compare_values(left, right, node)
+            return calculations.calculate_result(left, right, node)
+
+    def test_exact_sums(self):
+        node = AddExpression(position=POSITION, left=None, right=None)
+        assert self.calculate(Money(10, USD), Money(20, USD), node) == Money(30, USD)
+        assert self.calculate(Money(2020, EUR), Money(1000, USD), node) == Money(2929, EUR)
+
+    def test_transfer_and_comparison(self):
+        assert self.calculate(Money(2020, EUR), PLN, TranExpression(position=POSITION, left=None, right=None)) == \
+            Money(8888, PLN)
+        comparison = Comparison(position=POSITION, left=None, right=None, operator=Operator.GT)
+        assert self.calculate(Money(2020, EUR), Money(8000, PLN), comparison) is True
+        assert self.calculate(Money(2000, EUR), Money(8800, PLN), comparison) is False
+
+    def test_mixed_modes_are_not_added(self, capsys):
+        node = AddExpression(position=POSITION, left=None, right=None)
+        assert self.calculate(Money(100, EUR), Currency(1.0, EUR), node) is None
+        assert 'is not allowed' in capsys.readouterr().out
+
+    def test_scaled_rates_follow_the_registry(self):
+        registry = CurrencyRegistry()
+        assert registry.scaled_rate(EUR, PLN) == (22, 5)
+        registry.update_rates({'EUR': 5.0}, 'PLN')
+        assert registry.scaled_rate(EUR, PLN) == (5, 1)
+        assert registry.scaled_rate(PLN, EUR) == (1, 5)
+        assert registry.scaled_rate(JPY, PLN) is None
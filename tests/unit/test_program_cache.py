@@ -0,0 +1,52 @@
+import io
+import os
+
+from lexer.lexer import Lexer
+from parser.parser import Parser
+from cache.disk_cache import DiskCache
+from cache.program_cache import ProgramCache, source_digest
+from error_manager.error_manager import ModulErrorManager
+
+
+SOURCE = 'func(x)\n{\n\treturn x * 2 EUR;\n}\nmain()\n{\n\tprint(func(2));\n}\n'
+
+
+def parse(source):
+    with ModulErrorManager() as error_handler:
+        lexer = Lexer(source=io.StringIO(source, newline=''), error_handler=error_handler, str_len_limit=256)
+        return Parser(lexer=lexer, error_handler=error_handler).parse()
+
+
+class TestProgramCache:
+    def test_round_trip(self, tmp_path):
+        cache = ProgramCache(directory=tmp_path, max_size=1 << 20)
+        digest = source_digest(io.BytesIO(SOURCE.encode()))
+        assert cache.load(digest) is None
+        program = parse(SOURCE)
+        assert cache.store(digest, program)
+        assert cache.load(digest) == program
+
+    def test_other_version_misses(self, tmp_path):
+        digest = source_digest(io.BytesIO(SOURCE.encode()))
+        ProgramCache(directory=tmp_path, max_size=1 << 20, version='old').store(digest, parse(SOURCE))
+        assert ProgramCache(directory=tmp_path, max_size=1 << 20, version='new').load(digest) is None
+
+    def test_corrupted_entry_is_dropped(self, tmp_path):
+        cache = ProgramCache(directory=tmp_path, max_size=1 << 20)
+        digest = source_digest(io.BytesIO(SOURCE.encode()))
+        cache.store(digest, parse(SOURCE))
+        [entry] = os.listdir(tmp_path)
+        (tmp_path / entry).write_bytes(b'not a pickle')
+        assert cache.load(digest) is None
+        assert os.listdir(tmp_path) == []
+
+    def test_eviction_keeps_recently_used(self, tmp_path):
+        cache = DiskCache(directory=tmp_path, max_size=250)
+        for index, key in enumerate(['a', 'b', 'c']):
+            cache.store(key, bytes(100))
+            os.utime(tmp_path / (key + DiskCache.SUFFIX), (index, index))
+            if key == 'b':
+                cache.load('a')
+        assert cache.load('a') is not None
+        assert cache.load('b') is None
+        assert cache.load('c') is not None
@@ -0,0 +1,119 @@
+import io
+import struct
+from datetime import date, timedelta
+
+import pytest
+
+from lexer.lexer import Lexer
+from parser.parser import Parser
+from currency.currency import Currency, CurrencyCode
+from currency.registry import CurrencyRegistry
+from currency.history import RateHistory, open_rate_history, rate_at, convert_at
+from currency import history as history_module
+from currency.refresher import RateCache, RateRefresher
+from visitor.interpreter_visitor import InterpreterVisitor
+from error_manager.error_manager import ModulErrorManager
+
+
+FIRST_DAY = date(2015, 1, 1)
+
+
+def rates_of(eur, usd=None):
+    rates = [None] * len(CurrencyCode)
+    rates[CurrencyCode.PLN] = 1.0
+    rates[CurrencyCode.EUR] = eur
+    rates[CurrencyCode.USD] = usd
+    return rates
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_module, '_history', None)
+    history = open_rate_history(tmp_path / 'rates.hist')
+    for days in range(0, 10 * 365, 20):
+        history.append(FIRST_DAY + timedelta(days=days), rates_of(4.0 + days / 10000))
+    return history
+
+
+class TestRateHistory:
+    def test_rates_of_a_day(self, history):
+        assert history.rate_at(FIRST_DAY, CurrencyCode.EUR, CurrencyCode.PLN) == 4.0
+        assert history.rate_at(FIRST_DAY + timedelta(days=100), CurrencyCode.EUR, CurrencyCode.PLN) == 4.01
+        assert history.rate_at(FIRST_DAY, CurrencyCode.PLN, CurrencyCode.EUR) == 0.25
+
+    def test_day_without_rates_uses_the_last_one_before(self, history):
+        assert history.rate_at(FIRST_DAY + timedelta(days=119), CurrencyCode.EUR, CurrencyCode.PLN) == 4.01
+        assert history.rate_at(date(2100, 1, 1), CurrencyCode.EUR, CurrencyCode.PLN) == 4.364
+        assert history.rate_at(FIRST_DAY - timedelta(days=1), CurrencyCode.EUR, CurrencyCode.PLN) is None
+
+    def test_unknown_rates(self, history):
+        assert history.rate_at(FIRST_DAY, CurrencyCode.USD, CurrencyCode.PLN) is None
+        assert history.rate_at(FIRST_DAY, CurrencyCode.USD, CurrencyCode.USD) == 1.0
+
+    def test_append_only(self, history):
+        assert len(history) == 183
+        with pytest.raises(ValueError):
+            history.append(history.last_day(), rates_of(5.0))
+
+    def test_reopened_file(self, history, tmp_path):
+        reopened = RateHistory(tmp_path / 'rates.hist')
+        assert len(reopened) == len(history)
+        assert reopened.rate_at(FIRST_DAY, CurrencyCode.EUR, CurrencyCode.PLN) == 4.0
+
+    def test_file_with_other_currencies(self, tmp_path):
+        path = tmp_path / 'old.hist'
+        path.write_bytes(struct.pack('<4sHH', b'TKRH', 1, 2) + b'PLNEUR' + struct.pack('<i2d', 1, 1.0, 4.0))
+        history = RateHistory(path)
+        assert history.rate_at(date(2000, 1, 1), CurrencyCode.EUR, CurrencyCode.PLN) == 4.0
+        assert history.rate_at(date(2000, 1, 1), CurrencyCode.USD, CurrencyCode.PLN) is None
+
+    def test_not_a_history_file(self, tmp_path):
+        path = tmp_path / 'rates.json'
+        path.write_text('{"EUR": 4.0, "PLN": 1.0}')
+        with pytest.raises(ValueError):
+            RateHistory(path)
+
+
+class TestHistoryBuiltins:
+    def test_rate_at(self, history):
+        assert rate_at('2015-01-01', CurrencyCode.EUR, 'PLN') == 4.0
+        assert rate_at(b'2015-01-01', b'EUR', CurrencyCode.PLN) == 4.0
+        assert rate_at('2015-02-30', CurrencyCode.EUR, CurrencyCode.PLN) is None
+        assert rate_at('2015-01-01', 'XXX', CurrencyCode.PLN) is None
+        assert rate_at('2015-01-01', Currency(10, CurrencyCode.USD), CurrencyCode.EUR) is None
+        assert rate_at('2015-01-01', CurrencyCode.EUR, 4.0) is None
+
+    def test_convert_at(self, history):
+        assert convert_at(Currency(10, CurrencyCode.EUR), CurrencyCode.PLN, '2015-01-01') == \
+            Currency(40.0, CurrencyCode.PLN)
+        assert convert_at(10, CurrencyCode.PLN, '2015-01-01') is None
+        assert convert_at(Currency(10, CurrencyCode.EUR), Currency(1, CurrencyCode.PLN), '2015-01-01') is None
+
+    def test_builtins_in_a_program(self, history, capsys):
+        source = "main()\n{\n    print(rate_at('2015-01-01', EUR, PLN));\n" \
+            "    print(convert_at(2 EUR, PLN, '2015-01-01'));\n}\n"
+        with ModulErrorManager() as error_handler:
+            lexer = Lexer(source=io.StringIO(source, newline=''), error_handler=error_handler, str_len_limit=256)
+            Parser(lexer=lexer, error_handler=error_handler).parse().accept(InterpreterVisitor(error_handler))
+        assert capsys.readouterr().out == '4.0\n8.0 PLN\n'
+
+    def test_without_a_history(self, monkeypatch):
+        monkeypatch.setattr(history_module, '_history', None)
+        assert rate_at('2015-01-01', CurrencyCode.EUR, CurrencyCode.PLN) is None
+
+
+class TestRecordedHistory:
+    def test_refresh_appends_the_day(self, tmp_path):
+        class Provider:
+            name = 'static'
+
+            def fetch(self):
+                return {'EUR': 4.2}, None
+
+        history = RateHistory(tmp_path / 'rates.hist')
+        clock = lambda: 1709290000.0
+        refresher = RateRefresher(Provider(), RateCache(tmp_path, 1 << 20), CurrencyRegistry(), history=history,
+                                  clock=clock)
+        assert refresher.refresh() and refresher.refresh()
+        assert len(history) == 1
+        assert history.rate_at(date.fromtimestamp(clock()), CurrencyCode.EUR, CurrencyCode.PLN) == 4.2
@@ -0,0 +1,186 @@
+import json
+import sqlite3
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from currency.currency import CurrencyCode
+from currency.registry import CurrencyRegistry
+from currency.providers import (
+    RateProvider,
+    FileRateProvider,
+    SQLiteRateProvider,
+    HttpRateProvider,
+    rate_provider
+)
+from currency.refresher import RateCache, RateRefresher
+
+
+RATES = {'EUR': 4.0, 'USD': 2.0, 'GBP': 5.0}
+
+
+class StaticProvider(RateProvider):
+    def __init__(self, rates, base=None):
+        self.rates = rates
+        self.base = base
+        self.fetches = 0
+
+    @property
+    def name(self):
+        return 'static'
+
+    def fetch(self):
+        self.fetches += 1
+        return self.rates, self.base
+
+
+class BlockedProvider(StaticProvider):
+    def __init__(self, rates):
+        super().__init__(rates)
+        self.release = threading.Event()
+
+    def fetch(self):
+        self.release.wait(5)
+        return super().fetch()
+
+
+class FailingProvider(StaticProvider):
+    def fetch(self):
+        raise OSError('unreachable')
+
+
+@pytest.fixture
+def rates_server():
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps({'base': 'USD', 'rates': {'PLN': 0.5, 'EUR': 2.0}}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *arguments):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/rates'
+    server.shutdown()
+    server.server_close()
+
+
+class TestRateProviders:
+    def test_json_file(self, tmp_path):
+        path = tmp_path / 'rates.json'
+        path.write_text(json.dumps(RATES))
+        assert FileRateProvider(path).fetch() == (RATES, None)
+        path.write_text(json.dumps({'base': 'EUR', 'rates': RATES}))
+        assert FileRateProvider(path).fetch() == (RATES, 'EUR')
+
+    def test_csv_file(self, tmp_path):
+        path = tmp_path / 'rates.csv'
+        path.write_text('code,rate\nEUR,4.0\nJPY,\n')
+        assert FileRateProvider(path).fetch() == ({'EUR': '4.0'}, None)
+
+    def test_sqlite(self, tmp_path):
+        path = tmp_path / 'rates.db'
+        with sqlite3.connect(path) as connection:
+            connection.execute('CREATE TABLE rates (code TEXT, rate REAL)')
+            connection.executemany('INSERT INTO rates VALUES (?, ?)', [*RATES.items(), ('JPY', None)])
+        connection.close()
+        assert SQLiteRateProvider(path).fetch() == (RATES, None)
+        with pytest.raises(sqlite3.Error):
+            SQLiteRateProvider(tmp_path / 'missing.db').fetch()
+
+    def test_http(self, rates_server):
+        assert HttpRateProvider(rates_server).fetch() == ({'PLN': 0.5, 'EUR': 2.0}, 'USD')
+
+    def test_provider_of_a_location(self):
+        assert type(rate_provider('http://localhost/rates')) is HttpRateProvider
+        assert type(rate_provider('rates.sqlite3')) is SQLiteRateProvider
+        assert type(rate_provider('rates.csv')) is FileRateProvider
+
+
+class TestCurrencyRegistryUpdates:
+    def test_update_rates(self):
+        registry = CurrencyRegistry()
+        version = registry.rates_version
+        registry.update_rates(RATES)
+        assert registry.rate(CurrencyCode.GBP, CurrencyCode.USD) == 2.5
+        assert registry.rate(CurrencyCode.PLN, CurrencyCode.EUR) == 0.25
+        assert registry.rates_version != version
+
+    def test_rates_against_another_base(self, rates_server):
+        registry = CurrencyRegistry()
+        registry.update_rates(*HttpRateProvider(rates_server).fetch())
+        assert registry.rate(CurrencyCode.USD, CurrencyCode.PLN) == 2.0
+        assert registry.rate(CurrencyCode.EUR, CurrencyCode.PLN) == 4.0
+
+    def test_pinned_rates(self):
+        registry = CurrencyRegistry()
+        snapshot = registry.pin()
+        latest = registry.update_rates(RATES)
+        assert registry.rate(CurrencyCode.EUR, CurrencyCode.PLN) == 4.4
+        assert registry.scaled_rate(CurrencyCode.EUR, CurrencyCode.PLN) == (22, 5)
+        assert registry.rates_version == snapshot.version != latest.version
+        assert registry.latest is latest and latest.base_rates[CurrencyCode.EUR] == 4.0
+
+    def test_invalid_rates(self):
+        registry = CurrencyRegistry()
+        with pytest.raises(ValueError):
+            registry.update_rates({'EUR': 0})
+        with pytest.raises(ValueError):
+            registry.update_rates({'EUR': 1.0}, 'USD')
+
+
+class TestRateRefresher:
+    def test_stale_cache_is_used_until_refreshed(self, tmp_path):
+        cache = RateCache(tmp_path, 1 << 20, ttl=60)
+        provider = BlockedProvider(RATES)
+        cache.store(provider, 0.0, {'EUR': 8.0}, None)
+        registry = CurrencyRegistry()
+        refresher = RateRefresher(provider, cache, registry, clock=lambda: 1000.0)
+        refresher.start()
+        # The provider is still blocked, the run goes on with the cached rates.
+        assert registry.rate(CurrencyCode.EUR, CurrencyCode.PLN) == 8.0
+        provider.release.set()
+        assert refresher.refreshed.wait(5)
+        refresher.stop()
+        assert registry.rate(CurrencyCode.EUR, CurrencyCode.PLN) == 4.0
+        assert cache.load(provider) == (1000.0, RATES, None)
+
+    def test_fresh_cache_is_not_fetched(self, tmp_path):
+        cache = RateCache(tmp_path, 1 << 20, ttl=60)
+        provider = StaticProvider(RATES)
+        cache.store(provider, 990.0, {'EUR': 8.0}, None)
+        registry = CurrencyRegistry()
+        refresher = RateRefresher(provider, cache, registry, clock=lambda: 1000.0)
+        refresher.start()
+        refresher.stop()
+        assert registry.rate(CurrencyCode.EUR, CurrencyCode.PLN) == 8.0
+        assert provider.fetches == 0
+
+    def test_pinned_run_keeps_its_rates(self, tmp_path):
+        cache = RateCache(tmp_path, 1 << 20, ttl=60)
+        provider = BlockedProvider(RATES)
+        cache.store(provider, 0.0, {'EUR': 8.0}, None)
+        registry = CurrencyRegistry()
+        refresher = RateRefresher(provider, cache, registry, clock=lambda: 1000.0)
+        refresher.start()
+        registry.pin()
+        provider.release.set()
+        assert refresher.refreshed.wait(5)
+        refresher.stop()
+        # The fetched rates are cached for the next run, the run goes on with the ones it started with.
+        assert registry.rate(CurrencyCode.EUR, CurrencyCode.PLN) == 8.0
+        assert cache.load(provider) == (1000.0, RATES, None)
+
+    def test_failed_refresh_keeps_the_rates(self, tmp_path):
+        registry = CurrencyRegistry()
+        refresher = RateRefresher(FailingProvider(RATES), RateCache(tmp_path, 1 << 20), registry)
+        assert not refresher.refresh()
+        assert type(refresher.last_error) is OSError
+        assert registry.rate(CurrencyCode.EUR, CurrencyCode.PLN) == 4.4
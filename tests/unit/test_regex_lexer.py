@@ -0,0 +1,82 @@
+import io
+import glob
+
+import pytest
+
+from lexer.lexer import Lexer
+from lexer.regex_lexer import RegexLexer
+from lexer.source import BufferedSource
+from tokkens.token import TokenType, Token, Position
+from error_manager.error_manager import ModulErrorManager
+
+
+def tokenize(lexer_class, source, block_size=1 << 16, str_len_limit=256):
+    with ModulErrorManager() as error_handler:
+        lexer = lexer_class(
+            source=BufferedSource(io.StringIO(source, newline=''), block_size=block_size),
+            error_handler=error_handler,
+            str_len_limit=str_len_limit
+        )
+        tokens = []
+        while True:
+            token = lexer.next()
+            tokens.append(token)
+            if token.type is TokenType.EOF:
+                break
+        errors = [(type(error), error.position, error.name) for error in error_handler._errors]
+    return tokens, errors
+
+
+SOURCES = [
+    '',
+    'main()\n{\n\tx = 5;\n}\n',
+    'main()\r\n{\r\n\tx = 5.25 EUR -> USD;\r\n}\r\n',
+    'a\n\rb\n\r\n\rc',
+    'a\rb\nc\rd',
+    'main()\r\n{\r\n\tx = 1;\r\n\tprint(x);\n}\r\n',
+    'a\n\rb\nc\r\rd\n\r\ne',
+    'x >= 1 && y <= 2 || !z != 3 == 4 - -5 -> 6 & 7 | 8',
+    '007 0.0010 12. 3.5.6 00.5',
+    '99999999999999999999 1.99999999999999999999 123456789012345678',
+    '\'abc\' \'es\\\'cape\\n\' \'new\nline\' \'unknown\\q\'',
+    '\'never ends',
+    '\'ends with backslash\\',
+    '# comment\n x # another\r\n',
+    '? [ ] ~ " : @ $',
+    'gżegżółka ² _x1 x_2',
+    'if else while break continue return true false PLN USD EUR',
+]
+
+
+class TestRegexLexer:
+    @pytest.mark.parametrize('source', SOURCES)
+    @pytest.mark.parametrize('block_size', [1, 2, 3, 7, 1 << 16])
+    def test_same_tokens_as_lexer(self, source, block_size):
+        assert tokenize(RegexLexer, source, block_size) == tokenize(Lexer, source, block_size)
+
+    @pytest.mark.parametrize('source', [
+        'a' * 30 + ' b',
+        '#' + 'c' * 30 + '\n d',
+        '\'' + 's' * 30 + '\' e',
+        '\'' + 's' * 12 + '\\n' * 10 + '\' f',
+    ])
+    def test_same_errors_on_limits(self, source):
+        assert tokenize(RegexLexer, source, 4, str_len_limit=10) == tokenize(Lexer, source, 4, str_len_limit=10)
+
+    @pytest.mark.parametrize('path', sorted(glob.glob('tests/acceptance/*.txt')))
+    def test_same_tokens_on_acceptance_files(self, path):
+        with open(path, 'r', newline='') as file:
+            source = file.read()
+        assert tokenize(RegexLexer, source) == tokenize(Lexer, source)
+
+    def test_positions(self):
+        tokens, errors = tokenize(RegexLexer, 'main()\r\n{\r\n  x = \'a\r\nb\';\r\n}')
+        assert tokens[4] == Token(value='x', position=Position(line=3, column=3), type=TokenType.ID)
+        assert tokens[-2] == Token(value='}', position=Position(line=5, column=1), type=TokenType.BRACE_C)
+        assert errors == []
+
+    def test_lone_newlines_after_a_two_character_newline(self):
+        tokens, errors = tokenize(RegexLexer, 'x;\r\ny\n}\r\nz\rw', block_size=3)
+        assert [(token.value, token.position.line) for token in tokens] == [
+            ('x', 1), (';', 1), ('y', 2), ('}', 3), ('z', 4), ('w', 5), (None, 5)
+        ]
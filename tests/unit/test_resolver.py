@@ -0,0 +1,102 @@
+import io
+
+from lexer.lexer import Lexer
+from parser.parser import Parser
+from resolver.resolver import Resolver
+from parse_objects.objects import BuiltInFunction
+from error_manager.error_manager import ModulErrorManager
+
+
+SOURCE = '''f(a, b, a)
+{
+    x = a;
+    while (x < b)
+    {
+        y = x;
+        x = y + 1;
+    }
+    if (x) { y = 2; }
+    print(y);
+    return f;
+}
+main()
+{
+    f(1, 2, 3);
+}
+'''
+
+
+def resolve(source):
+    with ModulErrorManager() as error_handler:
+        lexer = Lexer(source=io.StringIO(source, newline=''), error_handler=error_handler, str_len_limit=256)
+        program = Parser(lexer=lexer, error_handler=error_handler).parse()
+    functions = dict(program.functions)
+    functions['print'] = BuiltInFunction(position=None, name='print', function=print)
+    for function in program.functions.values():
+        Resolver(functions).resolve(function)
+    return program, functions
+
+
+class TestResolver:
+    def test_parameters(self):
+        program, _ = resolve(SOURCE)
+        function = program.functions['f']
+        assert function.parameter_slots == [0, 1, 0]
+        assert function.slot_count == 4
+
+    def test_addresses(self):
+        program, _ = resolve(SOURCE)
+        assignment, loop, condition, call, _ = program.functions['f'].block.statements
+        assert assignment.left.variable[0].address == 2
+        assert assignment.right.variable[0].address == 0
+        assert loop.condition.left.variable[0].address == 2
+        assert loop.condition.right.variable[0].address == 1
+        declaration, update = loop.true_block.statements
+        assert declaration.left.variable[0].address == 3
+        assert update.left.variable[0].address == 2
+        assert update.right.left.variable[0].address == 3
+
+    def test_sibling_blocks_share_slots(self):
+        program, _ = resolve(SOURCE)
+        _, loop, condition, _, _ = program.functions['f'].block.statements
+        assert condition.true_block.statements[0].left.variable[0].address == 3
+        assert loop.true_block.statements[0].left.variable[0].address == 3
+
+    def test_declarations(self):
+        program, _ = resolve(SOURCE)
+        assignment, loop, condition, _, _ = program.functions['f'].block.statements
+        declaration, update = loop.true_block.statements
+        assert assignment.left.variable[0].declares and declaration.left.variable[0].declares
+        assert not update.left.variable[0].declares
+        assert condition.true_block.statements[0].left.variable[0].declares
+
+    def test_names_out_of_scope(self):
+        program, _ = resolve(SOURCE)
+        _, _, _, call, return_statement = program.functions['f'].block.statements
+        variable = call.variable[0].arguments[0].variable[0]
+        assert variable.address is None and variable.function is None
+        function = return_statement.expression.variable[0]
+        assert function.address is None and function.function is program.functions['f']
+
+    def test_call_sites(self):
+        program, functions = resolve(SOURCE)
+        assert program.functions['f'].block.statements[3].variable[0].function is functions['print']
+        assert program.functions['main'].block.statements[0].variable[0].function is program.functions['f']
+
+    def test_tail_calls(self):
+        program, _ = resolve('''f(n)
+{
+    if (n) { return f(n - 1); }
+    while (n) { return main(); }
+    return print(n);
+}
+main()
+{
+    return f(1) + 1;
+}
+''')
+        condition, loop, builtin_call = program.functions['f'].block.statements
+        assert condition.true_block.statements[0].tail_call.function is program.functions['f']
+        assert loop.true_block.statements[0].tail_call.function is program.functions['main']
+        assert builtin_call.tail_call is None
+        assert program.functions['main'].block.statements[0].tail_call is None
@@ -0,0 +1,57 @@
+import io
+import os
+
+import pytest
+
+from lexer.lexer import Lexer
+from lexer.source import StreamSource, BufferedSource, MmapSource, open_source
+from tokkens.token import TokenType, Token, Position
+from error_manager.error_manager import ModulErrorManager
+
+
+def read_all(source):
+    blocks = []
+    while block := source.read_block():
+        blocks.append(block)
+    return ''.join(blocks)
+
+
+class TestSource:
+    @pytest.mark.parametrize('text', ['', 'a', 'main()\r\n{\r\n}', 'gżegżółka ' * 50])
+    def test_sources_return_same_text(self, tmp_path, text):
+        path = tmp_path / 'source.txt'
+        path.write_text(text, encoding='utf-8', newline='')
+        with open(path, 'r', encoding='utf-8', newline='') as file:
+            streamed = read_all(StreamSource(file))
+        assert streamed == text
+        assert read_all(BufferedSource(io.StringIO(text, newline=''), block_size=3)) == text
+        if text:
+            with open(path, 'rb') as file:
+                assert read_all(MmapSource(file.fileno(), block_size=5)) == text
+
+    def test_lexer_crosses_block_boundaries(self):
+        source = BufferedSource(io.StringIO('ab\r\ncd', newline=''), block_size=3)
+        with ModulErrorManager() as error_handler:
+            lexer = Lexer(source=source, error_handler=error_handler, str_len_limit=256)
+            assert lexer.next() == Token(value='ab', position=Position(line=1, column=1), type=TokenType.ID)
+            assert lexer.next() == Token(value='cd', position=Position(line=2, column=1), type=TokenType.ID)
+            assert lexer.next() == Token(value=None, position=Position(line=2, column=3), type=TokenType.EOF)
+
+    def test_open_source_picks_mmap_for_files(self, tmp_path):
+        path = tmp_path / 'source.txt'
+        path.write_text('main(){}', newline='')
+        with open(path, 'r', newline='') as file:
+            assert isinstance(open_source(file), MmapSource)
+        assert isinstance(open_source(io.StringIO('main(){}')), BufferedSource)
+
+    def test_open_source_reads_pipe(self):
+        read_end, write_end = os.pipe()
+        os.write(write_end, b'main()\r\n{\r\n x = 1;\r\n}')
+        os.close(write_end)
+        with open(read_end, 'r', newline='') as pipe, ModulErrorManager() as error_handler:
+            lexer = Lexer(source=open_source(pipe), error_handler=error_handler, str_len_limit=256)
+            tokens = []
+            while (token := lexer.next()).type is not TokenType.EOF:
+                tokens.append(token)
+        assert tokens[4] == Token(value='x', position=Position(line=3, column=2), type=TokenType.ID)
+        assert tokens[-1] == Token(value='}', position=Position(line=4, column=1), type=TokenType.BRACE_C)
@@ -0,0 +1,89 @@
+import io
+
+from lexer.lexer import Lexer
+from parser.parser import Parser
+from optimizer.constant_folding import fold_constants
+from optimizer.specialization import specialize_functions
+from parse_objects.objects import Block, Constant, ReturnStatement
+from error_manager.error_manager import ModulErrorManager
+
+
+SOURCE = '''route(amount, code)
+{
+    if (code == 'EUR') { return amount -> EUR; }
+    return amount -> PLN;
+}
+scale(x, k)
+{
+    return x * k;
+}
+keep(a, b)
+{
+    a = a + b;
+    return a;
+}
+pass_on(a)
+{
+    keep(a, 1);
+    return a.value;
+}
+down(n)
+{
+    if (n <= 0) { return 0; }
+    return down(n - 1);
+}
+main()
+{
+    m = 1 USD;
+    x = route(m, 'EUR');
+    x = route(m, 'PLN');
+    x = route(m, 'EUR');
+    x = scale(2, 3);
+    x = scale(m, 3);
+    x = keep(1, 2);
+    x = pass_on(1);
+    x = down(10);
+    x = route(m, 'EUR', 1);
+}
+'''
+
+
+def specialized_program(max_clones=32):
+    with ModulErrorManager() as error_handler:
+        lexer = Lexer(source=io.StringIO(SOURCE, newline=''), error_handler=error_handler, str_len_limit=256)
+        program = Parser(lexer=lexer, error_handler=error_handler).parse()
+        fold_constants(program)
+        specialize_functions(program, max_clones)
+    return program
+
+
+def called(program):
+    return [statement.right.variable[0] for statement in program.functions['main'].block.statements[1:]]
+
+
+class TestSpecialization:
+    def test_calls_of_clones(self):
+        program = specialized_program()
+        names = [call.name for call in called(program)]
+        assert names == [
+            'route<0>', 'route<1>', 'route<0>', 'scale<2>', 'scale<3>', 'keep<4>', 'pass_on', 'down<5>', 'route'
+        ]
+        assert [len(call.arguments) for call in called(program)] == [1, 1, 1, 0, 1, 1, 1, 0, 3]
+
+    def test_clones_are_folded(self):
+        functions = specialized_program().functions
+        assert [parameter.name for parameter in functions['route<0>'].parameters] == ['amount']
+        taken, rest = functions['route<0>'].block.statements
+        assert type(taken) is Block and type(rest) is ReturnStatement
+        assert functions['route<1>'].block.statements[0].statements == []
+        returned = functions['scale<2>'].block.statements[0].expression
+        assert type(returned) is Constant and returned.value == 6
+
+    def test_recursion_does_not_unroll(self):
+        functions = specialized_program().functions
+        recursive_call = functions['down<5>'].block.statements[1].expression.variable[0]
+        assert recursive_call.name == 'down'
+
+    def test_clone_limit(self):
+        program = specialized_program(max_clones=2)
+        assert [call.name for call in called(program)][:4] == ['route<0>', 'route<1>', 'route<0>', 'scale']